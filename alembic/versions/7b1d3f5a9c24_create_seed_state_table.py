@@ -0,0 +1,36 @@
+"""Create seed_state table
+
+Revision ID: 7b1d3f5a9c24
+Revises: 5e8a0c3d7b19
+Create Date: 2026-10-17 14:05:12.604417
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7b1d3f5a9c24'
+down_revision: Union[str, None] = '5e8a0c3d7b19'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Written by seed.py; empty means the next seed run loads every table
+    op.create_table(
+        'seed_state',
+        sa.Column('table_name', sa.String(length=64), nullable=False),
+        sa.Column('source_hash', sa.String(length=64), nullable=False),
+        sa.Column('csv_path', sa.String(length=200), nullable=True),
+        sa.Column('csv_hash', sa.String(length=64), nullable=True),
+        sa.Column('row_count', sa.Integer(), nullable=False),
+        sa.Column('seeded_at', sa.DateTime(), server_default=sa.func.now(), nullable=True),
+        sa.PrimaryKeyConstraint('table_name')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('seed_state')
@@ -0,0 +1,40 @@
+"""Create rate_lookup_flat table
+
+Revision ID: 9d4b2e6a1f73
+Revises: 3c7e1f0b9a52
+Create Date: 2026-10-17 11:02:47.913204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9d4b2e6a1f73'
+down_revision: Union[str, None] = '3c7e1f0b9a52'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Populated by seed.py (refresh_rate_lookup_flat); empty until the next seed run
+    op.create_table(
+        'rate_lookup_flat',
+        sa.Column('product_code', sa.String(length=20), nullable=False),
+        sa.Column('iib_code', sa.String(length=20), nullable=False),
+        sa.Column('occupancy_id', sa.Integer(), nullable=False),
+        sa.Column('occupancy_type', sa.String(length=100), nullable=False),
+        sa.Column('basic_rate', sa.Numeric(precision=10, scale=6), nullable=False),
+        sa.Column('stfi_rate', sa.Numeric(precision=10, scale=6), nullable=True),
+        sa.Column('eq_zone_i', sa.Numeric(precision=10, scale=6), nullable=True),
+        sa.Column('eq_zone_ii', sa.Numeric(precision=10, scale=6), nullable=True),
+        sa.Column('eq_zone_iii', sa.Numeric(precision=10, scale=6), nullable=True),
+        sa.Column('eq_zone_iv', sa.Numeric(precision=10, scale=6), nullable=True),
+        sa.PrimaryKeyConstraint('product_code', 'iib_code')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('rate_lookup_flat')
@@ -1,6 +1,15 @@
+import logging
+import time
+from contextlib import asynccontextmanager, contextmanager
+
 from sqlalchemy import create_engine
+from sqlalchemy.exc import DBAPIError
 from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
 from app.config import settings
+from app.pool_metrics import PoolMetrics, instrument_engine, timed_pool_class
+
+logger = logging.getLogger(__name__)
 
 DATABASE_URL = settings.DATABASE_URL or ""
 
@@ -10,7 +19,28 @@ if DATABASE_URL.startswith("postgres://"):
 
 connect_args = {"check_same_thread": False} if DATABASE_URL.startswith("sqlite") else {}
 
-engine = create_engine(DATABASE_URL, connect_args=connect_args, echo=False)
+
+def _is_memory_sqlite(url: str) -> bool:
+    return url.startswith("sqlite") and (url.split("://", 1)[-1] in ("", "/", "/:memory:") or "mode=memory" in url)
+
+def pool_options(url: str, metrics: PoolMetrics, use_async: bool = False) -> dict:
+    """create_engine pool arguments from Settings. In-memory SQLite keeps its single-connection pool."""
+    options = {"pool_pre_ping": settings.DB_POOL_PRE_PING, "pool_recycle": settings.DB_POOL_RECYCLE}
+    if _is_memory_sqlite(url):
+        return options
+    base = AsyncAdaptedQueuePool if use_async else QueuePool
+    options.update(
+        poolclass=timed_pool_class(base, metrics),
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+    )
+    return options
+
+pool_metrics = PoolMetrics("primary")
+engine = create_engine(DATABASE_URL, connect_args=connect_args, echo=False,
+                       **pool_options(DATABASE_URL, pool_metrics))
+instrument_engine(engine, pool_metrics)
 SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False)
 Base = declarative_base()
 
@@ -20,3 +50,155 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+# -------------------------------
+# Async engine (asyncpg / aiosqlite)
+# -------------------------------
+
+def to_async_url(url: str) -> str:
+    """Map a sync database URL onto its async driver (asyncpg for Postgres, aiosqlite for SQLite)."""
+    scheme, sep, rest = url.partition("://")
+    base = scheme.split("+", 1)[0]
+    if base == "postgresql":
+        return f"postgresql+asyncpg{sep}{rest}"
+    if base == "sqlite":
+        return f"sqlite+aiosqlite{sep}{rest}"
+    return url
+
+ASYNC_DATABASE_URL = settings.ASYNC_DATABASE_URL or to_async_url(DATABASE_URL)
+
+_async_engine = None
+_async_session_factory = None
+
+def get_async_engine():
+    """Async engine, created on first use so the async driver is only needed by async routes."""
+    global _async_engine, _async_session_factory
+    if _async_engine is None:
+        from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+        metrics = PoolMetrics("async")
+        _async_engine = create_async_engine(ASYNC_DATABASE_URL, echo=False,
+                                            **pool_options(ASYNC_DATABASE_URL, metrics, use_async=True))
+        instrument_engine(_async_engine, metrics)
+        _async_session_factory = async_sessionmaker(bind=_async_engine, autoflush=False, expire_on_commit=False)
+    return _async_engine
+
+def AsyncSessionLocal():
+    get_async_engine()
+    return _async_session_factory()
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+# -------------------------------
+# Read replica (optional)
+# -------------------------------
+
+READ_DATABASE_URL = settings.READ_DATABASE_URL or ""
+if READ_DATABASE_URL.startswith("postgres://"):
+    READ_DATABASE_URL = READ_DATABASE_URL.replace("postgres://", "postgresql://", 1)
+
+_read_engine = None
+_read_session_factory = None
+_async_read_engine = None
+_async_read_session_factory = None
+# monotonic time before which the replica is treated as unavailable
+_replica_retry_at = 0.0
+
+def get_replica_engine():
+    """Replica engine, or None when READ_DATABASE_URL is unset or the replica recently failed."""
+    global _read_engine, _read_session_factory
+    if not READ_DATABASE_URL or time.monotonic() < _replica_retry_at:
+        return None
+    if _read_engine is None:
+        metrics = PoolMetrics("replica")
+        args = {"check_same_thread": False} if READ_DATABASE_URL.startswith("sqlite") else {}
+        _read_engine = create_engine(READ_DATABASE_URL, connect_args=args, echo=False,
+                                     **pool_options(READ_DATABASE_URL, metrics))
+        instrument_engine(_read_engine, metrics)
+        _read_session_factory = sessionmaker(bind=_read_engine, autoflush=False, autocommit=False)
+    return _read_engine
+
+def get_async_replica_engine():
+    """Async counterpart of get_replica_engine."""
+    global _async_read_engine, _async_read_session_factory
+    if not READ_DATABASE_URL or time.monotonic() < _replica_retry_at:
+        return None
+    if _async_read_engine is None:
+        from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+        url = to_async_url(READ_DATABASE_URL)
+        metrics = PoolMetrics("async_replica")
+        _async_read_engine = create_async_engine(url, echo=False, **pool_options(url, metrics, use_async=True))
+        instrument_engine(_async_read_engine, metrics)
+        _async_read_session_factory = async_sessionmaker(bind=_async_read_engine, autoflush=False, expire_on_commit=False)
+    return _async_read_engine
+
+def mark_replica_down(error: Exception) -> None:
+    """Send reads to the primary for READ_REPLICA_RETRY_SECONDS."""
+    global _replica_retry_at
+    _replica_retry_at = time.monotonic() + settings.READ_REPLICA_RETRY_SECONDS
+    logger.warning(f"Read replica unavailable, using primary for {settings.READ_REPLICA_RETRY_SECONDS}s: {error}")
+
+@contextmanager
+def read_connection():
+    """Connection for read-only work: the replica if it answers, otherwise the primary."""
+    conn = None
+    replica = get_replica_engine()
+    if replica is not None:
+        try:
+            conn = replica.connect()
+        except DBAPIError as e:
+            mark_replica_down(e)
+    with (conn or engine.connect()) as conn:
+        yield conn
+
+@asynccontextmanager
+async def async_read_connection():
+    conn = None
+    replica = get_async_replica_engine()
+    if replica is not None:
+        try:
+            conn = await replica.connect()
+        except DBAPIError as e:
+            mark_replica_down(e)
+    async with (conn or get_async_engine().connect()) as conn:
+        yield conn
+
+def ReadSessionLocal():
+    """Session on the replica, checked out eagerly so an unreachable replica falls back here rather than mid-request."""
+    if get_replica_engine() is not None:
+        db = _read_session_factory()
+        try:
+            db.connection()
+            return db
+        except DBAPIError as e:
+            db.close()
+            mark_replica_down(e)
+    return SessionLocal()
+
+def get_read_db():
+    db = ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+@asynccontextmanager
+async def AsyncReadSessionLocal():
+    db = None
+    if get_async_replica_engine() is not None:
+        db = _async_read_session_factory()
+        try:
+            await db.connection()
+        except DBAPIError as e:
+            await db.close()
+            db = None
+            mark_replica_down(e)
+    async with (db or AsyncSessionLocal()) as session:
+        yield session
+
+async def get_async_read_db():
+    async with AsyncReadSessionLocal() as db:
+        yield db
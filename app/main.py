@@ -1,24 +1,52 @@
 
+import time
+_IMPORTS_STARTED = time.perf_counter()
+
+import importlib
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from app.routers import auth
-from app.routers.fire import uiic_fire
+from app.config import settings
 from app.database import Base, engine
 
 import os
 
 import logging
-import time
 from fastapi import Request
 from fastapi.responses import JSONResponse
 from slowapi import _rate_limit_exceeded_handler
 from slowapi.errors import RateLimitExceeded
 from app.limiter import limiter
+from app.startup import ensure_schema, profile_openapi, startup_profile
+from app.services.warmup import get_warmup
+
+startup_profile.record("imports", time.perf_counter() - _IMPORTS_STARTED)
 
 # Setup Logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("irisk_backend")
 
+# (module, prefix) of every router, in registration order; each import is timed into the startup profile
+ROUTERS = (
+    ("app.routers.auth", ""),
+    ("app.routers.fire.uiic_fire", ""),
+    # New Routers for Flutter App
+    ("app.routers.premium", "/api/premium"),
+    ("app.routers.rates", "/api/rates"),
+    # Common Data Routers
+    ("app.routers.common.occupancies", ""),
+    ("app.routers.common.addons", ""),
+    ("app.routers.common.data_inspection", ""),
+    ("app.routers.master.risk_master", "/api"),
+    # Fire Premium Calculator
+    ("app.routers.fire.fire_premium", "/api"),
+    # Multi-insurer comparison
+    ("app.routers.fire.comparison", ""),
+    # Rating Engine
+    ("app.routers.rating_engine", "/api/rating"),
+    # Debug Router
+    ("app.routers.debug", ""),
+)
+
 def create_app():
     app = FastAPI(title="iRiskAssist360 Backend", description="Backend API for iRiskAssist360 Flutter App", version="1.0.0")
     
@@ -62,50 +90,52 @@ def create_app():
         logger.info(f"Request Completed: {response.status_code} in {process_time:.4f}s")
         return response
 
-    app.include_router(auth.router)
-    app.include_router(uiic_fire.router)
-    
-    # New Routers for Flutter App
-    from app.routers.premium import router as premium_router
-    from app.routers.rates import router as rates_router
-    
-    app.include_router(premium_router, prefix="/api/premium")
-    app.include_router(rates_router, prefix="/api/rates")
-    
-    # Common Data Routers
-    from app.routers.common.occupancies import router as occ_router
-    from app.routers.common.addons import router as addon_router
-    from app.routers.common.data_inspection import router as inspect_router
-    from app.routers.master import risk_master
-    
+    for module, prefix in ROUTERS:
+        with startup_profile.phase(f"router {module.rsplit('.', 1)[-1]}"):
+            router = importlib.import_module(module).router
+        app.include_router(router, prefix=prefix)
 
-    app.include_router(occ_router)
-    app.include_router(addon_router)
-    app.include_router(inspect_router)
-    app.include_router(risk_master.router, prefix="/api")
-
-    # Fire Premium Calculator
-    from app.routers.fire import fire_premium
-    app.include_router(fire_premium.router, prefix="/api")
-    
-    # Rating Engine
-    from app.routers.rating_engine import router as rating_router
-    app.include_router(rating_router, prefix="/api/rating")
-
-    # Debug Router
-    from app.routers import debug
-    app.include_router(debug.router)
+    # The schema is still built lazily, on the first /openapi.json or /docs request
+    profile_openapi(app)
 
     return app
 
 app = create_app()
 
+@app.on_event("startup")
+async def load_rate_book():
+    """Load the in-memory RateBook once so the first quote does not pay for it."""
+    try:
+        from app.services.rate_book import reload_rate_book_async
+        with startup_profile.phase("rate_book"):
+            book = await reload_rate_book_async()
+        logger.info(f"✅ Startup: RateBook {book.version} loaded")
+    except Exception as e:
+        # Lookups retry the load lazily; the BGRP check below decides whether startup fails
+        logger.error(f"RateBook preload failed: {e}")
+
+@app.on_event("startup")
+async def start_quote_sink():
+    """Start the write-behind quote writer on this worker's event loop."""
+    from app.services.quote_sink import get_quote_sink
+    get_quote_sink().start()
+
+@app.on_event("shutdown")
+async def drain_quote_sink():
+    """Flush queued quotes before the worker exits."""
+    from app.services.quote_sink import get_quote_sink
+    await get_quote_sink().stop()
+
 @app.on_event("startup")
 async def verify_bgrp_configuration():
     """Ensure BGRP rates are correctly configured before traffic is accepted."""
     try:
+        from starlette.concurrency import run_in_threadpool
         from app.services.rating_engine import get_terrorism_rate_per_mille
-        rate = float(get_terrorism_rate_per_mille("BGRP", occupancy_code="1001", tsi=10000000.0))
+        # Served by the RateBook loaded above; only reaches the database if that load failed
+        with startup_profile.phase("bgrp_check"):
+            rate = float(await run_in_threadpool(get_terrorism_rate_per_mille, "BGRP", occupancy_code="1001",
+                                                 tsi=10000000.0))
         if abs(rate - 0.07) > 0.00001:
             logger.critical(f"STARTUP FAILURE: BGRP Terrorism Rate is {rate}, expected 0.07")
             raise RuntimeError("Invalid BGRP Terrorism Rate Configuration")
@@ -115,21 +145,59 @@ async def verify_bgrp_configuration():
         # In production, this exception will prevent the app from starting
         raise e
 
-Base.metadata.create_all(bind=engine)
+@app.on_event("startup")
+async def start_warmup():
+    """Warm connections, the RateBook and every product's quote path in the background; see /ready."""
+    get_warmup().start()
+
+@app.on_event("shutdown")
+async def stop_warmup():
+    await get_warmup().stop()
+
+@app.on_event("startup")
+async def report_startup_profile():
+    """With STARTUP_PROFILE, log where startup time went (OpenAPI is generated now so it is included)."""
+    if settings.STARTUP_PROFILE:
+        app.openapi()
+        startup_profile.log()
+
+# Skipped when Alembic is at head and every table exists (FAST_BOOT)
+with startup_profile.phase("schema"):
+    ensure_schema(engine, Base.metadata)
 
 
 @app.get("/")
 def root():
     return {"brand": "iRiskAssist360", "status": "running"}
 
+@app.get("/ready")
+def ready():
+    """Readiness probe: 503 until this worker has finished warming up. `/` stays the liveness check."""
+    warmup = get_warmup()
+    if not warmup.ready:
+        return JSONResponse(status_code=503, content={"status": "warming", **warmup.stats()})
+    return {"status": "ready", **warmup.stats()}
+
 @app.get("/api/manual-seed")
 @limiter.limit("1/hour")
 def trigger_manual_seeding(request: Request):
     """Manually trigger seeding in case deployment script fails"""
+    if settings.RATE_ARTIFACT_PATH:
+        # Every worker serves the artifact's rates, so reseeded tables would not take effect
+        return {"success": False, "error": f"Rates are served from the artifact {settings.RATE_ARTIFACT_PATH}; "
+                                           "rebuild it with scripts/build_rate_artifact.py instead of reseeding"}
     try:
         from seed import main as seed_main
-        seed_main()
-        return {"success": True, "message": "Seeding executed successfully."}
+        seed_report = seed_main(force=True)
+        # The rate tables were swapped in and committed; reload the in-process caches once,
+        # from the primary because a read replica may not have the new rows yet
+        from app.services.rate_book import reload_rate_book
+        from app.services.quote_cache import get_quote_cache
+        book = reload_rate_book(bind=engine)
+        # irisk_rates is not part of the RateBook version, so drop cached quotes explicitly
+        get_quote_cache().clear()
+        return {"success": True, "message": "Seeding executed successfully.", "rate_version": book.version,
+                "seed_report": {"tables": seed_report["tables"], "error_count": seed_report["error_count"]}}
     except Exception as e:
         import traceback
         return {"success": False, "error": str(e), "traceback": traceback.format_exc()}
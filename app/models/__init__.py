@@ -1,6 +1,6 @@
 from .user import User
 from .rate import Rate
-from .quote import Quote
+from .quote import Quote, QuoteArchive
 from .otp import Otp
 from .master import LobMaster, ProductMaster
 from .generic_rate import GenericRateTable
@@ -13,5 +13,7 @@ from .fire_models import (
     EqRate, 
     TerrorismSlab, 
     BsusRate, 
-    AddOnRate
+    AddOnRate,
+    RateLookupFlat,
+    SeedState
 )
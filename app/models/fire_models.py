@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Numeric, ForeignKey, DateTime, func, Text, CheckConstraint, Boolean, UniqueConstraint
+from sqlalchemy import Column, Integer, String, Numeric, ForeignKey, DateTime, func, Text, CheckConstraint, Boolean, UniqueConstraint, Index
 from sqlalchemy.orm import relationship
 from app.database import Base
 from app.models.master import ProductMaster
@@ -53,6 +53,11 @@ class ProductBasicRate(Base):
     product = relationship("ProductMaster")
     occupancy = relationship("Occupancy")
 
+    __table_args__ = (
+        # Covers the (product, occupancy) -> basic_rate lookup without touching the table
+        Index("ix_product_basic_rates_product_occupancy", "product_code", "occupancy_id", "basic_rate"),
+    )
+
 class StfiRate(Base):
     __tablename__ = "stfi_rates"
     
@@ -97,6 +102,10 @@ class TerrorismSlab(Base):
 
     product = relationship("ProductMaster")
 
+    __table_args__ = (
+        Index("ix_terrorism_slabs_product_type_si_min", "product_code", "occupancy_type", "si_min"),
+    )
+
 class BsusRate(Base):
     __tablename__ = "bsus_rates"
 
@@ -137,4 +146,31 @@ class AddOnRate(Base):
 
     __table_args__ = (
         UniqueConstraint('add_on_id', 'product_id', 'occupancy_type', 'si_min', 'si_max', name='uq_add_on_rates_composite'),
+        Index("ix_add_on_rates_product_add_on", "product_code", "add_on_id"),
     )
+
+class RateLookupFlat(Base):
+    """Denormalized per (product, occupancy) rates; rebuilt by seed.py, read by primary key."""
+    __tablename__ = "rate_lookup_flat"
+
+    product_code = Column(String(length=20), primary_key=True)
+    iib_code = Column(String(length=20), primary_key=True)
+    occupancy_id = Column(Integer, nullable=False)
+    occupancy_type = Column(String(length=100), nullable=False)
+    basic_rate = Column(Numeric(precision=10, scale=6), nullable=False)
+    stfi_rate = Column(Numeric(precision=10, scale=6), nullable=True)
+    eq_zone_i = Column(Numeric(precision=10, scale=6), nullable=True)
+    eq_zone_ii = Column(Numeric(precision=10, scale=6), nullable=True)
+    eq_zone_iii = Column(Numeric(precision=10, scale=6), nullable=True)
+    eq_zone_iv = Column(Numeric(precision=10, scale=6), nullable=True)
+
+class SeedState(Base):
+    """What each seeded table was last built from; lets seed.py skip tables whose sources are unchanged."""
+    __tablename__ = "seed_state"
+
+    table_name = Column(String(length=64), primary_key=True)
+    source_hash = Column(String(length=64), nullable=False)
+    csv_path = Column(String(length=200), nullable=True)
+    csv_hash = Column(String(length=64), nullable=True)
+    row_count = Column(Integer, nullable=False)
+    seeded_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
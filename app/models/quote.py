@@ -1,15 +1,33 @@
-from sqlalchemy import Column, Integer, String, JSON, ForeignKey, DateTime, func
+from sqlalchemy import Column, Integer, String, JSON, ForeignKey, DateTime, Numeric, LargeBinary, func
 from sqlalchemy.orm import relationship
 from app.database import Base
 
-class Quote(Base):
+class QuoteColumns:
+    """Columns shared by the live and archive quote tables (see app/services/quote_store.py)."""
+    company = Column(String)
+    lob = Column(String)
+    product = Column(String, index=True)
+    sum_insured = Column(Numeric(precision=20, scale=2), nullable=True)
+    net_premium = Column(Numeric(precision=20, scale=2), nullable=True)
+    gross_premium = Column(Numeric(precision=20, scale=2), nullable=True)
+    rate_version = Column(String(length=32), nullable=True)
+    request_hash = Column(String(length=64), nullable=True, index=True)
+    # Legacy rows only; new quotes keep request/response in the compressed payload
+    request_data = Column(JSON, nullable=True)
+    response_data = Column(JSON, nullable=True)
+    payload = Column(LargeBinary, nullable=True)      # zlib-compressed {"request", "response"} JSON
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
+
+class Quote(QuoteColumns, Base):
     __tablename__ = "irisk_quotes"
 
     id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, ForeignKey("irisk_users.id"), nullable=True)
-    company = Column(String)
-    lob = Column(String)
-    product = Column(String)
-    request_data = Column(JSON)
-    response_data = Column(JSON)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    user_id = Column(Integer, ForeignKey("irisk_users.id"), nullable=True, index=True)
+
+class QuoteArchive(QuoteColumns, Base):
+    """Quotes rotated out of irisk_quotes after QUOTE_RETENTION_DAYS; ids are preserved."""
+    __tablename__ = "irisk_quotes_archive"
+
+    id = Column(Integer, primary_key=True, autoincrement=False)
+    user_id = Column(Integer, nullable=True, index=True)
+    archived_at = Column(DateTime(timezone=True), server_default=func.now())
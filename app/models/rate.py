@@ -1,5 +1,5 @@
 
-from sqlalchemy import Column, Integer, String, Float, JSON
+from sqlalchemy import Column, Integer, String, Float, JSON, Index, func
 from app.database import Base
 
 class Rate(Base):
@@ -14,3 +14,7 @@ class Rate(Base):
     value = Column(Float, nullable=True)          # per-mille rate
     extra_metadata = Column(JSON, nullable=True)  # renamed from metadata
 
+    __table_args__ = (
+        # Insurer rate lookup: company/lob/product equality plus case-insensitive key
+        Index("ix_irisk_rates_lookup", "company", "lob", "product", func.lower(key)),
+    )
@@ -0,0 +1,150 @@
+"""
+Connection pool instrumentation.
+
+Counters are fed by SQLAlchemy pool events (connect, checkout, checkin,
+invalidate); checkout wait time is measured around QueuePool._do_get, which
+is where a request blocks when every pooled connection is in use (opening an
+overflow connection is included). Exposed on /api/internal/db-pool for sizing
+the pool against the number of workers.
+"""
+import threading
+import time
+from typing import Any, Dict
+
+from sqlalchemy import event
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+
+
+class PoolMetrics:
+    """Thread-safe counters for one engine's pool."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.connects = 0
+            self.checkouts = 0
+            self.checkins = 0
+            self.invalidations = 0
+            self.soft_invalidations = 0
+            self.timeouts = 0
+            self.overflow_checkouts = 0
+            self.checked_out = 0
+            self.max_checked_out = 0
+            self.wait_count = 0
+            self.wait_total = 0.0
+            self.wait_max = 0.0
+
+    def record_wait(self, seconds: float, timed_out: bool = False) -> None:
+        with self._lock:
+            self.wait_count += 1
+            self.wait_total += seconds
+            self.wait_max = max(self.wait_max, seconds)
+            if timed_out:
+                self.timeouts += 1
+
+    def on_connect(self, dbapi_connection, connection_record) -> None:
+        with self._lock:
+            self.connects += 1
+
+    def on_checkout(self, overflowed: bool) -> None:
+        with self._lock:
+            self.checkouts += 1
+            self.checked_out += 1
+            self.max_checked_out = max(self.max_checked_out, self.checked_out)
+            if overflowed:
+                self.overflow_checkouts += 1
+
+    def on_checkin(self, dbapi_connection, connection_record) -> None:
+        with self._lock:
+            self.checkins += 1
+            self.checked_out = max(self.checked_out - 1, 0)
+
+    def on_invalidate(self, dbapi_connection, connection_record, exception) -> None:
+        with self._lock:
+            self.invalidations += 1
+
+    def on_soft_invalidate(self, dbapi_connection, connection_record, exception) -> None:
+        with self._lock:
+            self.soft_invalidations += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "connects": self.connects,
+                "checkouts": self.checkouts,
+                "checkins": self.checkins,
+                "checked_out": self.checked_out,
+                "max_checked_out": self.max_checked_out,
+                "overflow_checkouts": self.overflow_checkouts,
+                "invalidations": self.invalidations,
+                "soft_invalidations": self.soft_invalidations,
+                "timeouts": self.timeouts,
+                "wait_ms_avg": round(self.wait_total / self.wait_count * 1000, 3) if self.wait_count else 0.0,
+                "wait_ms_max": round(self.wait_max * 1000, 3),
+                "wait_ms_total": round(self.wait_total * 1000, 3),
+            }
+
+
+class _TimedPoolMixin:
+    """Times every blocking checkout into the class-level PoolMetrics."""
+
+    _metrics: PoolMetrics
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            record = super()._do_get()
+        except PoolTimeoutError:
+            self._metrics.record_wait(time.perf_counter() - started, timed_out=True)
+            raise
+        self._metrics.record_wait(time.perf_counter() - started)
+        return record
+
+
+def timed_pool_class(base, metrics: PoolMetrics):
+    """
+    Subclass of a QueuePool variant bound to `metrics`. Held on the class
+    rather than the instance so pools recreated by engine.dispose() keep
+    reporting to the same counters.
+    """
+    return type(f"Timed{base.__name__}", (_TimedPoolMixin, base), {"_metrics": metrics})
+
+
+_registry: Dict[str, PoolMetrics] = {}
+
+
+def instrument_engine(engine, metrics: PoolMetrics) -> PoolMetrics:
+    """Attach pool event listeners to a (sync or async) engine and register its metrics."""
+    sync_engine = getattr(engine, "sync_engine", engine)
+    pool = sync_engine.pool
+    event.listen(pool, "connect", metrics.on_connect)
+    event.listen(pool, "checkout", lambda dbapi_conn, record, proxy: metrics.on_checkout(_overflowed(sync_engine.pool)))
+    event.listen(pool, "checkin", metrics.on_checkin)
+    event.listen(pool, "invalidate", metrics.on_invalidate)
+    event.listen(pool, "soft_invalidate", metrics.on_soft_invalidate)
+    _registry[metrics.name] = metrics
+    return metrics
+
+
+def _overflowed(pool) -> bool:
+    overflow = getattr(pool, "overflow", None)
+    return callable(overflow) and overflow() > 0
+
+
+def pool_status(engine) -> Dict[str, Any]:
+    """Point-in-time gauges straight from the pool."""
+    pool = getattr(engine, "sync_engine", engine).pool
+    status = {"pool_class": type(pool).__name__}
+    for gauge in ("size", "checkedin", "checkedout", "overflow"):
+        fn = getattr(pool, gauge, None)
+        if callable(fn):
+            status[gauge] = fn()
+    return status
+
+
+def get_pool_metrics() -> Dict[str, PoolMetrics]:
+    return dict(_registry)
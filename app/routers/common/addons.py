@@ -1,13 +1,15 @@
-from fastapi import APIRouter, Depends
+from typing import Optional
+from fastapi import APIRouter, Depends, Query
 from sqlalchemy.orm import Session
-from app.database import get_db
+from app.database import get_read_db
 from app.models.fire_models import AddOnRate
 from app.schemas.response import ResponseModel
+from app.services.rate_book import get_rate_book
 
 router = APIRouter(tags=["Common Data"])
 
 @router.get("/api/add-on-rates", response_model=ResponseModel[list])
-def get_addon_rates(db: Session = Depends(get_db)):
+def get_addon_rates(db: Session = Depends(get_read_db)):
     """Fetch all add-on rates with proper field names"""
     data = db.query(AddOnRate).filter(AddOnRate.active == True).all()
     results = [
@@ -22,3 +24,20 @@ def get_addon_rates(db: Session = Depends(get_db)):
         for r in data
     ]
     return ResponseModel(success=True, message="AddOn Rates Fetched", data=results)
+
+@router.get("/api/add-on-rates/applicable", response_model=ResponseModel[list])
+def get_applicable_addon_rates(
+    productCode: str = Query(..., description="Product code, e.g. UBGR"),
+    occupancyCode: Optional[str] = Query(None, description="IIB code, e.g. 1001"),
+):
+    """All add-ons that apply to a product and occupancy, resolved from the in-memory RateBook"""
+    applicable = get_rate_book().applicable_add_ons(productCode.upper(), occupancyCode)
+    results = [
+        {
+            "add_on_code": code,
+            "rate_type": rate_type,
+            "rate_value": str(rate_value)
+        }
+        for code, (rate_type, rate_value) in sorted(applicable.items())
+    ]
+    return ResponseModel(success=True, message="Applicable AddOn Rates Fetched", data=results)
@@ -1,6 +1,6 @@
 from fastapi import APIRouter, Depends
 from sqlalchemy.orm import Session
-from app.database import get_db
+from app.database import get_read_db
 from app.models.fire_models import Occupancy
 from app.schemas.response import ResponseModel
 
@@ -11,7 +11,7 @@ from app.limiter import limiter
 
 @router.get("/api/occupancies", response_model=ResponseModel[list])
 @limiter.limit("60/minute")
-def get_occupancies(request: Request, db: Session = Depends(get_db)):
+def get_occupancies(request: Request, db: Session = Depends(get_read_db)):
     """Fetch all occupancies"""
     data = db.query(Occupancy).all()
     # Return with correct field names
@@ -16,3 +16,59 @@ def rate_limit_check(request: Request):
         message="Request allowed", 
         data={"client_host": request.client.host}
     )
+
+@router.get("/api/internal/quote-cache", response_model=ResponseModel[dict])
+def quote_cache_stats():
+    """Hit/miss/eviction counters and size of the in-process quote cache."""
+    from app.services.quote_cache import get_quote_cache
+    return ResponseModel(
+        success=True,
+        message="Quote cache statistics",
+        data=get_quote_cache().stats()
+    )
+
+@router.get("/api/internal/quote-sink", response_model=ResponseModel[dict])
+def quote_sink_stats():
+    """Queue depth and write counters of the write-behind quote sink."""
+    from app.services.quote_sink import get_quote_sink
+    return ResponseModel(
+        success=True,
+        message="Quote sink statistics",
+        data=get_quote_sink().stats()
+    )
+
+@router.get("/api/internal/db-pool", response_model=ResponseModel[dict])
+def db_pool_stats():
+    """Pool configuration, live gauges and event counters for each database engine in this worker."""
+    import os
+    from app.config import settings
+    from app import database
+    from app.pool_metrics import get_pool_metrics, pool_status
+
+    engines = {
+        "primary": database.engine,
+        "async": database._async_engine,
+        "replica": database._read_engine,
+        "async_replica": database._async_read_engine,
+    }
+    metrics = get_pool_metrics()
+    pools = {
+        name: {**pool_status(eng), **metrics[name].stats()}
+        for name, eng in engines.items()
+        if eng is not None and name in metrics
+    }
+    return ResponseModel(
+        success=True,
+        message="Database pool statistics",
+        data={
+            "pid": os.getpid(),
+            "config": {
+                "pool_size": settings.DB_POOL_SIZE,
+                "max_overflow": settings.DB_MAX_OVERFLOW,
+                "pool_timeout": settings.DB_POOL_TIMEOUT,
+                "pool_recycle": settings.DB_POOL_RECYCLE,
+                "pool_pre_ping": settings.DB_POOL_PRE_PING,
+            },
+            "pools": pools,
+        }
+    )
@@ -0,0 +1,52 @@
+"""
+Multi-insurer fire quote comparison router.
+"""
+import logging
+from typing import List, Optional
+
+from fastapi import APIRouter, HTTPException, Request
+from pydantic import BaseModel, Field
+
+from app.config import settings
+from app.limiter import limiter
+from app.schemas.response import ResponseModel
+from app.services.insurer_comparison import compare_insurers
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/irisk/fire", tags=["Fire Comparison"])
+
+
+class FireComparisonRequest(BaseModel):
+    product: str = Field(..., description="Product code, e.g. VUSP, BSUSP, BLUSP, SFSP, IAR")
+    building_si: int = Field(..., gt=0, description="Sum insured (whole rupees)")
+    occupancy: str
+    pa_selected: bool = False
+    insurers: Optional[List[str]] = Field(None, max_items=len(settings.COMPARISON_INSURERS),
+                                          description="Companies to compare, from COMPARISON_INSURERS; defaults to all of them")
+
+
+@router.post("/compare", response_model=ResponseModel[dict])
+@limiter.limit("30/minute")
+async def compare_fire_quotes(request: Request, payload: FireComparisonRequest):
+    """
+    Price one risk across every configured insurer's rate set concurrently.
+
+    Quotes are ranked by gross premium (cheapest first); insurers without a
+    matching rate are listed last with `available: false`.
+    """
+    try:
+        data = await compare_insurers(
+            product_code=payload.product,
+            occupancy=payload.occupancy,
+            building_si=payload.building_si,
+            pa_selected=payload.pa_selected,
+            insurers=payload.insurers
+        )
+        return ResponseModel(success=True, message="Fire Quote Comparison", data=data)
+    except ValueError as e:
+        logger.error(f"Validation Error: {e}")
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Comparison Error: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Quote comparison failed: {str(e)}")
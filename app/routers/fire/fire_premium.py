@@ -3,12 +3,19 @@ Fire Insurance Premium Calculation Router
 Implements authoritative premium calculation endpoints for UBGR/UVGR/UVGS products.
 """
 import logging
-from fastapi import APIRouter, Depends, HTTPException, Request
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, HTTPException, Request
 
-from app.database import get_db
-from app.schemas.fire_premium import UBGRUVGRRequest, UBGRUVGRResponse
+from app.schemas.fire_premium import (
+    UBGRUVGRRequest,
+    UBGRUVGRResponse,
+    UBGRUVGRBatchRequest,
+    UBGRUVGRBatchResponse,
+    UBGRUVGRSweepRequest,
+    UBGRUVGRSweepResponse
+)
 from app.services.fire_premium_service import FirePremiumCalculator
+from app.services.batch_pricing import price_portfolio
+from app.services.premium_sweep import price_sweep
 from app.limiter import limiter
 
 logger = logging.getLogger(__name__)
@@ -21,10 +28,9 @@ router = APIRouter(
 
 @router.post("/ubgr/calculate", response_model=UBGRUVGRResponse)
 @limiter.limit("30/minute")
-def calculate_ubgr_premium(
+async def calculate_ubgr_premium(
     request: Request,
     payload: UBGRUVGRRequest,
-    db: Session = Depends(get_db)
 ):
     """
     Calculate premium for UBGR (United Bharat Griha Raksha) product.
@@ -43,7 +49,7 @@ def calculate_ubgr_premium(
     - Discount applies ONLY on (Basic Fire + Add-On)
     - Loading applies ONLY on Subtotal
     - Terrorism is added AFTER Loading
-    - All rates fetched from database
+    - All rates come from the in-memory RateBook (no database session per request)
     """
     try:
         logger.info(f"UBGR Premium Calculation Request: {payload.dict()}")
@@ -51,7 +57,7 @@ def calculate_ubgr_premium(
         # Override product code to ensure UBGR
         payload.productCode = "UBGR"
         
-        breakdown = FirePremiumCalculator.calculate_ubgr_uvgr(payload)
+        breakdown = await FirePremiumCalculator.calculate_ubgr_uvgr_async(payload)
         
         return UBGRUVGRResponse(
             success=True,
@@ -68,10 +74,9 @@ def calculate_ubgr_premium(
 
 @router.post("/uvgr/calculate", response_model=UBGRUVGRResponse)
 @limiter.limit("30/minute")
-def calculate_uvgr_premium(
+async def calculate_uvgr_premium(
     request: Request,
     payload: UBGRUVGRRequest,
-    db: Session = Depends(get_db)
 ):
     """
     Calculate premium for UVGR (United Value Griha Raksha) product.
@@ -85,7 +90,7 @@ def calculate_uvgr_premium(
         # Override product code to ensure UVGR
         payload.productCode = "UVGR"
         
-        breakdown = FirePremiumCalculator.calculate_ubgr_uvgr(payload)
+        breakdown = await FirePremiumCalculator.calculate_ubgr_uvgr_async(payload)
         
         return UBGRUVGRResponse(
             success=True,
@@ -102,10 +107,9 @@ def calculate_uvgr_premium(
 
 @router.post("/uvgs/calculate", response_model=UBGRUVGRResponse)
 @limiter.limit("30/minute")
-def calculate_uvgs_premium(
+async def calculate_uvgs_premium(
     request: Request,
     payload: UBGRUVGRRequest,
-    db: Session = Depends(get_db)
 ):
     """
     Calculate premium for UVGS (United Value Griha Suraksha) product.
@@ -120,7 +124,7 @@ def calculate_uvgs_premium(
         # Override product code to ensure UVGS
         payload.productCode = "UVGS"
         
-        breakdown = FirePremiumCalculator.calculate_ubgr_uvgr(payload)
+        breakdown = await FirePremiumCalculator.calculate_ubgr_uvgr_async(payload)
         
         # Validate terrorism is not present
         if breakdown.terrorism_premium is not None and breakdown.terrorism_premium != 0:
@@ -138,3 +142,92 @@ def calculate_uvgs_premium(
     except Exception as e:
         logger.error(f"Calculation Error: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Premium calculation failed: {str(e)}")
+
+@router.post("/batch/calculate", response_model=UBGRUVGRBatchResponse)
+@limiter.limit("10/minute")
+def calculate_batch_premium(
+    request: Request,
+    payload: UBGRUVGRBatchRequest
+):
+    """
+    Price a whole portfolio of UBGR/UVGR/UVGS risks in one call (e.g. renewal repricing).
+
+    Inputs are columns (one list entry per risk) and the response is columnar too.
+    Applies exactly the /ubgr/calculate flow and rounding to every row; rows that
+    cannot be priced come back as null and are listed in `errors`.
+    """
+    try:
+        logger.info(f"Batch Premium Calculation Request: {payload.productCode}, {len(payload.occupancyCodes)} risks")
+
+        results = price_portfolio(
+            product_code=payload.productCode,
+            occupancy_codes=payload.occupancyCodes,
+            building_si=payload.buildingSI,
+            contents_si=payload.contentsSI,
+            discount_pct=payload.discountPercentage,
+            loading_pct=payload.loadingPercentage,
+            add_on_codes=payload.addOnCodes,
+            add_on_si=payload.addOnSI,
+            pa_proposer=payload.paProposer,
+            pa_spouse=payload.paSpouse
+        )
+        errors = results.pop("errors")
+
+        return UBGRUVGRBatchResponse(
+            success=True,
+            message=f"{payload.productCode.upper()} Batch Premium Calculated",
+            productCode=payload.productCode.upper(),
+            count=len(payload.occupancyCodes),
+            results=results,
+            errors=errors
+        )
+    except ValueError as e:
+        logger.error(f"Validation Error: {e}")
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Batch Calculation Error: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Batch premium calculation failed: {str(e)}")
+
+@router.post("/sweep/calculate", response_model=UBGRUVGRSweepResponse)
+@limiter.limit("30/minute")
+def calculate_premium_sweep(
+    request: Request,
+    payload: UBGRUVGRSweepRequest
+):
+    """
+    What-if premium surface for one UBGR/UVGR/UVGS risk.
+
+    Prices every combination of the given building SI, discount % and loading %
+    values in one vectorized pass (rates resolved once, terrorism slab per SI).
+    Surface lists are flattened row-major as buildingSI x discount x loading.
+    """
+    try:
+        logger.info(
+            f"Premium Sweep Request: {payload.productCode}/{payload.occupancyCode}, "
+            f"{len(payload.buildingSI)}x{len(payload.discountPercentage)}x{len(payload.loadingPercentage)} grid"
+        )
+
+        sweep = price_sweep(
+            product_code=payload.productCode,
+            occupancy_code=payload.occupancyCode,
+            building_si=payload.buildingSI,
+            discount_pct=payload.discountPercentage,
+            loading_pct=payload.loadingPercentage,
+            contents_si=payload.contentsSI,
+            add_ons=[(addon.addOnCode, addon.sumInsured) for addon in payload.addOns],
+            pa_proposer=payload.paSelection.proposer,
+            pa_spouse=payload.paSelection.spouse
+        )
+
+        return UBGRUVGRSweepResponse(
+            success=True,
+            message=f"{payload.productCode.upper()} Premium Sweep Calculated",
+            productCode=payload.productCode.upper(),
+            **sweep
+        )
+    except ValueError as e:
+        logger.error(f"Validation Error: {e}")
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Sweep Calculation Error: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Premium sweep failed: {str(e)}")
@@ -2,7 +2,7 @@ from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 from typing import List
 
-from app.database import get_db
+from app.database import get_read_db
 from app.models.fire_models import Occupancy
 from app.schemas.master import RiskDescriptionResponse
 
@@ -24,7 +24,7 @@ def _to_roman_safe(val: str) -> str:
 @router.get("/master/risk-descriptions", response_model=List[RiskDescriptionResponse])
 def get_risk_descriptions(
     productCode: str = Query(..., description="Product Code to filter risks"),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """
     Get Risk Descriptions (Occupancies) filtered by Product Code.
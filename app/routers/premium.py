@@ -1,10 +1,11 @@
 import logging
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from app.database import get_db
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import get_async_db
 from app.models.rate import Rate
 from app.schemas.response import ResponseModel
 from app.schemas.uvgs_schema import UVGSRequest
+from app.utils.money import Money
 
 # Setup Logger
 logger = logging.getLogger("irisk_backend")
@@ -16,30 +17,33 @@ from app.limiter import limiter
 
 @router.post("/uvgs/calculate", response_model=ResponseModel[dict])
 @limiter.limit("30/minute")
-def calculate_uvgs_premium(request: Request, payload: UVGSRequest, db: Session = Depends(get_db)):
+async def calculate_uvgs_premium(request: Request, payload: UVGSRequest, db: AsyncSession = Depends(get_async_db)):
     logger.info(f"Calculating UVGS Premium for: {payload}")
     
     # Placeholder Logic
     # 1. Base Rate (e.g., 1% of SI)
-    base_rate = 0.01
+    base_rate_pct = 1
     
-    # 2. Tenure Multiplier
-    tenure_multiplier = 1.0
+    # 2. Tenure Multiplier (as a percentage)
+    tenure_multiplier_pct = 100
     if payload.policy_tenure > 1:
         # Simple discount logic for long term
-        tenure_multiplier = 1.0 - (0.05 * (payload.policy_tenure - 1))
+        tenure_multiplier_pct = 100 - 5 * (payload.policy_tenure - 1)
         
     # 3. Calculate
-    base_premium = payload.sum_insured * base_rate * payload.member_count * payload.policy_tenure * tenure_multiplier
+    base_premium = (
+        Money.from_rupees(payload.sum_insured)
+        .apply_rate(base_rate_pct * payload.member_count * payload.policy_tenure * tenure_multiplier_pct, 100 * 100)
+    )
     
     # 4. Tax
-    gst = base_premium * 0.18
+    gst = base_premium.percent(18)
     total_premium = base_premium + gst
     
     data = {
-        "base_premium": round(base_premium, 2),
-        "gst": round(gst, 2),
-        "total_premium": round(total_premium, 2),
+        "base_premium": base_premium.to_rupees(),
+        "gst": gst.to_rupees(),
+        "total_premium": total_premium.to_rupees(),
         "input_summary": payload.dict()
     }
     
@@ -2,7 +2,7 @@ import logging
 from typing import List, Dict, Any
 from fastapi import APIRouter, Depends
 from sqlalchemy.orm import Session
-from app.database import get_db
+from app.database import get_read_db
 from app.models.rate import Rate
 from app.schemas.response import ResponseModel
 
@@ -12,7 +12,7 @@ logger = logging.getLogger("irisk_backend")
 router = APIRouter(tags=["Rates"])
 
 @router.get("/ubgr", response_model=ResponseModel[List[Dict[str, Any]]])
-def get_ubgr_rates(db: Session = Depends(get_db)):
+def get_ubgr_rates(db: Session = Depends(get_read_db)):
     logger.info("Fetching UBGR Rates")
     
     # Fetch from DB where product='BGRP' (Bharat Griha Raksha Policy)
@@ -31,7 +31,7 @@ def get_ubgr_rates(db: Session = Depends(get_db)):
     return ResponseModel(success=True, message="UBGR Rates", data=data)
 
 @router.get("/uvgs", response_model=ResponseModel[List[Dict[str, Any]]])
-def get_uvgs_rates(db: Session = Depends(get_db)):
+def get_uvgs_rates(db: Session = Depends(get_read_db)):
     logger.info("Fetching UVGS Rates")
     
     # Fetch from DB
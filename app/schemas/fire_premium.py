@@ -1,7 +1,13 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, confloat
 from typing import Optional, List, Dict
 from decimal import Decimal
 
+from app.config import settings
+
+# Per-item constraints of the list fields, matching the scalar UBGRUVGRRequest fields
+NonNegative = confloat(ge=0)
+Percentage = confloat(ge=0, le=100)
+
 class AddOnItem(BaseModel):
     """Individual Add-On with SI"""
     addOnCode: str = Field(..., description="Add-on code from master")
@@ -76,3 +82,94 @@ class UBGRUVGRResponse(BaseModel):
     message: str
     productCode: str
     breakdown: PremiumBreakdown
+
+class UBGRUVGRBatchRequest(BaseModel):
+    """
+    Columnar request for pricing a portfolio of UBGR/UVGR/UVGS risks in one call.
+    Every per-risk list must have one entry per occupancy code.
+    """
+    productCode: str = Field(..., description="UBGR, UVGR or UVGS")
+    occupancyCodes: List[str] = Field(..., max_items=settings.BATCH_MAX_RISKS, description="IIB code per risk")
+    buildingSI: List[NonNegative] = Field(..., max_items=settings.BATCH_MAX_RISKS, description="Building SI per risk")
+    contentsSI: Optional[List[NonNegative]] = Field(default=None, max_items=settings.BATCH_MAX_RISKS,
+                                                    description="Contents SI per risk (default 0)")
+    discountPercentage: Optional[List[Percentage]] = Field(default=None, max_items=settings.BATCH_MAX_RISKS,
+                                                         description="Discount % per risk (default 0)")
+    loadingPercentage: Optional[List[Percentage]] = Field(default=None, max_items=settings.BATCH_MAX_RISKS,
+                                                        description="Loading % per risk (default 0)")
+    addOnCodes: List[str] = Field(default_factory=list, description="Add-on code per column of addOnSI")
+    addOnSI: Optional[List[List[Optional[NonNegative]]]] = Field(
+        default=None, max_items=settings.BATCH_MAX_RISKS,
+        description="Per risk, SI for each addOnCodes column; null = add-on not selected"
+    )
+    paProposer: Optional[List[bool]] = Field(default=None, max_items=settings.BATCH_MAX_RISKS,
+                                             description="PA for Proposer per risk")
+    paSpouse: Optional[List[bool]] = Field(default=None, max_items=settings.BATCH_MAX_RISKS,
+                                           description="PA for Spouse per risk")
+
+    class Config:
+        schema_extra = {
+            "example": {
+                "productCode": "UBGR",
+                "occupancyCodes": ["1001", "1001_2"],
+                "buildingSI": [1000000, 2500000],
+                "contentsSI": [200000, 0],
+                "discountPercentage": [5, 0],
+                "loadingPercentage": [10, 0],
+                "addOnCodes": ["EQ"],
+                "addOnSI": [[1200000], [None]],
+                "paProposer": [True, False]
+            }
+        }
+
+class UBGRUVGRBatchResponse(BaseModel):
+    """Columnar premium breakdown; row i of every list belongs to risk i"""
+    success: bool
+    message: str
+    productCode: str
+    count: int
+    results: Dict[str, List[Optional[float]]]
+    errors: List[Dict] = Field(default_factory=list)
+
+class UBGRUVGRSweepRequest(BaseModel):
+    """
+    What-if sweep: one risk priced over every combination of the
+    buildingSI, discountPercentage and loadingPercentage values given.
+    """
+    productCode: str = Field(..., description="UBGR, UVGR or UVGS")
+    occupancyCode: str = Field(..., description="IIB Code (e.g., 1001, 1001_2)")
+    buildingSI: List[NonNegative] = Field(..., min_items=1, description="Building SI values (grid axis)")
+    contentsSI: float = Field(default=0, ge=0, description="Contents Sum Insured (fixed)")
+    discountPercentage: List[float] = Field(default_factory=lambda: [0.0], description="Discount % values (grid axis)")
+    loadingPercentage: List[float] = Field(default_factory=lambda: [0.0], description="Loading % values (grid axis)")
+    addOns: List[AddOnItem] = Field(default_factory=list, description="Selected Add-Ons with SI (fixed)")
+    paSelection: PASelection = Field(default_factory=PASelection, description="PA Selection")
+
+    class Config:
+        schema_extra = {
+            "example": {
+                "productCode": "UBGR",
+                "occupancyCode": "1001",
+                "buildingSI": [1000000, 2500000, 5000000, 10000000],
+                "contentsSI": 200000,
+                "discountPercentage": [0, 5, 10],
+                "loadingPercentage": [0, 10],
+                "addOns": [{"addOnCode": "EQ", "sumInsured": 1200000}],
+                "paSelection": {"proposer": True, "spouse": False}
+            }
+        }
+
+class UBGRUVGRSweepResponse(BaseModel):
+    """
+    Premium surface. `surface` lists are flattened row-major in `order`
+    (SI outermost); `bySI` holds fields that depend only on SI.
+    """
+    success: bool
+    message: str
+    productCode: str
+    axes: Dict[str, List[float]]
+    order: List[str]
+    shape: List[int]
+    bySI: Dict[str, List[Optional[float]]]
+    surface: Dict[str, List[Optional[float]]]
+    errors: List[Dict] = Field(default_factory=list)
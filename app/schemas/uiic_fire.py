@@ -0,0 +1,18 @@
+from typing import Optional
+from pydantic import BaseModel, Field
+
+class FireCalcRequest(BaseModel):
+    building_si: int = Field(..., gt=0, description="Sum insured (whole rupees)")
+    occupancy: str
+    pa_selected: bool = False
+
+class UBGRRequest(BaseModel):
+    buildingSI: float
+    contentsSI: Optional[float] = 0.0
+    terrorismCover: Optional[str] = None
+    terrorismSI: Optional[float] = None
+    paProposer: Optional[str] = None
+    paProposerSI: Optional[float] = None
+    paSpouse: Optional[str] = None
+    paSpouseSI: Optional[float] = None
+    discountPercentage: float = 0.0
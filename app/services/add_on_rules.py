@@ -0,0 +1,73 @@
+"""
+Compiled occupancy rules for add-on rates.
+
+The occupancy_rule strings of every (product, add-on) pair are parsed once
+into lookup tables so resolving a rate for an occupancy is a single dict
+probe instead of a per-row string parse on every request.
+"""
+from decimal import Decimal
+from typing import Dict, Iterable, List, Optional, Tuple
+
+RateEntry = Tuple[str, Decimal]
+
+
+class CompiledAddOnRule:
+    """
+    Rules for one (product, add-on) pair:
+    - NULL / 'ALL'     -> all_rate, applies to everyone
+    - 'ONLY_<code>'    -> only[code], applies to that occupancy only
+    - 'EXCEPT_<code>'  -> except_rules, each applies to every occupancy but its code
+
+    The most specific rule wins: ONLY, then EXCEPT, then ALL. Where several
+    rules of the same kind compete, the first row that matches wins as it
+    did before.
+    """
+
+    __slots__ = ("only", "except_rules", "all_rate", "_resolved", "_default")
+
+    def __init__(self, rows: Iterable[Tuple[Optional[str], str, Decimal]]):
+        only: Dict[str, RateEntry] = {}
+        except_rules: List[Tuple[str, RateEntry]] = []
+        all_rate: Optional[RateEntry] = None
+
+        for rule, rate_type, rate_value in rows:
+            entry = (rate_type, rate_value)
+            if not rule or rule.upper() == 'ALL':
+                if all_rate is None:
+                    all_rate = entry
+            elif rule.startswith('ONLY_'):
+                only.setdefault(rule[len('ONLY_'):], entry)
+            elif rule.startswith('EXCEPT_'):
+                except_rules.append((rule[len('EXCEPT_'):], entry))
+            # Any other rule text never matched an occupancy code; it is ignored
+
+        self.only = only
+        self.except_rules = except_rules
+        self.all_rate = all_rate
+
+        # Flatten into one dict + default so resolve() is a single probe. Any occupancy that is not
+        # an EXCEPT target gets the first EXCEPT rate; a target gets the first EXCEPT rule aimed
+        # elsewhere, or the ALL rate when every EXCEPT rule excludes it.
+        resolved: Dict[str, Optional[RateEntry]] = {}
+        for target, _ in except_rules:
+            if target not in resolved:
+                resolved[target] = next((e for t, e in except_rules if t != target), all_rate)
+        resolved.update(only)
+        self._resolved = resolved
+        self._default = except_rules[0][1] if except_rules else all_rate
+
+    def resolve(self, occupancy_code: Optional[str]) -> Optional[RateEntry]:
+        """Applicable (rate_type, rate_value) for the occupancy, or None."""
+        if not occupancy_code:
+            return self.all_rate
+        return self._resolved.get(occupancy_code, self._default)
+
+
+def compile_add_on_rules(
+    rows: Dict[Tuple[str, str], Iterable[Tuple[Optional[str], str, Decimal]]]
+) -> Dict[str, Dict[str, CompiledAddOnRule]]:
+    """Compile {(product, add_on): rows} into {product: {add_on: rule}}."""
+    by_product: Dict[str, Dict[str, CompiledAddOnRule]] = {}
+    for (product_code, add_on_code), rule_rows in rows.items():
+        by_product.setdefault(product_code, {})[add_on_code] = CompiledAddOnRule(rule_rows)
+    return by_product
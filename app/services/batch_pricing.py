@@ -0,0 +1,237 @@
+"""
+Vectorized portfolio pricing for UBGR/UVGR/UVGS.
+
+Runs the calculate_ubgr_uvgr flow (basic, add-on, discount, subtotal,
+loading, terrorism, net, GST) over a whole batch of risks as NumPy array
+operations. Amounts are carried as integer paise and every rounding step is
+an exact half-up integer division, so each row rounds exactly like the
+scalar FirePremiumCalculator.
+"""
+import logging
+from decimal import Decimal
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from app.services.rate_book import RateBook, get_rate_book
+from app.services.rate_resolver import MISSING_ADD_ON_RATE, NO_TERRORISM_PRODUCTS, TERRORISM_PRODUCTS
+from app.utils.money import Money
+
+logger = logging.getLogger(__name__)
+
+SUPPORTED_PRODUCTS = {'UBGR', 'UVGR', 'UVGS'}
+RATE_DECIMALS = 6          # rate columns are Numeric(*, 6)
+STAMP_DUTY_PAISE = 100     # Rs. 1 fixed stamp duty
+GST_HALF_PCT = 9           # CGST and SGST are 9% each
+_INT64_SAFE = 2 ** 62
+
+
+def _half_up_div(numerator: np.ndarray, divisor: int) -> np.ndarray:
+    """Exact half-up rounding of numerator / divisor for non-negative integers."""
+    return (numerator + divisor // 2) // divisor
+
+
+def _mul_div_half_up(values: np.ndarray, factors, divisor: int) -> np.ndarray:
+    """round_half_up(values * factors / divisor) without int64 overflow."""
+    values = np.asarray(values, dtype=np.int64)
+    factors = np.broadcast_to(np.asarray(factors, dtype=np.int64), values.shape)
+    if values.size and int(values.max()) * int(factors.max()) >= _INT64_SAFE:
+        # Fall back to Python ints for the rare batch that would overflow
+        return _half_up_div(values.astype(object) * factors.astype(object), divisor).astype(np.int64)
+    return _half_up_div(values * factors, divisor)
+
+
+def _to_paise(amounts: Sequence[float]) -> np.ndarray:
+    """Rupee amounts to paise, rounded exactly as Money.from_rupees does."""
+    amounts = np.asarray(amounts, dtype=np.float64)
+    paise = np.rint(amounts * 100)
+    # x * 100 is exact for whole-paisa values; anything finer goes through Money
+    inexact = np.flatnonzero(paise / 100 != amounts)
+    paise = paise.astype(np.int64)
+    for i in inexact.tolist():
+        paise[i] = Money.from_rupees(float(amounts[i])).paise
+    return paise
+
+
+def _decimal_places(value) -> int:
+    exponent = Decimal(str(value)).normalize().as_tuple().exponent
+    return max(0, -exponent)
+
+
+def _scaled_percentages(percentages: Sequence[float]):
+    """Percentages as exact integers plus the power-of-ten scale they were lifted by."""
+    pct = np.asarray(percentages, dtype=np.float64)
+    decimals = max((_decimal_places(v) for v in np.unique(pct)), default=0)
+    return np.rint(pct * 10 ** decimals).astype(np.int64), 10 ** decimals
+
+
+def _rate_units(rate: Decimal) -> int:
+    """Rate as an integer count of 10^-RATE_DECIMALS."""
+    return int(rate.scaleb(RATE_DECIMALS).to_integral_value())
+
+
+def _column(values: Optional[Sequence], n: int, default, name: str) -> list:
+    if values is None:
+        return [default] * n
+    if len(values) != n:
+        raise ValueError(f"{name} has {len(values)} entries, expected {n}")
+    return list(values)
+
+
+def _to_rupees(paise: np.ndarray, valid: np.ndarray) -> List[Optional[float]]:
+    return _masked(paise / 100.0, valid)
+
+
+def _to_rates(units: np.ndarray, valid: np.ndarray) -> List[Optional[float]]:
+    return _masked(units / 10 ** RATE_DECIMALS, valid)
+
+
+def _masked(values: np.ndarray, valid: np.ndarray) -> List[Optional[float]]:
+    return [float(v) if ok else None for v, ok in zip(values.tolist(), valid.tolist())]
+
+
+def price_portfolio(
+    product_code: str,
+    occupancy_codes: Sequence[str],
+    building_si: Sequence[float],
+    contents_si: Optional[Sequence[float]] = None,
+    discount_pct: Optional[Sequence[float]] = None,
+    loading_pct: Optional[Sequence[float]] = None,
+    add_on_codes: Sequence[str] = (),
+    add_on_si: Optional[Sequence[Sequence[Optional[float]]]] = None,
+    pa_proposer: Optional[Sequence[bool]] = None,
+    pa_spouse: Optional[Sequence[bool]] = None,
+    book: Optional[RateBook] = None,
+) -> Dict[str, list]:
+    """
+    Price a batch of risks given as columns.
+
+    add_on_si is a rows x add_on_codes matrix; None means the add-on is not
+    selected for that row. Returns a columnar dict with one list per
+    breakdown field; rows that cannot be priced are None in every column and
+    listed in "errors".
+    """
+    product_code = product_code.upper()
+    if product_code not in SUPPORTED_PRODUCTS:
+        raise ValueError(f"Invalid product code: {product_code}. Expected UBGR, UVGR, or UVGS")
+
+    book = book or get_rate_book()
+    n = len(occupancy_codes)
+    building = np.asarray(_column(building_si, n, 0.0, "buildingSI"), dtype=np.float64)
+    contents = np.asarray(_column(contents_si, n, 0.0, "contentsSI"), dtype=np.float64)
+    discounts = _column(discount_pct, n, 0.0, "discountPercentage")
+    loadings = _column(loading_pct, n, 0.0, "loadingPercentage")
+    proposer = np.asarray(_column(pa_proposer, n, False, "paProposer"), dtype=bool)
+    spouse = np.asarray(_column(pa_spouse, n, False, "paSpouse"), dtype=bool)
+    add_on_codes = list(add_on_codes)
+    add_on_rows = _column(add_on_si, n, [None] * len(add_on_codes), "addOnSI")
+
+    valid = np.ones(n, dtype=bool)
+    errors = []
+
+    # Rates are resolved once per distinct occupancy, then broadcast to rows
+    unique_occ, occ_index = np.unique(np.asarray(occupancy_codes, dtype=object).astype(str), return_inverse=True)
+    basic_units = np.zeros(len(unique_occ), dtype=np.int64)
+    for i, occ in enumerate(unique_occ):
+        rate = book.basic_rate(product_code, occ)
+        if rate is not None and rate > 0:
+            basic_units[i] = _rate_units(rate)
+    row_basic_units = basic_units[occ_index]
+    missing_basic = row_basic_units <= 0
+    for idx in np.flatnonzero(missing_basic).tolist():
+        errors.append({"index": idx, "message": f"No basic rate found for {product_code}/{occupancy_codes[idx]}"})
+    valid &= ~missing_basic
+
+    # 1. Basic fire premium
+    total_si = _to_paise(building) + _to_paise(contents)
+    basic = _mul_div_half_up(total_si, row_basic_units, 1000 * 10 ** RATE_DECIMALS)
+
+    # 2. Add-ons + PA
+    add_on_total = np.zeros(n, dtype=np.int64)
+    for col, add_on_code in enumerate(add_on_codes):
+        column = [row[col] if row is not None and col < len(row) else None for row in add_on_rows]
+        selected = np.asarray([v is not None for v in column], dtype=bool)
+        if not selected.any():
+            continue
+        si = _to_paise([v if v is not None else 0.0 for v in column])
+        types = np.empty(len(unique_occ), dtype=object)
+        units = np.zeros(len(unique_occ), dtype=np.int64)
+        for i, occ in enumerate(unique_occ):
+            rate_type, rate_value = book.add_on_rate(product_code, add_on_code, occ) or MISSING_ADD_ON_RATE
+            types[i] = rate_type.lower()
+            units[i] = _rate_units(rate_value)
+        row_types, row_units = types[occ_index], units[occ_index]
+        per_mille = _mul_div_half_up(si, row_units, 1000 * 10 ** RATE_DECIMALS)
+        percentage = _mul_div_half_up(si, row_units, 100 * 10 ** RATE_DECIMALS)
+        fixed = _half_up_div(row_units * 100, 10 ** RATE_DECIMALS)
+        premium = np.where(row_types == "per_mille", per_mille, np.where(row_types == "percentage", percentage, fixed))
+        add_on_total += np.where(selected, premium, 0)
+
+    for flags, pa_code in ((proposer, "PA_PROPOSER"), (spouse, "PA_SPOUSE")):
+        if not flags.any():
+            continue
+        pa_paise = np.zeros(len(unique_occ), dtype=np.int64)
+        for i, occ in enumerate(unique_occ):
+            _, rate_value = book.add_on_rate(product_code, pa_code, occ) or MISSING_ADD_ON_RATE
+            pa_paise[i] = _half_up_div(np.int64(_rate_units(rate_value) * 100), 10 ** RATE_DECIMALS)
+        add_on_total += np.where(flags, pa_paise[occ_index], 0)
+
+    # 3-4. Discount on (basic + add-on), then subtotal
+    discount_base = basic + add_on_total
+    disc_units, disc_scale = _scaled_percentages(discounts)
+    discount = _mul_div_half_up(discount_base, disc_units, 100 * disc_scale)
+    subtotal = discount_base - discount
+
+    # 5. Loading on subtotal
+    load_units, load_scale = _scaled_percentages(loadings)
+    loading = _mul_div_half_up(subtotal, load_units, 100 * load_scale)
+
+    # 6. Terrorism, excluded from discount and loading
+    terrorism = np.zeros(n, dtype=np.int64)
+    terrorism_units = np.zeros(n, dtype=np.int64)
+    if product_code in TERRORISM_PRODUCTS:
+        tsi = building + contents
+        occ_types = np.asarray([book.occupancy_type(occ) for occ in unique_occ], dtype=object)[occ_index]
+        found = np.zeros(n, dtype=bool)
+        for occ_type in set(occ_types.tolist()):
+            rows = np.flatnonzero(occ_types == occ_type)
+            index = book.terrorism_slabs.get((product_code, occ_type))
+            if index is None or not len(index):
+                continue
+            slab_units = np.asarray([_rate_units(r) for r in index.rates], dtype=np.int64)
+            pos = np.searchsorted(np.frombuffer(index.si_min, dtype=np.float64), tsi[rows], side="right") - 1
+            inside = (pos >= 0) & (tsi[rows] <= np.frombuffer(index.si_max, dtype=np.float64)[np.clip(pos, 0, None)])
+            terrorism_units[rows] = np.where(inside, slab_units[np.clip(pos, 0, None)], 0)
+            found[rows] = inside
+        for idx in np.flatnonzero(~found & valid).tolist():
+            errors.append({"index": idx, "message": f"No terrorism slab found for Product={product_code}, TSI={float(tsi[idx])}"})
+        valid &= found
+        terrorism = _mul_div_half_up(total_si, terrorism_units, 1000 * 10 ** RATE_DECIMALS)
+    elif product_code not in NO_TERRORISM_PRODUCTS:
+        logger.info(f"{product_code} does not require terrorism premium")
+
+    # 7-8. Net, taxes, gross
+    net = subtotal + loading + terrorism
+    cgst = _mul_div_half_up(net, GST_HALF_PCT, 100)
+    sgst = cgst.copy()
+    gross = net + cgst + sgst + STAMP_DUTY_PAISE
+
+    logger.info(f"Batch priced {product_code}: {int(valid.sum())}/{n} rows, {len(errors)} errors")
+
+    return {
+        "total_si": _to_rupees(total_si, valid),
+        "basic_rate": _to_rates(row_basic_units, valid),
+        "basic_premium": _to_rupees(basic, valid),
+        "add_on_premium": _to_rupees(add_on_total, valid),
+        "discount_amount": _to_rupees(discount, valid),
+        "sub_total": _to_rupees(subtotal, valid),
+        "loading_amount": _to_rupees(loading, valid),
+        "terrorism_rate": _to_rates(terrorism_units, valid),
+        "terrorism_premium": _to_rupees(terrorism, valid),
+        "net_premium": _to_rupees(net, valid),
+        "cgst": _to_rupees(cgst, valid),
+        "sgst": _to_rupees(sgst, valid),
+        "stamp_duty": _to_rupees(np.full(n, STAMP_DUTY_PAISE, dtype=np.int64), valid),
+        "gross_premium": _to_rupees(gross, valid),
+        "errors": sorted(errors, key=lambda e: e["index"]),
+    }
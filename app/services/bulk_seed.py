@@ -0,0 +1,330 @@
+"""
+Set-based table loading for seed.py.
+
+Each table is loaded in three steps:
+
+1. Rows are validated and coerced to the column types in Python. Bad rows
+   and duplicate keys go into a SeedReport and never reach the database.
+2. The surviving rows are staged into a stage table with one executemany
+   (batched into multi-row VALUES by SQLAlchemy's insertmanyvalues).
+   Foreign ids travel as their codes (iib_code, product_code, ...).
+3. merge_stage() resolves those codes to ids in SQL, then merges the stage
+   into the target with one UPDATE ... FROM for keys whose values changed,
+   plus one INSERT ... SELECT for keys the target does not have yet.
+
+Staging needs nothing from other tables, so seed.py can stage every table
+concurrently on separate connections and publish the merges in one
+transaction.
+
+A table costs a handful of statements however many CSV rows it has. The
+merge keys are the natural keys in MERGE_KEYS rather than database
+constraints. Several unique constraints were dropped by later migrations,
+so ON CONFLICT cannot rely on them being present.
+"""
+import csv
+import logging
+from decimal import Decimal, InvalidOperation
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import (
+    Boolean, Column, Integer, MetaData, Numeric, String, Table, and_, delete, exists, func, insert, or_, select,
+    update,
+)
+
+logger = logging.getLogger(__name__)
+
+# table -> natural key the merge matches on
+MERGE_KEYS = {
+    "lob_master": ("lob_code",),
+    "product_master": ("lob_id", "product_code"),
+    "occupancies": ("iib_code",),
+    "product_basic_rates": ("product_code", "occupancy_id"),
+    "bsus_rates": ("occupancy_id", "eq_zone"),
+    "stfi_rates": ("occupancy_id",),
+    "eq_rates": ("occupancy_id", "eq_zone"),
+    "terrorism_slabs": ("product_code", "occupancy_type", "si_min", "si_max"),
+    "add_on_master": ("add_on_code",),
+    "add_on_product_map": ("add_on_id", "product_code"),
+    "add_on_rates": ("add_on_id", "product_id", "occupancy_type", "si_min", "si_max"),
+    "seed_state": ("table_name",),
+}
+
+_TRUE = {"TRUE", "T", "YES", "Y", "1"}
+_FALSE = {"FALSE", "F", "NO", "N", "0"}
+_LINE = "_line"
+
+SourceRows = Iterable[Tuple[int, Dict[str, Any]]]
+# id column -> (source field holding the code, referenced code column)
+Lookups = Dict[str, Tuple[str, Column]]
+
+
+class SeedReport:
+    """Per-table load counts plus every rejected source row."""
+
+    def __init__(self):
+        self.tables: Dict[str, Dict[str, int]] = {}
+        self.errors: List[Dict[str, Any]] = []
+        self.skipped: List[str] = []
+        self.timings: Dict[str, Dict[str, float]] = {}
+
+    def error(self, table: str, line: int, reason: str) -> None:
+        self.errors.append({"table": table, "line": line, "reason": reason})
+
+    def record(self, table: str, **counts: int) -> None:
+        current = self.tables.setdefault(table, {})
+        for name, value in counts.items():
+            current[name] = current.get(name, 0) + value
+
+    def timing(self, table: str, phase: str, seconds: float) -> None:
+        self.timings.setdefault(table, {})[f"{phase}_ms"] = round(seconds * 1000, 1)
+
+    def extend(self, other: "SeedReport") -> None:
+        """Fold in a report filled on another thread."""
+        for table, counts in other.tables.items():
+            self.record(table, **counts)
+        self.errors.extend(other.errors)
+        self.skipped.extend(other.skipped)
+        for table, phases in other.timings.items():
+            self.timings.setdefault(table, {}).update(phases)
+
+    def errors_for(self, table: str) -> List[Dict[str, Any]]:
+        return [e for e in self.errors if e["table"] == table]
+
+    def table_counts(self) -> Dict[str, Dict[str, int]]:
+        tables = {table: dict(counts) for table, counts in self.tables.items()}
+        for e in self.errors:
+            counts = tables.setdefault(e["table"], {})
+            counts["rejected"] = counts.get("rejected", 0) + 1
+        return tables
+
+    def summary(self) -> Dict[str, Any]:
+        return {"tables": self.table_counts(), "timings": self.timings, "skipped": self.skipped,
+                "error_count": len(self.errors), "errors": self.errors}
+
+    def log(self, max_errors_per_table: int = 10) -> None:
+        for table, counts in self.table_counts().items():
+            stats = {**counts, **self.timings.get(table, {})}
+            logger.info(f"{table}: " + ", ".join(f"{k}={v}" for k, v in stats.items()))
+            errors = self.errors_for(table)
+            for e in errors[:max_errors_per_table]:
+                logger.warning(f"{table} line {e['line']}: {e['reason']}")
+            if len(errors) > max_errors_per_table:
+                logger.warning(f"{table}: {len(errors) - max_errors_per_table} more rejected rows")
+
+
+def read_csv(path: str) -> List[Tuple[int, Dict[str, str]]]:
+    """(line number, row) pairs with header and value whitespace stripped."""
+    with open(path, "r", encoding="utf-8-sig", errors="replace") as f:
+        reader = csv.DictReader(f)
+        return [
+            (reader.line_num, {k.strip(): (v or "").strip() for k, v in row.items() if k})
+            for row in reader
+        ]
+
+
+def _coerce(column: Column, value: Any) -> Any:
+    col_type = column.type
+    if isinstance(col_type, Boolean):
+        if isinstance(value, bool):
+            return value
+        text = str(value).strip().upper()
+        if text in _TRUE:
+            return True
+        if text in _FALSE:
+            return False
+        raise ValueError("not a boolean")
+    if isinstance(col_type, Numeric):
+        try:
+            number = Decimal(str(value))
+        except InvalidOperation:
+            raise ValueError("not a number")
+        if not number.is_finite():
+            raise ValueError("not a finite number")
+        return number
+    if isinstance(col_type, Integer):
+        return int(value)
+    if isinstance(col_type, String):
+        value = str(value)
+        if col_type.length and len(value) > col_type.length:
+            raise ValueError(f"longer than {col_type.length} characters")
+    return value
+
+
+def coerce_row(table: Table, line: int, row: Dict[str, Any], report: SeedReport,
+               sources: Optional[Dict[str, Column]] = None, deferred: Iterable[str] = ()) -> Optional[Dict[str, Any]]:
+    """
+    Column values of `row` typed for `table`, or None (reported) if the row
+    is invalid. `sources` types extra fields that are not columns of the
+    table (lookup codes); `deferred` columns are filled in later by a lookup.
+    """
+    columns = {**(sources or {}), **{c.name: c for c in table.c}}
+    values = {}
+    for name, raw in row.items():
+        if name not in columns:
+            continue  # CSV-only fields (remarks, max_payable, ...)
+        value = raw.strip() if isinstance(raw, str) else raw
+        if value == "" or value is None:
+            values[name] = None
+            continue
+        try:
+            values[name] = _coerce(columns[name], value)
+        except (ValueError, TypeError) as e:
+            report.error(table.name, line, f"{name}={raw!r}: {e}")
+            return None
+    for column in table.c:
+        if column.nullable or column.primary_key or column.name in deferred or values.get(column.name) is not None:
+            continue
+        # A column the rows omit keeps its default; an explicit NULL would violate NOT NULL
+        if column.name in values or (column.default is None and column.server_default is None):
+            report.error(table.name, line, f"{column.name} is required")
+            return None
+    return values
+
+
+def _same(target_col, stage_col):
+    return target_col.is_not_distinct_from(stage_col) if target_col.nullable else target_col == stage_col
+
+
+class Stage:
+    """Validated rows for one target table, sitting in a stage table until merge_stage()."""
+
+    def __init__(self, target: Table, table: Table, columns: List[str], key: Tuple[str, ...],
+                 lookups: Lookups):
+        self.target = target
+        self.table = table
+        self.columns = columns
+        self.key = key
+        self.lookups = lookups
+
+
+def stage_rows(conn, model, rows: SourceRows, report: SeedReport, key: Optional[Tuple[str, ...]] = None,
+               lookups: Optional[Lookups] = None, name: Optional[str] = None) -> Optional[Stage]:
+    """
+    Validate `rows` ((line, values) pairs) for `model`'s table and bulk-insert
+    the survivors into a stage table. The first row wins when the source
+    repeats a key.
+
+    `lookups` maps an id column to (source field, referenced code column).
+    Rows carry the code, for example iib_code, and merge_stage() resolves it
+    to the id in SQL. Staging therefore does not need the referenced table
+    to be loaded yet.
+
+    Without `name` the stage is a TEMPORARY table private to `conn`. With a
+    name it is a regular table, so another connection can merge it. Returns
+    None when no row is valid.
+    """
+    target = getattr(model, "__table__", model)
+    key = tuple(key or MERGE_KEYS[target.name])
+    lookups = dict(lookups or {})
+    sources = {field: ref for field, ref in lookups.values() if field not in target.c}
+    dedup_fields = [lookups[k][0] if k in lookups else k for k in key]
+
+    valid: List[Tuple[int, Dict[str, Any]]] = []
+    seen: Dict[tuple, int] = {}
+    for line, row in rows:
+        values = coerce_row(target, line, row, report, sources, deferred=lookups)
+        if values is None:
+            continue
+        missing = [k for k in key if k not in values and k not in lookups and not target.c[k].nullable]
+        if missing:
+            report.error(target.name, line, f"missing key column(s) {', '.join(missing)}")
+            continue
+        row_key = tuple(values.get(f) for f in dedup_fields)
+        if row_key in seen:
+            report.error(target.name, line, f"duplicate of line {seen[row_key]}, ignored")
+            continue
+        seen[row_key] = line
+        valid.append((line, values))
+
+    report.record(target.name, staged=len(valid))
+    if not valid:
+        return None
+
+    columns = [c.name for c in target.c if c.name in key or c.name in lookups or any(c.name in v for _, v in valid)]
+    stage = Table(
+        name or f"_stage_{target.name}", MetaData(),
+        Column(_LINE, Integer, nullable=False),
+        *[Column(c, target.c[c].type) for c in columns],
+        *[Column(field, ref.type) for field, ref in sources.items()],
+        prefixes=[] if name else ["TEMPORARY"],
+    )
+    stage.create(conn)
+    fields = columns + list(sources)
+    conn.execute(insert(stage), [
+        {_LINE: line, **{f: values.get(f) for f in fields}} for line, values in valid
+    ])
+    return Stage(target, stage, columns, key, lookups)
+
+
+def _resolve_lookups(conn, stage: Stage, report: SeedReport) -> None:
+    table = stage.table
+    for column, (field, ref) in stage.lookups.items():
+        # MIN(id): codes such as product_code are only unique per LOB
+        ref_id = select(func.min(ref.table.c.id)).where(ref == table.c[field]).scalar_subquery()
+        conn.execute(update(table).where(table.c[column].is_(None)).values({column: ref_id}))
+
+    unresolved = or_(*[table.c[column].is_(None) for column in stage.lookups])
+    fields = [field for field, _ in stage.lookups.values()]
+    rows = conn.execute(
+        select(table.c[_LINE], *[table.c[column] for column in stage.lookups], *[table.c[f] for f in fields])
+        .where(unresolved)
+        .order_by(table.c[_LINE])
+    ).all()
+    for row in rows:
+        ids, codes = row[1:1 + len(fields)], row[1 + len(fields):]
+        field, code = next((f, c) for f, c, i in zip(fields, codes, ids) if i is None)
+        report.error(stage.target.name, row[0], f"unknown {field} {code!r}")
+    if rows:
+        conn.execute(delete(table).where(unresolved))
+        # Rejected after all, so they no longer count as staged
+        report.record(stage.target.name, staged=-len(rows))
+
+
+def merge_stage(conn, stage: Stage, report: SeedReport, into: Optional[Table] = None) -> Dict[str, int]:
+    """
+    Resolve lookups, then merge the stage into its target with one UPDATE for
+    changed rows and one INSERT ... SELECT for new keys, and drop the stage.
+    `into` merges into a copy of the target instead (a shadow table); counts
+    are still reported under the target's name. Runs in the caller's
+    transaction.
+    """
+    table, columns, key = stage.table, stage.columns, stage.key
+    target = into if into is not None else stage.target
+    if stage.lookups:
+        _resolve_lookups(conn, stage, report)
+
+    counts = {"inserted": 0, "updated": 0}
+    match = and_(*[_same(target.c[k], table.c[k]) for k in key])
+    changing = [c for c in columns if c not in key]
+    if changing:
+        counts["updated"] = conn.execute(
+            update(target)
+            .where(match, or_(*[target.c[c].is_distinct_from(table.c[c]) for c in changing]))
+            .values({c: table.c[c] for c in changing})
+        ).rowcount
+
+    # Source order, so new ids follow the CSV (first row per key wins downstream)
+    new_rows = (
+        select(*[table.c[c] for c in columns])
+        .where(~exists().where(match))
+        .order_by(table.c[_LINE])
+    )
+    counts["inserted"] = conn.execute(insert(target).from_select(columns, new_rows)).rowcount
+    table.drop(conn)
+
+    report.record(stage.target.name, **counts)
+    return counts
+
+
+def merge_rows(conn, model, rows: SourceRows, report: SeedReport, key: Optional[Tuple[str, ...]] = None,
+               lookups: Optional[Lookups] = None) -> Dict[str, int]:
+    """stage_rows() into a temporary table plus merge_stage(), all in the caller's transaction."""
+    target = getattr(model, "__table__", model)
+    before = report.tables.get(target.name, {}).get("staged", 0)
+    stage = stage_rows(conn, model, rows, report, key, lookups)
+    if stage is None:
+        report.record(target.name, inserted=0, updated=0)
+        counts = {"inserted": 0, "updated": 0}
+    else:
+        counts = merge_stage(conn, stage, report)
+    return {"staged": report.tables[target.name]["staged"] - before, **counts}
@@ -4,18 +4,16 @@ Implements authoritative premium calculation for UBGR/UVGR products.
 """
 import logging
 from decimal import Decimal
-from typing import List, Dict, Tuple
-from app.services.rating_engine import (
-    get_basic_rate_per_mille,
-    get_terrorism_rate_per_mille,
-    get_add_on_rate
-)
+from typing import List, Dict, Tuple, Optional
+from app.services.rate_book import get_rate_book, get_rate_book_async
+from app.services.rate_resolver import ResolvedRates, resolve_rates
+from app.services.quote_cache import quote_cache
 from app.schemas.fire_premium import (
     UBGRUVGRRequest,
     PremiumBreakdown,
     AddOnItem
 )
-from app.utils.rating_engine import round_currency
+from app.utils.money import Money
 
 logger = logging.getLogger(__name__)
 
@@ -27,40 +25,34 @@ class FirePremiumCalculator:
     
     @staticmethod
     def _calculate_add_on_premium(
-        product_code: str,
-        occupancy_code: str,
+        rates: ResolvedRates,
         add_ons: List[AddOnItem],
         pa_proposer: bool,
         pa_spouse: bool
-    ) -> Tuple[Decimal, List[Dict]]:
+    ) -> Tuple[Money, List[Dict]]:
         """
         Calculate total add-on premium including PA.
         
         Returns:
             (total_add_on_premium, add_on_details)
         """
-        total_add_on = Decimal("0")
+        total_add_on = Money(0)
         details = []
         
         # Process each add-on
         for addon in add_ons:
-            rate_type, rate_value = get_add_on_rate(
-                product_code=product_code,
-                add_on_code=addon.addOnCode,
-                occupancy_code=occupancy_code
-            )
+            rate_type, rate_value = rates.add_on_rate(addon.addOnCode)
             
             if rate_type.lower() == "per_mille":
                 # Rate per 1000 of SI
-                premium = Decimal(str(addon.sumInsured)) * rate_value / Decimal("1000")
+                premium = Money.from_rupees(addon.sumInsured).apply_rate(rate_value, 1000)
             elif rate_type.lower() == "percentage":
                 # Percentage of SI
-                premium = Decimal(str(addon.sumInsured)) * rate_value / Decimal("100")
+                premium = Money.from_rupees(addon.sumInsured).percent(rate_value)
             else:
                 # Fixed amount
-                premium = rate_value
+                premium = Money.from_rupees(rate_value)
             
-            premium = Decimal(str(round_currency(float(premium))))
             total_add_on += premium
             
             details.append({
@@ -73,8 +65,8 @@ class FirePremiumCalculator:
         
         # Add PA premiums (flat rates from DB)
         if pa_proposer:
-            _, pa_rate = get_add_on_rate(product_code, "PA_PROPOSER", occupancy_code)
-            pa_premium = Decimal(str(round_currency(float(pa_rate))))
+            _, pa_rate = rates.add_on_rate("PA_PROPOSER")
+            pa_premium = Money.from_rupees(pa_rate)
             total_add_on += pa_premium
             details.append({
                 "addOnCode": "PA_PROPOSER",
@@ -85,8 +77,8 @@ class FirePremiumCalculator:
             })
         
         if pa_spouse:
-            _, pa_rate = get_add_on_rate(product_code, "PA_SPOUSE", occupancy_code)
-            pa_premium = Decimal(str(round_currency(float(pa_rate))))
+            _, pa_rate = rates.add_on_rate("PA_SPOUSE")
+            pa_premium = Money.from_rupees(pa_rate)
             total_add_on += pa_premium
             details.append({
                 "addOnCode": "PA_SPOUSE",
@@ -99,9 +91,43 @@ class FirePremiumCalculator:
         return total_add_on, details
     
     @staticmethod
-    def calculate_ubgr_uvgr(request: UBGRUVGRRequest) -> PremiumBreakdown:
+    def calculate_ubgr_uvgr(request: UBGRUVGRRequest, rates: Optional[ResolvedRates] = None) -> PremiumBreakdown:
         """
         Calculate premium for UBGR/UVGR products.
+
+        Without an explicit rate bundle the result is served from the quote
+        cache, keyed by the request and the current RateBook version. The
+        returned breakdown may be shared between callers; do not mutate it.
+        """
+        if rates is not None:
+            return FirePremiumCalculator._calculate(request, rates)
+
+        book = get_rate_book()
+        payload = request.dict()
+        payload["productCode"] = payload["productCode"].upper()
+        return quote_cache.get_or_compute(
+            "fire.ubgr_uvgr", payload, book.version,
+            lambda: FirePremiumCalculator._calculate(request, resolve_rates(request, book))
+        )
+
+    @staticmethod
+    async def calculate_ubgr_uvgr_async(request: UBGRUVGRRequest) -> PremiumBreakdown:
+        """
+        calculate_ubgr_uvgr for async routes. The RateBook is (re)loaded through
+        the async engine when needed; the calculation itself is pure CPU.
+        """
+        book = await get_rate_book_async()
+        payload = request.dict()
+        payload["productCode"] = payload["productCode"].upper()
+        return quote_cache.get_or_compute(
+            "fire.ubgr_uvgr", payload, book.version,
+            lambda: FirePremiumCalculator._calculate(request, resolve_rates(request, book))
+        )
+
+    @staticmethod
+    def _calculate(request: UBGRUVGRRequest, rates: ResolvedRates) -> PremiumBreakdown:
+        """
+        Calculate premium for UBGR/UVGR products from a resolved rate bundle.
         
         Calculation Flow:
         1. Basic Fire Premium = Total SI × Basic Rate / 1000
@@ -123,16 +149,15 @@ class FirePremiumCalculator:
         product_code = request.productCode.upper()
         
         # Total Sum Insured
-        total_si = Decimal(str(request.buildingSI + request.contentsSI))
+        total_si = Money.from_rupees(request.buildingSI) + Money.from_rupees(request.contentsSI)
         logger.info(f"Total SI: {total_si}")
         
         # 1. Basic Fire Premium
-        basic_rate = get_basic_rate_per_mille(product_code, request.occupancyCode)
+        basic_rate = rates.basic_rate or Decimal("0.0")
         if basic_rate <= 0:
             raise ValueError(f"No basic rate found for {product_code}/{request.occupancyCode}")
         
-        basic_fire_premium = total_si * basic_rate / Decimal("1000")
-        basic_fire_premium = Decimal(str(round_currency(float(basic_fire_premium))))
+        basic_fire_premium = total_si.apply_rate(basic_rate, 1000)
         logger.info(f"Basic Fire Premium: {basic_fire_premium} (Rate: {basic_rate}‰)")
         
         # 2. Add-On Premium
@@ -143,8 +168,7 @@ class FirePremiumCalculator:
         # For now, I will proceed with standard calc but add a placeholder validation.
         
         add_on_premium, add_on_details = FirePremiumCalculator._calculate_add_on_premium(
-            product_code=product_code,
-            occupancy_code=request.occupancyCode,
+            rates=rates,
             add_ons=request.addOns,
             pa_proposer=request.paSelection.proposer,
             pa_spouse=request.paSelection.spouse
@@ -153,18 +177,15 @@ class FirePremiumCalculator:
         
         # 3. Discount (applies ONLY to Basic Fire + Add-On)
         discount_base = basic_fire_premium + add_on_premium
-        discount_amount = discount_base * Decimal(str(request.discountPercentage)) / Decimal("100")
-        discount_amount = Decimal(str(round_currency(float(discount_amount))))
+        discount_amount = discount_base.percent(request.discountPercentage)
         logger.info(f"Discount Amount: {discount_amount} ({request.discountPercentage}% on {discount_base})")
         
         # 4. Subtotal (after discount)
         subtotal = discount_base - discount_amount
-        subtotal = Decimal(str(round_currency(float(subtotal))))
         logger.info(f"Subtotal: {subtotal}")
         
         # 5. Loading (applies ONLY to Subtotal)
-        loading_amount = subtotal * Decimal(str(request.loadingPercentage)) / Decimal("100")
-        loading_amount = Decimal(str(round_currency(float(loading_amount))))
+        loading_amount = subtotal.percent(request.loadingPercentage)
         logger.info(f"Loading Amount: {loading_amount} ({request.loadingPercentage}% on {subtotal})")
         
         # 6. Terrorism Premium (UBGR/BGR only, excluded from discount & loading)
@@ -174,13 +195,10 @@ class FirePremiumCalculator:
         
         if product_code in ['UBGR', 'BGR']:
             try:
-                terrorism_rate = get_terrorism_rate_per_mille(
-                    product_code=product_code,
-                    occupancy_code=request.occupancyCode,
-                    tsi=float(total_si)
-                )
-                terrorism_premium = total_si * terrorism_rate / Decimal("1000")
-                terrorism_premium = Decimal(str(round_currency(float(terrorism_premium))))
+                terrorism_rate = rates.terrorism_rate
+                if terrorism_rate is None:
+                    raise ValueError(f"No terrorism slab found for Product={product_code}, Type={rates.occupancy_type}, TSI={total_si}")
+                terrorism_premium = total_si.apply_rate(terrorism_rate, 1000)
                 logger.info(f"Terrorism Premium: {terrorism_premium} (Rate: {terrorism_rate}‰)")
             except Exception as e:
                 logger.error(f"Terrorism rate lookup failed: {e}")
@@ -191,7 +209,7 @@ class FirePremiumCalculator:
                 pass
         elif product_code in ['UVGR', 'UVGS']:
              logger.info(f"{product_code} -> Terrorism Premium NOT applicable")
-             terrorism_premium = Decimal("0")
+             terrorism_premium = Money(0)
              terrorism_rate = Decimal("0")
         else:
             logger.info(f"{product_code} does not require terrorism premium")
@@ -200,20 +218,15 @@ class FirePremiumCalculator:
         net_premium = subtotal + loading_amount
         if terrorism_premium is not None:
             net_premium += terrorism_premium
-        net_premium = Decimal(str(round_currency(float(net_premium))))
         logger.info(f"Net Premium: {net_premium}")
         
         # 8. Taxes
-        cgst = net_premium * Decimal("0.09")
-        cgst = Decimal(str(round_currency(float(cgst))))
-        
-        sgst = net_premium * Decimal("0.09")
-        sgst = Decimal(str(round_currency(float(sgst))))
+        cgst = net_premium.percent(9)
+        sgst = net_premium.percent(9)
         
-        stamp_duty = Decimal("1.0")  # Fixed stamp duty
+        stamp_duty = Money(100)  # Fixed stamp duty (Rs. 1)
         
         gross_premium = net_premium + cgst + sgst + stamp_duty
-        gross_premium = Decimal(str(round_currency(float(gross_premium))))
         
         logger.info(f"Gross Premium: {gross_premium} (Net: {net_premium}, CGST: {cgst}, SGST: {sgst}, Stamp: {stamp_duty})")
         
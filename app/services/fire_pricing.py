@@ -0,0 +1,267 @@
+"""
+Pure UIIC fire pricing, shared by the API routes and offline jobs.
+
+Covers the building-SI products (VUSP, BSUSP, BLUSP, SFSP, IAR) and BGRP.
+Everything here takes its rates as arguments (a per-mille rate or a
+RateBook), so the same functions price a live request, a multi-insurer
+comparison and a stored quote being repriced in a worker process.
+"""
+import logging
+from typing import Any, Dict, Mapping, Optional, Tuple
+
+from sqlalchemy import func, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.rate import Rate
+from app.schemas.uiic_fire import FireCalcRequest, UBGRRequest
+from app.services.rate_book import RateBook
+from app.services.rating_engine import get_basic_rate_per_mille, get_terrorism_rate_per_mille
+from app.utils.money import Money
+
+logger = logging.getLogger(__name__)
+
+MIN_NET_PREMIUM = Money(5000)  # Rs. 50
+MANDATORY_TERRORISM_PER_MILLE = 0.07
+PA_PREMIUM = 7
+DEFAULT_BUILDING_RATE = 0.15
+
+_COMMERCIAL_FALLBACK = {"Office": 0.20, "Residential": 0.16, "Hospital": 0.22, "Shop": 0.25}
+_INDUSTRIAL_FALLBACK = {"Factory": 0.60, "Plant": 0.75, "Warehouse": 0.40}
+
+# product code -> (display name, fallback rates used when irisk_rates has no row)
+BUILDING_PRODUCTS: Dict[str, Tuple[str, Dict[str, float]]] = {
+    "VUSP": ("Value Udyam Suraksha Policy (VUSP)", _COMMERCIAL_FALLBACK),
+    "BSUSP": ("Bharat Sookshma Udyam Suraksha (BSUSP)", _COMMERCIAL_FALLBACK),
+    "BLUSP": ("Bharat Laghu Udyam Suraksha Policy (BLUSP)", _COMMERCIAL_FALLBACK),
+    "SFSP": ("Standard Fire & Special Perils Policy (SFSP)", _INDUSTRIAL_FALLBACK),
+    "IAR": ("Industrial All Risks Policy (IAR)", _INDUSTRIAL_FALLBACK),
+}
+
+INSURER_RATES_SQL = text("""
+    SELECT product, key, value
+    FROM irisk_rates
+    WHERE company = :company AND lob = 'Fire' AND key IS NOT NULL
+    ORDER BY id
+""")
+
+
+def normalize_occupancy(occupancy: str) -> str:
+    """Occupancy as it is keyed in irisk_rates ("office " -> "Office")."""
+    return occupancy.strip().title()
+
+
+def fallback_rate(product_code: str, occupancy: str) -> float:
+    """Built-in rate for a product when irisk_rates has none for the occupancy."""
+    _, fallback = BUILDING_PRODUCTS.get(product_code, ("", {}))
+    for key, val in fallback.items():
+        if key.lower() in occupancy.lower():
+            return val
+    # Default if nothing matches
+    return DEFAULT_BUILDING_RATE
+
+
+def calculate_building_premium(building_si: int, rate_per_mille: float, pa_selected: bool,
+                               mandatory_terrorism_per_mille: float = MANDATORY_TERRORISM_PER_MILLE) -> Dict[str, Any]:
+    si = Money.from_rupees(building_si)
+    basic = si.apply_rate(rate_per_mille, 1000)
+    terrorism = si.apply_rate(mandatory_terrorism_per_mille, 1000)
+    pa = PA_PREMIUM if pa_selected else 0
+    net = basic + terrorism + Money.from_rupees(pa)
+
+    if net < MIN_NET_PREMIUM:
+        net = MIN_NET_PREMIUM
+
+    gst = net.percent(18)
+    gross = net + gst
+
+    return {
+        "basic_premium": basic.to_rupees(),
+        "terrorism_premium": terrorism.to_rupees(),
+        "pa_premium": pa,
+        "net_premium": net.to_rupees(),
+        "gst": gst.to_rupees(),
+        "gross_premium": gross.to_rupees()
+    }
+
+
+def price_building_product(product_code: str, payload: FireCalcRequest, rate: float) -> Dict[str, Any]:
+    """Full UIIC response for a building-SI product at the given per-mille rate."""
+    product_name, _ = BUILDING_PRODUCTS[product_code]
+    return {
+        "brand": "iRiskAssist360",
+        "company": "UIIC",
+        "lob": "Fire",
+        "product": product_name,
+        "rate_applied": rate,
+        "building_si": payload.building_si,
+        **calculate_building_premium(payload.building_si, rate, payload.pa_selected)
+    }
+
+
+def insurer_rate_query(company: str, product_code: str, occupancy: str):
+    """
+    Case-insensitive key match written as lower(key) = :occ so it can use the
+    ix_irisk_rates_lookup expression index (ILIKE cannot).
+    """
+    return select(Rate.value).filter(
+        Rate.company == company,
+        Rate.lob == "Fire",
+        Rate.product == product_code,
+        func.lower(Rate.key) == occupancy.lower()
+    ).limit(1)
+
+
+async def lookup_insurer_rate(db: AsyncSession, company: str, product_code: str, occupancy: str) -> Optional[float]:
+    """Per-mille fire rate from irisk_rates for one insurer, or None if it has none configured."""
+    result = await db.execute(insurer_rate_query(company, product_code, occupancy))
+    return result.scalars().first()
+
+
+def load_insurer_rates(conn, company: str = "UIIC") -> Dict[Tuple[str, str], float]:
+    """All of an insurer's fire rates as {(product, lower(key)): value}, for offline jobs."""
+    rates: Dict[Tuple[str, str], float] = {}
+    for product, key, value in conn.execute(INSURER_RATES_SQL, {"company": company}):
+        if value is not None:
+            rates.setdefault((product, key.lower()), float(value))
+    return rates
+
+
+def resolve_building_rate(rates: Mapping[Tuple[str, str], float], product_code: str, occupancy: str) -> float:
+    """In-memory equivalent of the UIIC route lookup: irisk_rates row, else fallback."""
+    rate = rates.get((product_code, occupancy.lower()))
+    return rate if rate is not None else fallback_rate(product_code, occupancy)
+
+
+def price_bgrp(payload: UBGRRequest, book: RateBook) -> Dict[str, Any]:
+    """
+    Bharat Griha Raksha Policy premium for one request against a RateBook.
+    Pure: no DB access. Raises ValueError when the rates are not usable.
+    """
+    product_code = "BGRP"
+    logger.debug("BGRP calculation: %s", payload)
+
+    # 1. Total SI = Building + Contents
+    totalSI = payload.buildingSI + payload.contentsSI
+    total_si = Money.from_rupees(payload.buildingSI) + Money.from_rupees(payload.contentsSI)
+    
+    # 2. Rate Lookup
+    # BGRP is primarily Residential (1001) - Critical Logic Update
+    occupancy_code = "1001" 
+    
+    basic_rate_decimal = get_basic_rate_per_mille(product_code, occupancy_code, book=book)
+    basic_rate = float(basic_rate_decimal)
+    
+    logger.debug("Rate lookup for %s/%s: %s", product_code, occupancy_code, basic_rate)
+
+    if basic_rate <= 0:
+        raise ValueError(f"Rate lookup failed for {product_code}. Check configuration.")
+    
+    # Fire Premium
+    firePremium = total_si.apply_rate(basic_rate_decimal, 1000)
+    
+    # 3. Terrorism Premium
+    terrorismSI = total_si
+    terrorismPremium = Money(0)
+    
+    try:
+        if occupancy_code != "1001":
+            raise ValueError(f"CRITICAL: BGRP must use occupancy 1001, got {occupancy_code}")
+
+        terr_rate_decimal = get_terrorism_rate_per_mille(product_code, occupancy_code="1001", tsi=totalSI, book=book)
+        terr_rate = float(terr_rate_decimal)
+        
+        # Hard Assertion: Rate must be 0.07 (or configured valid rate, but user requests strict 0.07 check)
+        # User requirement: "If terrorismRate != 0.07 -> throw error"
+        if abs(terr_rate - 0.07) > 0.00001:
+             error_msg = f"CRITICAL VALIDATION FAILED: Terrorism Rate is {terr_rate}, expected 0.07"
+             logger.error(error_msg)
+             raise ValueError(error_msg)
+             
+        terrorismPremium = terrorismSI.apply_rate(terr_rate_decimal, 1000)
+        logger.debug("Terrorism calc: SI=%s * rate=%s‰ = %s", terrorismSI, terr_rate, terrorismPremium)
+    except Exception as e:
+        logger.error(f"Terrorism Rate Lookup/Validation Failed: {e}")
+        raise ValueError(str(e)) from e
+
+    # 4. PA Premium (Flat Rs. 7 per person)
+    paPremium = Money(0)
+    
+    if payload.paProposer == 'Yes':
+        paPremium += Money(700)
+        
+    if payload.paSpouse == 'Yes':
+        paPremium += Money(700)
+        
+    # 5. Total & Taxes
+    # Mandatory Rule: BGRP Net Premium = Fire Premium + Terrorism Premium (+ PA if any)
+    # Discounts usually apply to the base fire premium, but requirement says "Net Premium = Fire + Terrorism".
+    # We will assume discount applies to Fire portion only OR applies to total.
+    # User instruction: "net_premium = fire_premium + terrorism_premium".
+    # It implies simple aggregation. We will respect discount on fire/base if applicable or apply to loaded base.
+    
+    # Current logic applied discount to (fire + terrorism + pa).
+    # If standard practice, discount applies to fire only.
+    # However, strict instructions say: "net_premium = fire_premium + terrorism_premium"
+    # To be safe and compliant with "Net Premium correctly excludes terrorism for BGRP" (Issue statement),
+    # I'll calculate discount on fire only, or apply discount first then add terrorism?
+    # User said: "Net Premium incorrectly excludes terrorism for BGRP"
+    # This likely means terrorism was being dropped or not added. 
+    # Let's aggregate cleanly.
+    
+    base_fire_pa = firePremium + paPremium
+    
+    # Apply Discount to Fire+PA (or just Fire). Assuming Fire+PA for now or following previous pattern but ensuring Terrorism is ADDED.
+    discounted_base = base_fire_pa - base_fire_pa.percent(payload.discountPercentage)
+    
+    # Net Premium Aggregation
+    netPremium = discounted_base + terrorismPremium
+    
+    # Minimum Premium Logic (Should not apply during aggregation, but final check)
+    # User said: "DO NOT... apply min premium logic here" (in aggregation steps).
+    
+    # Hard Log Reqd
+    logger.debug("BGRP premiums: fire=%s, terrorism=%s, net=%s (slab rate %s)",
+                 firePremium, terrorismPremium, netPremium, terr_rate)
+    
+    # Final Min Premium Check
+    if netPremium < MIN_NET_PREMIUM:
+        logger.debug("Net premium %s < %s, applying minimum", netPremium, MIN_NET_PREMIUM)
+        netPremium = MIN_NET_PREMIUM
+        
+    cgst = netPremium.percent(9)
+    sgst = netPremium.percent(9)
+    stampDuty = Money(100)
+    grossPremium = netPremium + cgst + sgst + stampDuty
+    
+    # Construct Response
+    response = {
+        "product": "Bharat Griha Raksha Policy",
+        "product_code": "BGRP",
+        "netPremium": netPremium.to_rupees(),
+        "basicFirePremium": firePremium.to_rupees(), # Explicit REQUIRED key
+        "basic_premium": firePremium.to_rupees(),    # Legacy
+        "firePremium": firePremium.to_rupees(),      # Legacy
+        "terrorismPremium": terrorismPremium.to_rupees(), # Explicit requested field
+        "terrorism_premium": terrorismPremium.to_rupees(), # Legacy
+        "cgst": cgst.to_rupees(),
+        "sgst": sgst.to_rupees(),
+        "stampDuty": stampDuty.to_rupees(),
+        "grossPremium": grossPremium.to_rupees(),
+        "breakdown": {
+            "totalSI": totalSI,
+            "firePremium": firePremium.to_rupees(),
+            "terrorismPremium": terrorismPremium.to_rupees(),
+            "paPremium": paPremium.to_rupees(),
+            "basePremium": (firePremium + paPremium).to_rupees(),
+            "discountApplied": (base_fire_pa - discounted_base).to_rupees(),
+            "appliedRate": basic_rate,
+            "terrorismRate": terr_rate,
+            "fireRate": basic_rate,  # Explicit as per strict contract
+            "occupancyCode": 1001    # Explicit as per strict contract
+        }
+    }
+    
+    logger.debug("BGRP response: net=%s, gross=%s, fire=%s, terrorism=%s",
+                 netPremium, grossPremium, firePremium, terrorismPremium)
+
+    return response
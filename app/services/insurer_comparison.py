@@ -0,0 +1,104 @@
+"""
+Multi-insurer fire quote comparison.
+
+Prices one building-SI risk against every configured insurer's rate set in
+irisk_rates. Occupancy and SI are normalised once; each insurer then gets
+its own session and its lookup + pricing runs concurrently, so the total
+latency tracks the slowest insurer rather than the sum of all of them.
+
+Only insurers listed in COMPARISON_INSURERS can be compared, which also
+bounds the sessions one request opens. UIIC is priced exactly as its own
+/irisk/fire/uiic routes price it, including their built-in fallback rates.
+"""
+import asyncio
+import logging
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from app.config import settings
+from app.services.fire_pricing import (
+    BUILDING_PRODUCTS, calculate_building_premium, fallback_rate, lookup_insurer_rate, normalize_occupancy,
+)
+
+logger = logging.getLogger(__name__)
+
+# Insurer whose routes (app/routers/fire/uiic_fire.py) fall back to fire_pricing.fallback_rate
+FALLBACK_INSURER = "UIIC"
+
+
+async def _quote_insurer(session_factory: Callable, company: str, product_code: str, occupancy: str,
+                         building_si: int, pa_selected: bool, timeout: float) -> Dict[str, Any]:
+    started = time.perf_counter()
+    quote: Dict[str, Any] = {"company": company, "available": False}
+
+    async def lookup():
+        async with session_factory() as db:
+            return await lookup_insurer_rate(db, company, product_code, occupancy)
+
+    try:
+        # The timeout covers the pool checkout too, so an exhausted pool cannot hold one insurer past it
+        rate = await asyncio.wait_for(lookup(), timeout)
+        if rate is None and company == FALLBACK_INSURER and product_code in BUILDING_PRODUCTS:
+            rate = fallback_rate(product_code, occupancy)
+        if rate is None:
+            quote["message"] = f"No {product_code} rate configured for occupancy {occupancy}"
+        else:
+            quote.update(available=True, rate_applied=rate,
+                         **calculate_building_premium(building_si, rate, pa_selected))
+    except asyncio.TimeoutError:
+        logger.warning(f"Comparison: {company} timed out after {timeout}s")
+        quote["message"] = f"Timed out after {timeout}s"
+    except Exception as e:
+        logger.error(f"Comparison: {company} failed: {e}")
+        quote["message"] = "Rating failed"
+    quote["elapsed_ms"] = round((time.perf_counter() - started) * 1000, 2)
+    return quote
+
+
+def rank_quotes(quotes: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Cheapest gross premium first; insurers that could not quote go last, unranked."""
+    available = sorted((q for q in quotes if q["available"]), key=lambda q: (q["gross_premium"], q["company"]))
+    for rank, quote in enumerate(available, start=1):
+        quote["rank"] = rank
+    unavailable = [q for q in quotes if not q["available"]]
+    for quote in unavailable:
+        quote["rank"] = None
+    return available + unavailable
+
+
+async def compare_insurers(product_code: str, occupancy: str, building_si: int, pa_selected: bool = False,
+                           insurers: Optional[Sequence[str]] = None,
+                           session_factory: Optional[Callable] = None) -> Dict[str, Any]:
+    """Price the risk for every insurer concurrently and return the ranked comparison."""
+    if session_factory is None:
+        from app.database import AsyncReadSessionLocal
+        session_factory = AsyncReadSessionLocal
+
+    companies = list(dict.fromkeys(c.strip().upper() for c in (insurers or settings.COMPARISON_INSURERS) if c.strip()))
+    if not companies:
+        raise ValueError("No insurers configured for comparison")
+    unknown = [c for c in companies if c not in settings.COMPARISON_INSURERS]
+    if unknown:
+        raise ValueError(f"Insurers not available for comparison: {', '.join(unknown)}")
+    product_code = product_code.strip().upper()
+    occ = normalize_occupancy(occupancy)
+
+    started = time.perf_counter()
+    quotes = await asyncio.gather(*(
+        _quote_insurer(session_factory, company, product_code, occ, building_si, pa_selected,
+                       settings.COMPARISON_TIMEOUT_SECONDS)
+        for company in companies
+    ))
+    elapsed_ms = round((time.perf_counter() - started) * 1000, 2)
+
+    ranked = rank_quotes(list(quotes))
+    logger.info(f"Compared {product_code}/{occ} across {len(companies)} insurers in {elapsed_ms}ms")
+    return {
+        "product": product_code,
+        "occupancy": occ,
+        "building_si": building_si,
+        "pa_selected": pa_selected,
+        "quotes": ranked,
+        "best": ranked[0]["company"] if ranked and ranked[0]["available"] else None,
+        "elapsed_ms": elapsed_ms,
+    }
@@ -0,0 +1,102 @@
+"""
+What-if premium sweep for UBGR/UVGR/UVGS.
+
+Evaluates the calculate_ubgr_uvgr formula over a grid of building SI x
+discount % x loading % for one risk. The grid is flattened and priced in a
+single price_portfolio call, so rates are resolved once and every point goes
+through the same vectorized, paise-exact arithmetic (terrorism slabs are
+looked up per SI, so slab boundaries inside the grid are respected).
+"""
+import logging
+from typing import Dict, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.config import settings
+from app.services.batch_pricing import price_portfolio
+from app.services.rate_book import RateBook
+
+logger = logging.getLogger(__name__)
+
+AXES = ("buildingSI", "discountPercentage", "loadingPercentage")
+# Fields that depend only on SI are returned once per SI value ...
+SI_FIELDS = ("total_si", "basic_premium", "add_on_premium", "terrorism_rate", "terrorism_premium")
+# ... the rest as a full surface, flattened in AXES order (SI outermost)
+SURFACE_FIELDS = ("discount_amount", "sub_total", "loading_amount", "net_premium", "cgst", "sgst", "gross_premium")
+
+
+def price_sweep(
+    product_code: str,
+    occupancy_code: str,
+    building_si: Sequence[float],
+    discount_pct: Sequence[float] = (0.0,),
+    loading_pct: Sequence[float] = (0.0,),
+    contents_si: float = 0.0,
+    add_ons: Sequence[Tuple[str, float]] = (),
+    pa_proposer: bool = False,
+    pa_spouse: bool = False,
+    book: Optional[RateBook] = None,
+) -> Dict:
+    """
+    Price every (SI, discount, loading) combination for one risk.
+
+    Returns the axes, the grid shape, SI-only fields as per-SI lists and the
+    remaining fields as flat row-major surfaces of len(SI) * len(discount) *
+    len(loading) values. Points that cannot be priced are None.
+    """
+    si_axis = list(building_si)
+    discount_axis = list(discount_pct) or [0.0]
+    loading_axis = list(loading_pct) or [0.0]
+    if not si_axis:
+        raise ValueError("buildingSI must contain at least one value")
+    for name, axis in (("discountPercentage", discount_axis), ("loadingPercentage", loading_axis)):
+        if any(not 0 <= v <= 100 for v in axis):
+            raise ValueError(f"{name} values must be between 0 and 100")
+    shape = (len(si_axis), len(discount_axis), len(loading_axis))
+    points = shape[0] * shape[1] * shape[2]
+    if points > settings.SWEEP_MAX_POINTS:
+        raise ValueError(f"Sweep grid has {points} points, limit is {settings.SWEEP_MAX_POINTS}")
+
+    si_grid, discount_grid, loading_grid = (
+        g.ravel() for g in np.meshgrid(
+            np.asarray(si_axis, dtype=np.float64),
+            np.asarray(discount_axis, dtype=np.float64),
+            np.asarray(loading_axis, dtype=np.float64),
+            indexing="ij",
+        )
+    )
+    add_on_codes = [code for code, _ in add_ons]
+    add_on_row = [si for _, si in add_ons]
+
+    priced = price_portfolio(
+        product_code=product_code,
+        occupancy_codes=[occupancy_code] * points,
+        building_si=si_grid.tolist(),
+        contents_si=[contents_si] * points,
+        discount_pct=discount_grid.tolist(),
+        loading_pct=loading_grid.tolist(),
+        add_on_codes=add_on_codes,
+        add_on_si=[add_on_row] * points,
+        pa_proposer=[pa_proposer] * points,
+        pa_spouse=[pa_spouse] * points,
+        book=book,
+    )
+
+    # Row i * len(discount) * len(loading) is the first grid point for SI i
+    stride = shape[1] * shape[2]
+    errors, seen = [], set()
+    for error in priced["errors"]:
+        si_index = error["index"] // stride
+        if si_index not in seen:
+            seen.add(si_index)
+            errors.append({"buildingSI": si_axis[si_index], "message": error["message"]})
+
+    logger.info(f"Sweep {product_code.upper()}/{occupancy_code}: {shape} grid, {len(errors)} SI values unpriced")
+    return {
+        "axes": {"buildingSI": si_axis, "discountPercentage": discount_axis, "loadingPercentage": loading_axis},
+        "order": list(AXES),
+        "shape": list(shape),
+        "bySI": {field: priced[field][::stride] for field in SI_FIELDS},
+        "surface": {field: priced[field] for field in SURFACE_FIELDS},
+        "errors": errors,
+    }
@@ -0,0 +1,135 @@
+"""
+Quote result cache.
+
+The app re-prices the same quote every time a user toggles an add-on or
+drags a slider back, so identical requests are answered from a bounded
+LRU cache with a TTL. Keys are a SHA-256 of the normalized request plus the
+rate-data version (RateBook.version); a reseed that changes any rate yields
+a new version, so stale entries are never hit again and simply age out.
+"""
+import hashlib
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+def canonical_key(namespace: str, payload: Dict[str, Any], rate_version: str) -> str:
+    """Stable hash of a request: key order and whole-number floats do not matter."""
+    body = json.dumps(_normalize(payload), sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(f"{namespace}|{rate_version}|{body}".encode("utf-8")).hexdigest()
+
+
+def _normalize(value):
+    if isinstance(value, dict):
+        return {k: _normalize(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_normalize(v) for v in value]
+    if isinstance(value, str):
+        return value.strip()
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
+
+
+class QuoteCache:
+    """Thread-safe LRU + TTL cache with hit/miss/eviction counters."""
+
+    def __init__(self, max_entries: int = 1024, ttl_seconds: float = 300):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0
+
+    def get(self, key: str):
+        """Cached value or None; expired entries are dropped on access."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, value = entry
+            if self.ttl_seconds > 0 and time.monotonic() >= expires_at:
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: str, value) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def get_or_compute(self, namespace: str, payload: Dict[str, Any], rate_version: str,
+                       compute: Callable[[], Any]):
+        """
+        Return the cached result for this request, or compute and store it.
+        Exceptions from compute propagate and are not cached.
+        """
+        if not self.enabled:
+            return compute()
+        key = canonical_key(namespace, payload, rate_version)
+        value = self.get(key)
+        if value is None:
+            value = compute()
+            self.put(key, value)
+        return value
+
+    async def get_or_compute_async(self, namespace: str, payload: Dict[str, Any], rate_version: str,
+                                   compute: Callable[[], Awaitable[Any]]):
+        """get_or_compute for async routes; compute is awaited only on a miss."""
+        if not self.enabled:
+            return await compute()
+        key = canonical_key(namespace, payload, rate_version)
+        value = self.get(key)
+        if value is None:
+            value = await compute()
+            self.put(key, value)
+        return value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+quote_cache = QuoteCache(settings.QUOTE_CACHE_MAX_ENTRIES, settings.QUOTE_CACHE_TTL_SECONDS)
+
+
+def get_quote_cache() -> QuoteCache:
+    return quote_cache
@@ -0,0 +1,148 @@
+"""
+Write-behind quote persistence.
+
+Calculate routes hand the quote row (quote_store.quote_row) to the sink
+and return; a background task on the event loop flushes queued rows with
+one multi-row INSERT every QUOTE_SINK_BATCH_SIZE rows or QUOTE_SINK_FLUSH_MS
+milliseconds, whichever comes first. The queue is bounded: when it is full (or the sink is not
+running) submit() returns False and the caller writes synchronously, so a
+quote is never dropped just because the database is slow. stop() drains
+whatever is queued before shutdown.
+"""
+import asyncio
+import logging
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from sqlalchemy import insert
+
+from app.config import settings
+from app.models.quote import Quote
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+
+class QuoteSink:
+    """Bounded async queue of quote rows plus the task that batches them into irisk_quotes."""
+
+    def __init__(self, max_queue: int = 1000, batch_size: int = 100, flush_ms: int = 200,
+                 engine_factory: Optional[Callable] = None):
+        self.max_queue = max_queue
+        self.batch_size = max(batch_size, 1)
+        self.flush_seconds = flush_ms / 1000
+        self._engine_factory = engine_factory
+        self._queue: Optional[asyncio.Queue] = None
+        self._batch_ready: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._accepting = False
+        self.enqueued = 0
+        self.written = 0
+        self.batches = 0
+        self.failed = 0
+        self.sync_fallbacks = 0
+        self.last_flush_ms = 0.0
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        """Start the flush task on the running event loop (no-op when disabled or already running)."""
+        if self.max_queue <= 0 or self.running:
+            return
+        # Unbounded asyncio.Queue with the bound enforced in submit(), so the stop marker always fits
+        self._queue = asyncio.Queue()
+        self._batch_ready = asyncio.Event()
+        self._accepting = True
+        self._task = asyncio.get_running_loop().create_task(self._run())
+        logger.info(f"Quote sink started (queue {self.max_queue}, batch {self.batch_size}, "
+                    f"flush {self.flush_seconds * 1000:.0f}ms)")
+
+    def submit(self, row: Dict[str, Any]) -> bool:
+        """Queue a row for the next batch. False means the caller must write it itself."""
+        if not self._accepting or self._queue.qsize() >= self.max_queue:
+            self.sync_fallbacks += 1
+            return False
+        self._queue.put_nowait(row)
+        self.enqueued += 1
+        if self._queue.qsize() >= self.batch_size:
+            self._batch_ready.set()
+        return True
+
+    async def stop(self, timeout: float = 10.0) -> None:
+        """Stop accepting rows and flush everything already queued."""
+        if not self.running:
+            return
+        self._accepting = False
+        self._queue.put_nowait(_STOP)
+        self._batch_ready.set()
+        try:
+            await asyncio.wait_for(self._task, timeout)
+        except asyncio.TimeoutError:
+            lost = self._queue.qsize()
+            logger.error(f"Quote sink drain timed out after {timeout}s; {lost} quotes not written")
+            self.failed += lost
+        logger.info(f"Quote sink stopped: {self.stats()}")
+
+    async def _run(self) -> None:
+        stopping = False
+        while not stopping:
+            first = await self._queue.get()
+            if first is _STOP:
+                break
+            if self._queue.qsize() + 1 < self.batch_size:
+                try:
+                    await asyncio.wait_for(self._batch_ready.wait(), self.flush_seconds)
+                except asyncio.TimeoutError:
+                    pass
+            self._batch_ready.clear()
+            batch = [first]
+            while len(batch) < self.batch_size and not self._queue.empty():
+                row = self._queue.get_nowait()
+                if row is _STOP:
+                    stopping = True
+                    break
+                batch.append(row)
+            await self._flush(batch)
+
+    async def _flush(self, batch: List[Dict[str, Any]]) -> None:
+        started = time.perf_counter()
+        try:
+            engine = self._engine_factory() if self._engine_factory else _default_engine()
+            async with engine.begin() as conn:
+                await conn.execute(insert(Quote.__table__).values(batch))
+            self.written += len(batch)
+            self.batches += 1
+        except Exception as e:
+            self.failed += len(batch)
+            logger.error(f"Quote sink: failed to write batch of {len(batch)}: {e}")
+        self.last_flush_ms = round((time.perf_counter() - started) * 1000, 3)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "running": self.running,
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "max_queue": self.max_queue,
+            "batch_size": self.batch_size,
+            "flush_ms": self.flush_seconds * 1000,
+            "enqueued": self.enqueued,
+            "written": self.written,
+            "batches": self.batches,
+            "failed": self.failed,
+            "sync_fallbacks": self.sync_fallbacks,
+            "last_flush_ms": self.last_flush_ms,
+        }
+
+
+def _default_engine():
+    from app.database import get_async_engine
+    return get_async_engine()
+
+
+quote_sink = QuoteSink(settings.QUOTE_SINK_MAX_QUEUE, settings.QUOTE_SINK_BATCH_SIZE, settings.QUOTE_SINK_FLUSH_MS)
+
+
+def get_quote_sink() -> QuoteSink:
+    return quote_sink
@@ -0,0 +1,164 @@
+"""
+Compact storage for irisk_quotes.
+
+The fields we filter and report on (product, sum insured, net/gross
+premium, rate version, request hash) are typed, indexed columns; the full
+request and response live in one zlib-compressed JSON blob (`payload`).
+Responses carry legacy alias keys for older app versions (basic_premium,
+firePremium, ...); aliases equal to their canonical key are dropped before
+compression and restored on read, so the round trip is lossless.
+
+Rows older than QUOTE_RETENTION_DAYS are rotated into irisk_quotes_archive
+in id-ordered batches, which keeps the live table and its indexes small.
+Rows written before compaction (JSON columns, no payload) are still read
+transparently and can be converted with compact_legacy_quotes().
+"""
+import json
+import logging
+import zlib
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Optional, Tuple
+
+from sqlalchemy import and_, delete, insert, null, select, update
+
+from app.models.quote import Quote, QuoteArchive
+from app.services.quote_cache import canonical_key
+
+logger = logging.getLogger(__name__)
+
+# alias -> canonical key it duplicates
+LEGACY_ALIASES = {
+    "basic_premium": "basicFirePremium",
+    "firePremium": "basicFirePremium",
+    "terrorism_premium": "terrorismPremium",
+}
+
+ARCHIVED_COLUMNS = (
+    "id", "user_id", "company", "lob", "product", "sum_insured", "net_premium", "gross_premium",
+    "rate_version", "request_hash", "request_data", "response_data", "payload", "created_at",
+)
+
+
+def premiums(response: Optional[dict]) -> Tuple[Optional[float], Optional[float]]:
+    """(net, gross) from either response shape (building products or BGRP)."""
+    response = response or {}
+    net = response.get("net_premium", response.get("netPremium"))
+    gross = response.get("gross_premium", response.get("grossPremium"))
+    return net, gross
+
+
+def sum_insured(request: Dict[str, Any], response: Dict[str, Any]) -> Optional[float]:
+    if response.get("building_si") is not None:
+        return float(response["building_si"])
+    total = (response.get("breakdown") or {}).get("totalSI")
+    if total is not None:
+        return float(total)
+    parts = [request.get(k) for k in ("building_si", "buildingSI", "contentsSI")]
+    parts = [float(p) for p in parts if p is not None]
+    return sum(parts) if parts else None
+
+
+def compact_response(response: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        k: v for k, v in response.items()
+        if not (k in LEGACY_ALIASES and LEGACY_ALIASES[k] in response and response[LEGACY_ALIASES[k]] == v)
+    }
+
+
+def expand_response(response: Dict[str, Any]) -> Dict[str, Any]:
+    expanded = dict(response)
+    for alias, canonical in LEGACY_ALIASES.items():
+        if alias not in expanded and canonical in expanded:
+            expanded[alias] = expanded[canonical]
+    return expanded
+
+
+def encode_payload(request: Dict[str, Any], response: Dict[str, Any]) -> bytes:
+    body = json.dumps({"request": request, "response": compact_response(response)},
+                      separators=(",", ":"), default=str)
+    return zlib.compress(body.encode("utf-8"), 6)
+
+
+def decode_payload(payload: bytes) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    body = json.loads(zlib.decompress(payload))
+    return body["request"], expand_response(body["response"])
+
+
+def quote_data(request_data: Optional[dict], response_data: Optional[dict],
+               payload: Optional[bytes]) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """(request, response) of a stored quote, compacted or legacy."""
+    if payload is not None:
+        return decode_payload(payload)
+    return request_data or {}, response_data or {}
+
+
+def quote_row(company: str, lob: str, product: str, request_data: Dict[str, Any], response_data: Dict[str, Any],
+              rate_version: Optional[str] = None, user_id: Optional[int] = None) -> Dict[str, Any]:
+    """irisk_quotes column values for one quote."""
+    net, gross = premiums(response_data)
+    return {
+        "user_id": user_id,
+        "company": company,
+        "lob": lob,
+        "product": product,
+        "sum_insured": sum_insured(request_data, response_data),
+        "net_premium": net,
+        "gross_premium": gross,
+        "rate_version": rate_version,
+        "request_hash": canonical_key(f"{company}.{lob}.{product}", request_data, ""),
+        "payload": encode_payload(request_data, response_data),
+    }
+
+
+def archive_quotes(bind, older_than: datetime, batch_size: int = 5000) -> int:
+    """
+    Move quotes created before `older_than` into irisk_quotes_archive. Each
+    id-ordered batch is copied and deleted in its own short transaction, so
+    the live table is never locked for the whole rotation. Returns rows moved.
+    """
+    live, archive = Quote.__table__, QuoteArchive.__table__
+    columns = [live.c[name] for name in ARCHIVED_COLUMNS]
+    moved = 0
+    while True:
+        with bind.begin() as conn:
+            ids = conn.execute(
+                select(live.c.id).where(live.c.created_at < older_than).order_by(live.c.id).limit(batch_size)
+            ).scalars().all()
+            if not ids:
+                break
+            window = and_(live.c.id <= ids[-1], live.c.created_at < older_than)
+            conn.execute(insert(archive).from_select(list(ARCHIVED_COLUMNS), select(*columns).where(window)))
+            moved += conn.execute(delete(live).where(window)).rowcount
+    logger.info(f"Archived {moved} quotes created before {older_than.isoformat()}")
+    return moved
+
+
+def retention_cutoff(days: int) -> datetime:
+    return datetime.now(timezone.utc) - timedelta(days=days)
+
+
+def compact_legacy_quotes(bind, batch_size: int = 1000) -> int:
+    """Fill typed columns and payload for rows still stored as plain JSON (one transaction per batch)."""
+    table = Quote.__table__
+    converted = 0
+    after_id = 0
+    while True:
+        with bind.begin() as conn:
+            rows = conn.execute(
+                select(table.c.id, table.c.company, table.c.lob, table.c.product, table.c.request_data, table.c.response_data)
+                .where(table.c.id > after_id, table.c.payload.is_(None))
+                .order_by(table.c.id)
+                .limit(batch_size)
+            ).all()
+            if not rows:
+                break
+            for quote_id, company, lob, product, request_data, response_data in rows:
+                values = quote_row(company, lob, product, request_data or {}, response_data or {})
+                del values["user_id"]
+                conn.execute(update(table).where(table.c.id == quote_id).values(
+                    **values, request_data=null(), response_data=null()
+                ))
+        converted += len(rows)
+        after_id = rows[-1][0]
+    logger.info(f"Compacted {converted} legacy quotes")
+    return converted
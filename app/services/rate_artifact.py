@@ -0,0 +1,239 @@
+"""
+Compiled rate artifact: the RateBook's source rows in one binary file.
+
+scripts/build_rate_artifact.py compiles the data/ CSVs into the file. At
+startup the app memory-maps it and builds the RateBook from it, without
+touching the database.
+
+Layout (native byte order, recorded in the header):
+
+    header   magic, format, byte order, body length, sha256 of the body,
+             RateBook version of the rows
+    body     directory (name, typecode, offset, length) followed by the
+             8-byte aligned column arrays
+
+Codes are interned: every distinct string is stored once ("strings.data",
+sliced by "strings.offsets"), and string columns hold uint32 ids into it.
+A decimal column is stored as an int64 mantissa plus an int8 exponent, so
+every value keeps its exact Decimal form and the RateBook built from the
+artifact has the same version as one loaded from the database.
+
+Columns are read through zero-copy memoryviews over the read-only mapping,
+and the file is checked and decoded without reading it into the heap.
+load_rate_book() still decodes the rows into ordinary Python objects and
+closes the map: every worker holds its own RateBook, as with a database
+load. What the artifact saves is the database round trip and the
+per-row driver conversion at startup, not per-worker memory.
+"""
+import hashlib
+import logging
+import mmap
+import os
+import struct
+import sys
+import tempfile
+from array import array
+from decimal import Decimal
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from app.services.rate_book import RateBook
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"IRRA"
+FORMAT_VERSION = 1
+
+# magic, format, byte order (0 little / 1 big), reserved, body length, sha256, RateBook version
+_HEADER = struct.Struct("<4sBBHQ32s16s")
+_ENTRY = struct.Struct("<48scxxxxxxxQQ")
+_COUNT = struct.Struct("<Q")
+
+_NO_STRING = 0xFFFFFFFF
+_NO_DECIMAL = -128
+
+# RateBook constructor argument -> its columns, in tuple order ("str" or "dec")
+SECTIONS = {
+    "basic_rates": (("product_code", "str"), ("iib_code", "str"), ("basic_rate", "dec")),
+    "occupancy_types": (("iib_code", "str"), ("occupancy_type", "str")),
+    "terrorism_slabs": (("product_code", "str"), ("occupancy_type", "str"), ("si_min", "dec"),
+                        ("si_max", "dec"), ("rate_per_mille", "dec")),
+    "add_on_rates": (("product_code", "str"), ("add_on_code", "str"), ("rate_type", "str"),
+                     ("rate_value", "dec"), ("occupancy_rule", "str")),
+}
+
+
+def _split_decimal(value: Any) -> Tuple[int, int]:
+    if value is None:
+        return 0, _NO_DECIMAL
+    number = value if isinstance(value, Decimal) else Decimal(str(value))
+    sign, digits, exponent = number.as_tuple()
+    if not isinstance(exponent, int):
+        raise ValueError(f"{value!r} is not a finite number")
+    mantissa = int("".join(map(str, digits)) or "0") * (-1 if sign else 1)
+    if not -127 <= exponent <= 127 or not -(1 << 63) <= mantissa < (1 << 63):
+        raise ValueError(f"{value!r} does not fit the artifact's decimal encoding")
+    return mantissa, exponent
+
+
+class _Builder:
+    def __init__(self):
+        self.strings: Dict[str, int] = {}
+        self.columns: List[Tuple[str, array]] = []
+
+    def intern(self, value: Optional[str]) -> int:
+        if value is None:
+            return _NO_STRING
+        return self.strings.setdefault(str(value), len(self.strings))
+
+    def add_section(self, section: str, rows: Sequence[tuple]) -> None:
+        for position, (field, kind) in enumerate(SECTIONS[section]):
+            values = [row[position] for row in rows]
+            name = f"{section}.{field}"
+            if kind == "str":
+                self.columns.append((name, array("I", [self.intern(v) for v in values])))
+            else:
+                parts = [_split_decimal(v) for v in values]
+                self.columns.append((name, array("q", [m for m, _ in parts])))
+                self.columns.append((f"{name}.exp", array("b", [e for _, e in parts])))
+
+    def body(self) -> bytes:
+        data = bytearray()
+        offsets = array("Q", [0])
+        for value in self.strings:  # insertion order == id order
+            data += value.encode("utf-8")
+            offsets.append(len(data))
+        columns = self.columns + [("strings.offsets", offsets), ("strings.data", array("B", data))]
+
+        directory_size = _COUNT.size + _ENTRY.size * len(columns)
+        entries, chunks, offset = [], [], directory_size
+        for name, values in columns:
+            offset += -offset % 8
+            entries.append(_ENTRY.pack(name.encode("ascii"), values.typecode.encode("ascii"), offset, len(values)))
+            chunks.append((offset, values.tobytes()))
+            offset += len(values) * values.itemsize
+
+        body = bytearray(offset)
+        body[:directory_size] = _COUNT.pack(len(columns)) + b"".join(entries)
+        for start, chunk in chunks:
+            body[start:start + len(chunk)] = chunk
+        return bytes(body)
+
+
+def write_rate_artifact(path: str, rows: Dict[str, Sequence[tuple]]) -> str:
+    """
+    Compile RateBook constructor rows (RateBook.fetch_rows()) into `path` and
+    return their RateBook version. The file is replaced atomically, so a
+    worker never maps a half-written artifact.
+    """
+    version = RateBook(**rows).version
+    builder = _Builder()
+    for section in SECTIONS:
+        builder.add_section(section, rows[section])
+    body = builder.body()
+    header = _HEADER.pack(MAGIC, FORMAT_VERSION, 0 if sys.byteorder == "little" else 1, 0, len(body),
+                          hashlib.sha256(body).digest(), version.encode("ascii"))
+
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".rates-")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(header)
+            f.write(body)
+        os.chmod(tmp_path, 0o644)  # mkstemp creates it private; every worker must be able to map it
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+    logger.info(f"Rate artifact {path} written: version {version}, {len(builder.strings)} strings, "
+                f"{_HEADER.size + len(body)} bytes")
+    return version
+
+
+class RateArtifact:
+    """A read-only mapping of a compiled rate artifact."""
+
+    def __init__(self, path: str, verify: bool = True):
+        self.path = path
+        with open(path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            self._open(verify)
+        except Exception:
+            self._columns = {}
+            self._map.close()
+            raise
+
+    def _open(self, verify: bool) -> None:
+        if len(self._map) < _HEADER.size:
+            raise ValueError(f"{self.path} is not a rate artifact (too short)")
+        magic, fmt, byte_order, _, body_length, digest, version = _HEADER.unpack_from(self._map)
+        if magic != MAGIC:
+            raise ValueError(f"{self.path} is not a rate artifact")
+        if fmt != FORMAT_VERSION:
+            raise ValueError(f"{self.path} has format {fmt}, expected {FORMAT_VERSION}")
+        if byte_order != (0 if sys.byteorder == "little" else 1):
+            raise ValueError(f"{self.path} was compiled for the other byte order")
+        if len(self._map) != _HEADER.size + body_length:
+            raise ValueError(f"{self.path} is truncated")
+        if verify and hashlib.sha256(self._map[_HEADER.size:]).digest() != digest:
+            raise ValueError(f"{self.path} failed its checksum")
+        self.version = version.decode("ascii")
+        self.checksum = digest.hex()
+
+        self._columns: Dict[str, memoryview] = {}
+        (count,) = _COUNT.unpack_from(self._map, _HEADER.size)
+        directory = _HEADER.size + _COUNT.size
+        with memoryview(self._map) as view:
+            for i in range(count):
+                name, typecode, offset, length = _ENTRY.unpack_from(self._map, directory + i * _ENTRY.size)
+                typecode = typecode.decode("ascii")
+                start = _HEADER.size + offset
+                self._columns[name.rstrip(b"\0").decode("ascii")] = (
+                    view[start:start + length * array(typecode).itemsize].cast(typecode)
+                )
+
+    def column(self, name: str) -> memoryview:
+        """Zero-copy view of one column array, e.g. "basic_rates.basic_rate"."""
+        return self._columns[name]
+
+    def strings(self) -> List[str]:
+        """The interned strings, indexed by id."""
+        offsets, data = self._columns["strings.offsets"], self._columns["strings.data"]
+        return [
+            sys.intern(bytes(data[offsets[i]:offsets[i + 1]]).decode("utf-8")) for i in range(len(offsets) - 1)
+        ]
+
+    def rows(self) -> Dict[str, List[tuple]]:
+        """RateBook constructor rows, as RateBook.fetch_rows() returns them."""
+        strings = self.strings()
+
+        def decode(section, field, kind):
+            name = f"{section}.{field}"
+            if kind == "str":
+                return [None if i == _NO_STRING else strings[i] for i in self._columns[name]]
+            exponents = self._columns[f"{name}.exp"]
+            return [None if e == _NO_DECIMAL else Decimal(m).scaleb(e)
+                    for m, e in zip(self._columns[name], exponents)]
+
+        return {
+            section: list(zip(*[decode(section, field, kind) for field, kind in fields]))
+            for section, fields in SECTIONS.items()
+        }
+
+    def close(self) -> None:
+        self._columns = {}
+        self._map.close()
+
+
+def load_rate_book(path: str, verify: bool = True) -> RateBook:
+    """RateBook built from the artifact at `path`; raises ValueError if it is corrupt or out of date."""
+    artifact = RateArtifact(path, verify=verify)
+    try:
+        book = RateBook(**artifact.rows())
+        version = artifact.version
+    finally:
+        artifact.close()
+    if book.version != version:
+        raise ValueError(f"{path} rows hash to {book.version}, header says {version}")
+    return book
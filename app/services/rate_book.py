@@ -0,0 +1,278 @@
+"""
+RateBook: immutable in-memory snapshot of the rating tables.
+
+Loaded once from rate_lookup_flat (or product_basic_rates joined to
+occupancies before the first seed has built it), occupancies,
+terrorism_slabs and add_on_rates, then used for every rating lookup so a quote no longer costs
+one DB round trip per rate. A reload builds a complete new snapshot and
+swaps the module-level reference in a single assignment, so readers always
+see either the old or the new version, never a mix.
+"""
+import hashlib
+import logging
+import threading
+import time
+from decimal import Decimal
+from types import MappingProxyType
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import inspect, text
+
+from app.config import settings
+from app.database import async_read_connection, read_connection
+from app.services.slab_index import SlabIndex
+from app.services.add_on_rules import CompiledAddOnRule, compile_add_on_rules
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_OCCUPANCY_TYPE = "Residential"
+
+BASIC_RATES_SQL = text("""
+    SELECT r.product_code, o.iib_code, r.basic_rate
+    FROM product_basic_rates r
+    JOIN occupancies o ON r.occupancy_id = o.id
+    ORDER BY r.id
+""")
+
+# Same rows as BASIC_RATES_SQL, pre-joined by seed.py (app/services/rate_lookup.py)
+FLAT_BASIC_RATES_SQL = text("SELECT product_code, iib_code, basic_rate FROM rate_lookup_flat")
+
+OCCUPANCIES_SQL = text("SELECT iib_code, occupancy_type FROM occupancies")
+
+TERRORISM_SLABS_SQL = text("""
+    SELECT product_code, occupancy_type, si_min, si_max, rate_per_mille
+    FROM terrorism_slabs
+    WHERE product_code IS NOT NULL
+""")
+
+# add_on_rates has no add_on_code column of its own; the code lives on
+# add_on_master and occupancy_type carries the occupancy rule (same mapping
+# as /api/add-on-rates).
+ADD_ON_RATES_SQL = text("""
+    SELECT r.product_code, m.add_on_code, r.rate_type, r.rate_value,
+           r.occupancy_type AS occupancy_rule, r.active
+    FROM add_on_rates r
+    JOIN add_on_master m ON r.add_on_id = m.id
+    ORDER BY r.id
+""")
+
+
+def _to_decimal(value) -> Decimal:
+    return Decimal(str(value))
+
+
+class RateBook:
+    """
+    Read-only snapshot of all rates needed by the rating engine.
+
+    All maps are exposed as MappingProxyType so callers cannot mutate a
+    published snapshot.
+    """
+
+    def __init__(
+        self,
+        basic_rates: Iterable[Tuple[str, str, object]],
+        occupancy_types: Iterable[Tuple[str, str]],
+        terrorism_slabs: Iterable[Tuple[str, str, object, object, object]],
+        add_on_rates: Iterable[Tuple[str, str, str, object, Optional[str]]],
+    ):
+        basic: Dict[Tuple[str, str], Decimal] = {}
+        for product_code, iib_code, rate in basic_rates:
+            # First row wins, matching the old "LIMIT 1" query
+            basic.setdefault((product_code, iib_code), _to_decimal(rate))
+
+        occ_types = {code: occ_type for code, occ_type in occupancy_types if code}
+
+        slabs: Dict[Tuple[str, str], List[Tuple[Decimal, Optional[Decimal], Decimal]]] = {}
+        for product_code, occ_type, si_min, si_max, rate in terrorism_slabs:
+            slabs.setdefault((product_code, occ_type), []).append((
+                _to_decimal(si_min),
+                _to_decimal(si_max) if si_max is not None else None,
+                _to_decimal(rate),
+            ))
+
+        add_ons: Dict[Tuple[str, str], List[Tuple[Optional[str], str, Decimal]]] = {}
+        for product_code, add_on_code, rate_type, rate_value, rule in add_on_rates:
+            add_ons.setdefault((product_code, add_on_code), []).append(
+                (rule, rate_type, _to_decimal(rate_value))
+            )
+
+        self.basic_rates = MappingProxyType(basic)
+        self.occupancy_types = MappingProxyType(occ_types)
+        self.terrorism_slabs = MappingProxyType({k: SlabIndex(v) for k, v in slabs.items()})
+        self.add_on_rules = MappingProxyType({
+            product_code: MappingProxyType(rules)
+            for product_code, rules in compile_add_on_rules(add_ons).items()
+        })
+        self.version = self._fingerprint(add_ons)
+        self.loaded_at = time.time()
+
+    def _fingerprint(self, add_on_rows) -> str:
+        """Content hash, so identical data always yields the same version."""
+        h = hashlib.sha256()
+        slab_entries = {k: v.entries() for k, v in self.terrorism_slabs.items()}
+        for section in (self.basic_rates, self.occupancy_types, slab_entries, add_on_rows):
+            for key in sorted(section, key=repr):
+                h.update(repr((key, section[key])).encode("utf-8"))
+            h.update(b"|")
+        return h.hexdigest()[:16]
+
+    @staticmethod
+    def fetch_rows(conn) -> Dict[str, List[tuple]]:
+        """
+        Raw constructor arguments as plain tuples. Unlike a RateBook these
+        pickle, so they can be shipped to worker processes.
+        """
+        add_on_rows = [
+            (r.product_code, r.add_on_code, r.rate_type, r.rate_value, r.occupancy_rule)
+            for r in conn.execute(ADD_ON_RATES_SQL)
+            if r.active is None or bool(r.active)
+        ]
+        basic_rows = []
+        if inspect(conn).has_table("rate_lookup_flat"):
+            basic_rows = [tuple(r) for r in conn.execute(FLAT_BASIC_RATES_SQL)]
+        if not basic_rows:
+            # Not seeded since rate_lookup_flat was added
+            basic_rows = [tuple(r) for r in conn.execute(BASIC_RATES_SQL)]
+        return {
+            "basic_rates": basic_rows,
+            "occupancy_types": [tuple(r) for r in conn.execute(OCCUPANCIES_SQL)],
+            "terrorism_slabs": [tuple(r) for r in conn.execute(TERRORISM_SLABS_SQL)],
+            "add_on_rates": add_on_rows,
+        }
+
+    @classmethod
+    def load(cls, conn) -> "RateBook":
+        """Build a snapshot from the database using an open connection."""
+        return cls(**cls.fetch_rows(conn))
+
+    def occupancy_type(self, occupancy_code: Optional[str]) -> str:
+        if occupancy_code:
+            return self.occupancy_types.get(occupancy_code, DEFAULT_OCCUPANCY_TYPE)
+        return DEFAULT_OCCUPANCY_TYPE
+
+    def basic_rate(self, product_code: str, occupancy_code: str) -> Optional[Decimal]:
+        return self.basic_rates.get((product_code, occupancy_code))
+
+    def slab_issues(self) -> Dict[Tuple[str, str], List[str]]:
+        """Gaps/overlaps found while indexing terrorism slabs, by (product, occupancy type)."""
+        return {key: index.issues for key, index in self.terrorism_slabs.items() if index.issues}
+
+    def terrorism_rate(self, product_code: str, occupancy_type: str, tsi: float) -> Optional[Decimal]:
+        """
+        Rate of the slab containing tsi. When two slabs share a boundary the
+        one with the higher si_min wins (the old ORDER BY si_min DESC).
+        """
+        index = self.terrorism_slabs.get((product_code, occupancy_type))
+        if index is None:
+            return None
+        return index.resolve(tsi)
+
+    def add_on_rate(self, product_code: str, add_on_code: str,
+                    occupancy_code: Optional[str] = None) -> Optional[Tuple[str, Decimal]]:
+        """Applicable (rate_type, rate_value) under the compiled occupancy rules, or None."""
+        rule: Optional[CompiledAddOnRule] = self.add_on_rules.get(product_code, {}).get(add_on_code)
+        if rule is None:
+            return None
+        return rule.resolve(occupancy_code)
+
+    def applicable_add_ons(self, product_code: str,
+                           occupancy_code: Optional[str] = None) -> Dict[str, Tuple[str, Decimal]]:
+        """Every add-on with a rate for this product and occupancy, keyed by add_on_code."""
+        applicable = {}
+        for add_on_code, rule in self.add_on_rules.get(product_code, {}).items():
+            entry = rule.resolve(occupancy_code)
+            if entry is not None:
+                applicable[add_on_code] = entry
+        return applicable
+
+
+_rate_book: Optional[RateBook] = None
+_reload_lock = threading.Lock()
+
+
+def _load_artifact() -> Optional[RateBook]:
+    """Snapshot from RATE_ARTIFACT_PATH, or None (database) when unset or unusable."""
+    path = settings.RATE_ARTIFACT_PATH
+    if not path:
+        return None
+    from app.services.rate_artifact import load_rate_book
+    try:
+        return load_rate_book(path)
+    except (OSError, ValueError) as e:
+        logger.error(f"Rate artifact {path} not loaded, reading rates from the database: {e}")
+        return None
+
+
+def reload_rate_book(bind=None) -> RateBook:
+    """
+    Load a fresh snapshot and publish it atomically. The source is the rate
+    artifact when RATE_ARTIFACT_PATH is set, otherwise the database (the read
+    replica when configured); an explicit `bind` always reads the database.
+    A reload that follows a write must pass the primary engine: the replica
+    may not have the new rows yet, and its snapshot would stay published.
+    """
+    with _reload_lock:
+        book = _load_artifact() if bind is None else None
+        if book is None:
+            with (bind.connect() if bind is not None else read_connection()) as conn:
+                book = RateBook.load(conn)
+        return _publish(book)
+
+
+async def reload_rate_book_async(bind=None) -> RateBook:
+    """reload_rate_book over the async engine; the event loop is not blocked while the tables are read."""
+    book = _load_artifact() if bind is None else None
+    if book is None:
+        async with (bind.connect() if bind is not None else async_read_connection()) as conn:
+            book = await conn.run_sync(RateBook.load)
+    with _reload_lock:
+        return _publish(book)
+
+
+def _publish(book: RateBook) -> RateBook:
+    global _rate_book
+    previous = _rate_book
+    _rate_book = book
+    if previous is None or previous.version != book.version:
+        logger.info(
+            f"RateBook {book.version} published: {len(book.basic_rates)} basic rates, "
+            f"{len(book.terrorism_slabs)} terrorism slab groups, {sum(len(r) for r in book.add_on_rules.values())} add-on rate groups"
+        )
+        for (product_code, occ_type), issues in book.slab_issues().items():
+            logger.error(f"Terrorism slabs for {product_code}/{occ_type} are not contiguous: {'; '.join(issues)}")
+    return book
+
+
+def _is_stale(book: Optional[RateBook]) -> bool:
+    if book is None:
+        return True
+    max_age = settings.RATE_BOOK_REFRESH_SECONDS
+    return max_age > 0 and time.time() - book.loaded_at > max_age
+
+
+def get_rate_book() -> RateBook:
+    """
+    Current snapshot, loaded on first use. A snapshot older than
+    RATE_BOOK_REFRESH_SECONDS (default 300, 0 = never) is reloaded so other
+    workers pick up reseeds.
+    """
+    book = _rate_book
+    if _is_stale(book):
+        return reload_rate_book()
+    return book
+
+
+async def get_rate_book_async() -> RateBook:
+    """get_rate_book for async routes: (re)loads through the async engine."""
+    book = _rate_book
+    if _is_stale(book):
+        return await reload_rate_book_async()
+    return book
+
+
+def set_rate_book(book: Optional[RateBook]) -> None:
+    """Publish a pre-built snapshot (or clear it so the next lookup reloads)."""
+    global _rate_book
+    with _reload_lock:
+        _rate_book = book
@@ -0,0 +1,72 @@
+"""
+rate_lookup_flat: one denormalized row per (product_code, iib_code).
+
+Holds the basic rate together with the occupancy id/type, STFI rate and the
+four EQ zone rates, so a lookup is a single primary-key read instead of a
+join through occupancies plus one query per rate table. The table is owned
+by seed.py, which rebuilds it with one INSERT ... SELECT in the seeding
+transaction; nothing else writes to it.
+"""
+import logging
+from typing import Any, Dict, Optional
+
+from sqlalchemy import select, text
+
+from app.models.fire_models import RateLookupFlat
+
+logger = logging.getLogger(__name__)
+
+EQ_ZONE_COLUMNS = {
+    "Zone I": "eq_zone_i",
+    "Zone II": "eq_zone_ii",
+    "Zone III": "eq_zone_iii",
+    "Zone IV": "eq_zone_iv",
+}
+
+_EQ_PIVOT = ",\n           ".join(
+    f"MAX(CASE WHEN eq_zone = '{zone}' THEN eq_rate END) AS {column}" for zone, column in EQ_ZONE_COLUMNS.items()
+)
+
+# First product_basic_rates row per (product, occupancy) wins, as in RateBook
+REFRESH_SQL = text(f"""
+    INSERT INTO rate_lookup_flat (
+        product_code, iib_code, occupancy_id, occupancy_type, basic_rate, stfi_rate,
+        {", ".join(EQ_ZONE_COLUMNS.values())}
+    )
+    SELECT r.product_code, o.iib_code, o.id, o.occupancy_type, r.basic_rate, s.stfi_rate,
+           {", ".join(f"e.{c}" for c in EQ_ZONE_COLUMNS.values())}
+    FROM product_basic_rates r
+    JOIN occupancies o ON o.id = r.occupancy_id
+    LEFT JOIN (
+        SELECT occupancy_id, MIN(stfi_rate) AS stfi_rate FROM stfi_rates GROUP BY occupancy_id
+    ) s ON s.occupancy_id = r.occupancy_id
+    LEFT JOIN (
+        SELECT occupancy_id,
+           {_EQ_PIVOT}
+        FROM eq_rates
+        GROUP BY occupancy_id
+    ) e ON e.occupancy_id = r.occupancy_id
+    WHERE r.id IN (SELECT MIN(id) FROM product_basic_rates GROUP BY product_code, occupancy_id)
+""")
+
+
+def refresh_rate_lookup_flat(conn) -> int:
+    """Rebuild the flat table from the source tables; runs in the caller's transaction."""
+    conn.execute(RateLookupFlat.__table__.delete())
+    conn.execute(REFRESH_SQL)
+    count = conn.execute(text("SELECT COUNT(*) FROM rate_lookup_flat")).scalar()
+    logger.info(f"rate_lookup_flat refreshed: {count} rows")
+    return count
+
+
+def get_flat_rate(conn, product_code: str, iib_code: str) -> Optional[Dict[str, Any]]:
+    """All rates for one (product, occupancy) by primary key, or None."""
+    table = RateLookupFlat.__table__
+    row = conn.execute(
+        select(table).where(table.c.product_code == product_code, table.c.iib_code == iib_code)
+    ).mappings().first()
+    if row is None:
+        return None
+    flat = dict(row)
+    flat["eq_rates"] = {zone: flat.pop(column) for zone, column in EQ_ZONE_COLUMNS.items()}
+    return flat
@@ -0,0 +1,96 @@
+"""
+Batch rate resolver for FirePremiumCalculator.
+
+Resolves every rate a UBGR/UVGR/UVGS quote needs (basic, terrorism, each
+selected add-on and PA) against a single RateBook snapshot up front, so the
+calculator never goes back to the rate store mid-quote and the cost of a
+quote no longer grows with the number of add-ons selected.
+"""
+import logging
+from decimal import Decimal
+from typing import Dict, Optional, Tuple
+
+from app.schemas.fire_premium import UBGRUVGRRequest
+from app.services.rate_book import RateBook, get_rate_book
+
+logger = logging.getLogger(__name__)
+
+TERRORISM_PRODUCTS = {'UBGR', 'BGR'}
+NO_TERRORISM_PRODUCTS = {'UVGR', 'UVGS'}
+PA_ADD_ON_CODES = ("PA_PROPOSER", "PA_SPOUSE")
+MISSING_ADD_ON_RATE = ("fixed", Decimal("0.0"))
+
+
+class ResolvedRates:
+    """All rates for one quote, taken from one RateBook version."""
+
+    __slots__ = (
+        "product_code", "occupancy_code", "occupancy_type", "rate_version",
+        "basic_rate", "terrorism_rate", "add_on_rates",
+    )
+
+    def __init__(self, product_code: str, occupancy_code: str, occupancy_type: str, rate_version: str,
+                 basic_rate: Optional[Decimal], terrorism_rate: Optional[Decimal],
+                 add_on_rates: Dict[str, Tuple[str, Decimal]]):
+        self.product_code = product_code
+        self.occupancy_code = occupancy_code
+        self.occupancy_type = occupancy_type
+        self.rate_version = rate_version
+        self.basic_rate = basic_rate
+        self.terrorism_rate = terrorism_rate
+        self.add_on_rates = add_on_rates
+
+    def add_on_rate(self, add_on_code: str) -> Tuple[str, Decimal]:
+        return self.add_on_rates.get(add_on_code, MISSING_ADD_ON_RATE)
+
+
+def resolve_rates(request: UBGRUVGRRequest, book: Optional[RateBook] = None) -> ResolvedRates:
+    """
+    Resolve the full rate bundle for a request.
+
+    terrorism_rate is Decimal("0") for products without terrorism cover and
+    None when a terrorism product has no matching slab.
+    """
+    book = book or get_rate_book()
+    product_code = request.productCode.upper()
+    occupancy_code = request.occupancyCode
+    occupancy_type = book.occupancy_type(occupancy_code)
+
+    basic_rate = book.basic_rate(product_code, occupancy_code)
+    if basic_rate is None:
+        logger.warning(f"No basic rate found: Product={product_code}, Occ={occupancy_code}")
+
+    terrorism_rate: Optional[Decimal] = None
+    if product_code in TERRORISM_PRODUCTS:
+        total_si = request.buildingSI + request.contentsSI
+        terrorism_rate = book.terrorism_rate(product_code, occupancy_type, total_si)
+        if terrorism_rate is None:
+            logger.error(f"No terrorism slab found for Product={product_code}, Type={occupancy_type}, TSI={total_si}")
+    elif product_code in NO_TERRORISM_PRODUCTS:
+        terrorism_rate = Decimal("0")
+
+    wanted = [addon.addOnCode for addon in request.addOns]
+    if request.paSelection.proposer:
+        wanted.append(PA_ADD_ON_CODES[0])
+    if request.paSelection.spouse:
+        wanted.append(PA_ADD_ON_CODES[1])
+
+    add_on_rates: Dict[str, Tuple[str, Decimal]] = {}
+    for add_on_code in wanted:
+        if add_on_code in add_on_rates:
+            continue
+        entry = book.add_on_rate(product_code, add_on_code, occupancy_code)
+        if entry is None:
+            logger.warning(f"No matching add-on rate found: Product={product_code}, AddOn={add_on_code}, Occ={occupancy_code}")
+            entry = MISSING_ADD_ON_RATE
+        add_on_rates[add_on_code] = entry
+
+    return ResolvedRates(
+        product_code=product_code,
+        occupancy_code=occupancy_code,
+        occupancy_type=occupancy_type,
+        rate_version=book.version,
+        basic_rate=basic_rate,
+        terrorism_rate=terrorism_rate,
+        add_on_rates=add_on_rates,
+    )
@@ -1,133 +1,104 @@
 import os
 import logging
 from decimal import Decimal
+from fractions import Fraction
 from typing import Optional, Tuple
-from sqlalchemy import create_engine, text
 from app.schemas.rating_engine import RatingRequest, RatingResponse
-from app.utils.rating_engine import round_currency
-from app.database import engine
+from app.utils.money import Money, exact_ratio
+from app.services.rate_book import RateBook, get_rate_book, get_rate_book_async
 
 logger = logging.getLogger(__name__)
 
-def get_basic_rate_per_mille(product_code: str, occupancy_code: str, period_years: int = 1) -> Decimal:
+def get_basic_rate_per_mille(product_code: str, occupancy_code: str, period_years: int = 1,
+                             book: Optional[RateBook] = None) -> Decimal:
     """
     Fetches the basic rate per mille for a given product and occupancy code (iib_code).
+    Served from the in-memory RateBook snapshot.
     """
-    stmt = text("""
-        SELECT r.basic_rate 
-        FROM product_basic_rates r
-        JOIN occupancies o ON r.occupancy_id = o.id
-        WHERE r.product_code = :p 
-          AND o.iib_code = :o 
-        LIMIT 1
-    """)
     try:
-        with engine.connect() as conn:
-            # Note: period_years removed as it's not in the schema currently
-            result = conn.execute(stmt, {"p": product_code, "o": occupancy_code}).scalar()
-            if result is not None:
-                return Decimal(str(result))
-            
-            logger.warning(f"No basic rate found: Product={product_code}, Occ={occupancy_code}")
-            return Decimal("0.0")
+        # Note: period_years removed as it's not in the schema currently
+        rate = (book or get_rate_book()).basic_rate(product_code, occupancy_code)
+        if rate is not None:
+            return rate
+
+        logger.warning(f"No basic rate found: Product={product_code}, Occ={occupancy_code}")
+        return Decimal("0.0")
     except Exception as e:
         logger.error(f"DB Error (get_basic_rate_per_mille): {e}")
         return Decimal("0.0")
 
-def get_terrorism_rate_per_mille(product_code: str, occupancy_code: Optional[str] = "1001", tsi: float = 0.0) -> Decimal:
+def get_terrorism_rate_per_mille(product_code: str, occupancy_code: Optional[str] = "1001", tsi: float = 0.0,
+                                 book: Optional[RateBook] = None) -> Decimal:
     """
     Fetches the terrorism rate based on TSI slabs.
     Matches product, occupancy type, and TSI range.
     """
-    # First get occupancy type for the code
-    occ_type = "Residential" # Default
     logger.info(f"Using Occupancy Code: {occupancy_code}") # Task: Log Selected occupancy_code
-    
-    if occupancy_code:
-        # Resolve type
-        stmt_type = text("SELECT occupancy_type FROM occupancies WHERE iib_code = :c")
-        with engine.connect() as conn:
-             res = conn.execute(stmt_type, {"c": occupancy_code}).scalar()
-             if res:
-                 occ_type = res
-
-    logger.info(f"Looking up Terrorism Rate: Product={product_code}, OccType={occ_type}, TSI={tsi}")
-
-    # Query with TSI range check & Deterministic Ordering
-    stmt = text("""
-        SELECT rate_per_mille 
-        FROM terrorism_slabs 
-        WHERE product_code = :p 
-          AND occupancy_type = :ot
-          AND si_min <= :tsi
-          AND (si_max IS NULL OR si_max >= :tsi)
-        ORDER BY si_min DESC  -- Deterministic: Pick strict match if multiple ranges overlap (unlikely but safe)
-        LIMIT 1
-    """)
-    
+
     try:
-        with engine.connect() as conn:
-            result = conn.execute(stmt, {"p": product_code, "ot": occ_type, "tsi": tsi}).scalar()
-            
-            if result is not None:
-                rate = Decimal(str(result))
-                logger.info(f"✅ Selected terrorism rate: {rate} per mille") 
-                return rate
-            
-            # Explicit failure if no slab matches
-            error_msg = f"No terrorism slab found for Product={product_code}, Type={occ_type}, TSI={tsi}"
-            logger.error(error_msg)
-            raise ValueError(error_msg)
-            
+        book = book or get_rate_book()
+        occ_type = book.occupancy_type(occupancy_code)
+        logger.info(f"Looking up Terrorism Rate: Product={product_code}, OccType={occ_type}, TSI={tsi}")
+
+        rate = book.terrorism_rate(product_code, occ_type, tsi)
+        if rate is not None:
+            logger.info(f"✅ Selected terrorism rate: {rate} per mille")
+            return rate
+
+        # Explicit failure if no slab matches
+        error_msg = f"No terrorism slab found for Product={product_code}, Type={occ_type}, TSI={tsi}"
+        logger.error(error_msg)
+        raise ValueError(error_msg)
+
     except Exception as e:
         logger.error(f"DB Error (get_terrorism_rate_per_mille): {e}")
         raise e
 
-def get_add_on_rate(product_code: str, add_on_code: str, occupancy_code: Optional[str] = None) -> Tuple[str, Decimal]:
+def get_add_on_rate(product_code: str, add_on_code: str, occupancy_code: Optional[str] = None,
+                    book: Optional[RateBook] = None) -> Tuple[str, Decimal]:
     """
     Fetches add-on rate. Handles flexible occupancy rules:
     - rule is NULL or 'ALL' -> Applies to everyone
     - rule is 'ONLY_<code>' -> Applies if occupancy_code == code
     - rule is 'EXCEPT_<code>' -> Applies if occupancy_code != code
     """
-    stmt = text("""
-        SELECT rate_type, rate_value, occupancy_rule 
-        FROM add_on_rates 
-        WHERE product_code = :p 
-          AND add_on_code = :a 
-    """)
     try:
-        with engine.connect() as conn:
-            rows = conn.execute(stmt, {"p": product_code, "a": add_on_code}).fetchall()
-            
-            # Filter logic
-            for row in rows:
-                rule = row.occupancy_rule
-                
-                # Match logic
-                match = False
-                if not rule or rule.upper() == 'ALL':
-                    match = True
-                elif occupancy_code:
-                    if rule.startswith('ONLY_'):
-                        target = rule.replace('ONLY_', '')
-                        if occupancy_code == target:
-                            match = True
-                    elif rule.startswith('EXCEPT_'):
-                        target = rule.replace('EXCEPT_', '')
-                        if occupancy_code != target:
-                            match = True
-                
-                if match:
-                    return (row.rate_type, Decimal(str(row.rate_value)))
-            
-            logger.warning(f"No matching add-on rate found: Product={product_code}, AddOn={add_on_code}, Occ={occupancy_code}")
-            return ("fixed", Decimal("0.0"))
-            
+        match = (book or get_rate_book()).add_on_rate(product_code, add_on_code, occupancy_code)
+        if match is not None:
+            return match
+
+        logger.warning(f"No matching add-on rate found: Product={product_code}, AddOn={add_on_code}, Occ={occupancy_code}")
+        return ("fixed", Decimal("0.0"))
+
     except Exception as e:
         logger.error(f"DB Error (get_add_on_rate): {e}")
         return ("fixed", Decimal("0.0"))
 
+# -------------------------------
+# Async variants: same lookups, but a (re)load of the RateBook goes through
+# the async engine instead of blocking the event loop.
+# -------------------------------
+
+async def get_basic_rate_per_mille_async(product_code: str, occupancy_code: str, period_years: int = 1) -> Decimal:
+    try:
+        book = await get_rate_book_async()
+    except Exception as e:
+        logger.error(f"DB Error (get_basic_rate_per_mille_async): {e}")
+        return Decimal("0.0")
+    return get_basic_rate_per_mille(product_code, occupancy_code, period_years, book=book)
+
+async def get_terrorism_rate_per_mille_async(product_code: str, occupancy_code: Optional[str] = "1001", tsi: float = 0.0) -> Decimal:
+    book = await get_rate_book_async()
+    return get_terrorism_rate_per_mille(product_code, occupancy_code, tsi, book=book)
+
+async def get_add_on_rate_async(product_code: str, add_on_code: str, occupancy_code: Optional[str] = None) -> Tuple[str, Decimal]:
+    try:
+        book = await get_rate_book_async()
+    except Exception as e:
+        logger.error(f"DB Error (get_add_on_rate_async): {e}")
+        return ("fixed", Decimal("0.0"))
+    return get_add_on_rate(product_code, add_on_code, occupancy_code, book=book)
+
 class RatingService:
     @staticmethod
     def calculate_premium(request: RatingRequest) -> RatingResponse:
@@ -138,32 +109,33 @@ class RatingService:
         request implies a lookup (not implemented in this step to preserve existing API contract).
         """
         
-        base_premium = round_currency(request.sum_insured * request.rate / 1000)
+        base = Money.from_rupees(request.sum_insured).apply_rate(request.rate, 1000)
+        base_premium = base.to_rupees()
         
-        current_premium = base_premium
+        current = base
         breakdown = {"base": base_premium}
         
         # Apply loadings
-        total_loading = sum(request.loadings_pct)
-        loading_amount = round_currency(base_premium * total_loading / 100)
-        current_premium += loading_amount
-        breakdown["loadings"] = loading_amount
+        total_loading = sum(Fraction(*exact_ratio(pct)) for pct in request.loadings_pct)
+        loading = base.percent(total_loading)
+        current += loading
+        breakdown["loadings"] = loading.to_rupees()
         
         # Apply discounts
-        total_discount = sum(request.discounts_pct)
-        discount_amount = round_currency(current_premium * total_discount / 100)
-        current_premium -= discount_amount
-        breakdown["discounts"] = discount_amount
+        total_discount = sum(Fraction(*exact_ratio(pct)) for pct in request.discounts_pct)
+        discount = current.percent(total_discount)
+        current -= discount
+        breakdown["discounts"] = discount.to_rupees()
         
-        net_premium = max(0, current_premium)
+        net = max(Money(0), current)
+        net_premium = net.to_rupees()
         
         # GST (18%)
-        gst_rate = 0.18
-        total_gst = round_currency(net_premium * gst_rate)
-        cgst = round_currency(total_gst / 2)
-        sgst = round_currency(total_gst / 2)
+        total_gst = net.percent(18)
+        cgst = total_gst.apply_rate(1, 2).to_rupees()
+        sgst = total_gst.apply_rate(1, 2).to_rupees()
         
-        final_premium = round_currency(net_premium + total_gst)
+        final_premium = (net + total_gst).to_rupees()
         
         return RatingResponse(
             base_premium=base_premium,
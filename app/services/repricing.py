@@ -0,0 +1,184 @@
+"""
+Renewal repricing over stored quotes.
+
+Streams irisk_quotes in keyset-paginated pages (WHERE id > last ORDER BY id),
+re-prices each stored UIIC fire request against the current rate data and
+writes a compact CSV of the quotes whose premium moved. Pricing runs in a
+process pool; at most `workers * 2` pages are in flight, so memory stays
+bounded by the page size no matter how large the table is.
+"""
+import csv
+import logging
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Iterator, List, Mapping, Optional, Sequence, TextIO, Tuple
+
+from sqlalchemy import select
+
+from app.models.quote import Quote
+from app.schemas.uiic_fire import FireCalcRequest, UBGRRequest
+from app.services.fire_pricing import (
+    BUILDING_PRODUCTS,
+    load_insurer_rates,
+    normalize_occupancy,
+    price_bgrp,
+    price_building_product,
+    resolve_building_rate
+)
+from app.services.quote_store import premiums, quote_data
+from app.services.rate_book import RateBook
+
+logger = logging.getLogger(__name__)
+
+DIFF_COLUMNS = ("quote_id", "product", "status", "old_net", "new_net", "old_gross", "new_gross", "delta_gross", "error")
+
+# (id, product, request, response) with the stored payload already decoded
+QuoteRow = Tuple[int, str, dict, dict]
+
+
+class RepricingContext:
+    """Everything a pricing worker needs: a RateBook plus the UIIC irisk_rates map."""
+
+    def __init__(self, book: RateBook, insurer_rates: Mapping[Tuple[str, str], float]):
+        self.book = book
+        self.insurer_rates = insurer_rates
+
+    @classmethod
+    def from_snapshot(cls, snapshot: Dict[str, Any]) -> "RepricingContext":
+        return cls(RateBook(**snapshot["book_rows"]), snapshot["insurer_rates"])
+
+
+def load_snapshot(conn) -> Dict[str, Any]:
+    """Current rate data as plain (picklable) rows, shipped once to each worker."""
+    return {"book_rows": RateBook.fetch_rows(conn), "insurer_rates": load_insurer_rates(conn, "UIIC")}
+
+
+def reprice_request(product_code: str, request_data: dict, context: RepricingContext) -> Dict[str, Any]:
+    """Re-run one stored request through the same pricing the UIIC routes use."""
+    if product_code == "BGRP":
+        return price_bgrp(UBGRRequest(**request_data), context.book)
+    if product_code in BUILDING_PRODUCTS:
+        payload = FireCalcRequest(**request_data)
+        rate = resolve_building_rate(context.insurer_rates, product_code, normalize_occupancy(payload.occupancy))
+        return price_building_product(product_code, payload, rate)
+    raise ValueError(f"Repricing not supported for product {product_code}")
+
+
+def reprice_rows(rows: Sequence[QuoteRow], context: RepricingContext) -> Tuple[List[tuple], Dict[str, int]]:
+    """Reprice a page of quotes; returns diff rows (changed or failed only) and counts."""
+    diffs: List[tuple] = []
+    counts = {"scanned": 0, "changed": 0, "unchanged": 0, "errors": 0}
+    for quote_id, product_code, request_data, response_data in rows:
+        counts["scanned"] += 1
+        old_net, old_gross = premiums(response_data)
+        try:
+            new_net, new_gross = premiums(reprice_request(product_code, request_data or {}, context))
+        except Exception as e:
+            counts["errors"] += 1
+            diffs.append((quote_id, product_code, "error", old_net, None, old_gross, None, None, str(e)))
+            continue
+        if new_net == old_net and new_gross == old_gross:
+            counts["unchanged"] += 1
+            continue
+        counts["changed"] += 1
+        delta = round(new_gross - old_gross, 2) if old_gross is not None else None
+        diffs.append((quote_id, product_code, "changed", old_net, new_net, old_gross, new_gross, delta, ""))
+    return diffs, counts
+
+
+# Per-process context, built once by the pool initializer
+_worker_context: Optional[RepricingContext] = None
+
+
+def _init_worker(snapshot: Dict[str, Any]) -> None:
+    global _worker_context
+    _worker_context = RepricingContext.from_snapshot(snapshot)
+
+
+def _reprice_in_worker(rows: Sequence[QuoteRow]):
+    return reprice_rows(rows, _worker_context)
+
+
+def iter_quote_pages(conn, page_size: int, after_id: int = 0, product: Optional[str] = None,
+                     limit: Optional[int] = None) -> Iterator[List[QuoteRow]]:
+    """Keyset pagination over UIIC fire quotes (payloads decoded); never holds more than one page."""
+    table = Quote.__table__
+    remaining = limit
+    while remaining is None or remaining > 0:
+        size = page_size if remaining is None else min(page_size, remaining)
+        query = (
+            select(table.c.id, table.c.product, table.c.request_data, table.c.response_data, table.c.payload)
+            .where(table.c.id > after_id, table.c.company == "UIIC", table.c.lob == "Fire")
+            .order_by(table.c.id)
+            .limit(size)
+        )
+        if product:
+            query = query.where(table.c.product == product)
+        page = [(quote_id, product_code, *quote_data(request_data, response_data, payload))
+                for quote_id, product_code, request_data, response_data, payload in conn.execute(query)]
+        if not page:
+            return
+        yield page
+        after_id = page[-1][0]
+        if remaining is not None:
+            remaining -= len(page)
+
+
+def run_repricing(output: TextIO, bind=None, page_size: int = 1000, workers: Optional[int] = None,
+                  after_id: int = 0, product: Optional[str] = None, limit: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Reprice stored quotes and write the diff CSV to `output`.
+
+    workers=0 prices in-process (useful for small runs and tests); otherwise
+    a ProcessPoolExecutor with `workers` processes (default: CPU count).
+    Returns summary counts, the last quote id seen (to resume with after_id)
+    and the elapsed time.
+    """
+    if bind is None:
+        from app.database import engine as bind
+    if workers is None:
+        workers = os.cpu_count() or 1
+    started = time.perf_counter()
+    totals = {"scanned": 0, "changed": 0, "unchanged": 0, "errors": 0}
+    last_id = after_id
+
+    writer = csv.writer(output)
+    writer.writerow(DIFF_COLUMNS)
+
+    def collect(result):
+        diffs, counts = result
+        writer.writerows(diffs)
+        for key, value in counts.items():
+            totals[key] += value
+
+    with bind.connect() as conn:
+        snapshot = load_snapshot(conn)
+        pages = iter_quote_pages(conn, page_size, after_id=after_id, product=product, limit=limit)
+
+        if workers <= 0:
+            context = RepricingContext.from_snapshot(snapshot)
+            for page in pages:
+                collect(reprice_rows(page, context))
+                last_id = page[-1][0]
+        else:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(snapshot,)) as pool:
+                in_flight = deque()
+                for page in pages:
+                    in_flight.append(pool.submit(_reprice_in_worker, page))
+                    last_id = page[-1][0]
+                    # Bounded window: results are written in page order as the oldest completes
+                    if len(in_flight) >= workers * 2:
+                        collect(in_flight.popleft().result())
+                while in_flight:
+                    collect(in_flight.popleft().result())
+
+    summary = {
+        **totals,
+        "last_quote_id": last_id,
+        "rate_version": RateBook(**snapshot["book_rows"]).version,
+        "elapsed_seconds": round(time.perf_counter() - started, 3),
+    }
+    logger.info(f"Repricing finished: {summary}")
+    return summary
@@ -0,0 +1,78 @@
+"""
+Incremental seeding.
+
+seed_state keeps one row per seeded table with:
+- the sha256 of the table's source CSV;
+- a fingerprint of everything the table is built from;
+- the row count it had after seeding.
+
+The fingerprint covers the CSV, the seeding code (seed.py and the loaders it
+uses, which also hold the inline sample rows), and the fingerprints of the
+tables it takes ids from. seed.py skips a table when the fingerprint and row
+count both match. When nothing changed, a boot costs one state query, one
+count query and hashing the CSVs.
+"""
+import hashlib
+import logging
+import os
+from typing import Any, Dict, Iterable, Optional
+
+from sqlalchemy import inspect, select, text
+
+from app.models.fire_models import SeedState
+from app.services.bulk_seed import SeedReport, merge_rows
+
+logger = logging.getLogger(__name__)
+
+_CHUNK = 1 << 16
+
+
+def file_hash(path: Optional[str]) -> Optional[str]:
+    """sha256 of a file's bytes, or None when there is no file."""
+    if not path or not os.path.exists(path):
+        return None
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(_CHUNK), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def code_hash(paths: Iterable[str]) -> str:
+    """Combined hash of the seeding code, so a code change reseeds everything."""
+    return fingerprint(*(file_hash(p) or "-" for p in paths))
+
+
+def fingerprint(*parts: Optional[str]) -> str:
+    return hashlib.sha256("\x1f".join(p or "-" for p in parts).encode("utf-8")).hexdigest()
+
+
+def load_seed_state(conn) -> Optional[Dict[str, Dict[str, Any]]]:
+    """table -> last recorded state; None when the seed_state table does not exist yet."""
+    if not inspect(conn).has_table(SeedState.__tablename__):
+        return None
+    rows = conn.execute(select(SeedState.__table__)).mappings()
+    return {row["table_name"]: dict(row) for row in rows}
+
+
+def table_counts(conn, tables: Iterable[str]) -> Dict[str, int]:
+    """Row counts of several tables in one round trip."""
+    tables = list(tables)
+    if not tables:
+        return {}
+    row = conn.execute(text(
+        "SELECT " + ", ".join(f"(SELECT COUNT(*) FROM {t}) AS {t}" for t in tables)
+    )).one()
+    return dict(zip(tables, row))
+
+
+def is_current(state: Optional[Dict[str, Any]], source_hash: str, row_count: int) -> bool:
+    return state is not None and state["source_hash"] == source_hash and state["row_count"] == row_count
+
+
+def record_seed_state(conn, entries: Iterable[Dict[str, Any]]) -> None:
+    """Upsert seed_state rows (table_name, source_hash, csv_path, csv_hash, row_count)."""
+    report = SeedReport()
+    merge_rows(conn, SeedState, enumerate(entries, 1), report)
+    for e in report.errors:
+        logger.warning(f"seed_state not recorded: {e['reason']}")
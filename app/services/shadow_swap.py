@@ -0,0 +1,170 @@
+"""
+Blue/green reloads for the rate tables quotes read.
+
+seed.py does not merge product_basic_rates and add_on_rates in place.
+swap_in() does the following:
+
+1. Copies the live table into a shadow table with the same columns, keys,
+   foreign keys and CHECK constraints but no indexes. The CHECKs are read
+   from the live table, since some exist only in migrations.
+2. Merges the stage into the shadow.
+3. Validates the shadow: no repeated merge keys, plus the rules in
+   VALIDATIONS. A failing shadow raises before anything is swapped.
+4. Renames live -> retired and shadow -> live, drops the retired table and
+   replays the live table's CREATE INDEX statements, as the database reports
+   them, so expression and partial indexes come back too. On PostgreSQL
+   the renames give up after SWAP_LOCK_TIMEOUT_MS if a reader still holds
+   the table.
+
+Everything runs in the caller's transaction. Readers keep using the
+untouched live table while the shadow is built and checked; the rename only
+holds them up for the rest of the publish transaction, and after the commit
+they see the new table. When the merge changes nothing, the shadow is
+dropped and the live table is left alone.
+
+Unique constraints are not carried over. Migrations b375605b8b20 and
+e0a5de259a69 dropped them from both tables, and the duplicate-key check on
+the shadow takes their place.
+"""
+import logging
+from typing import Dict, List, Sequence
+
+from sqlalchemy import CheckConstraint, MetaData, Table, UniqueConstraint, func, inspect, insert, select, text
+
+from app.config import settings
+from app.services.bulk_seed import MERGE_KEYS, SeedReport, Stage, merge_stage
+
+logger = logging.getLogger(__name__)
+
+_SHADOW = "__shadow"
+_RETIRED = "__retired"
+
+_ADD_ON_RATE_TYPES = "'FREE', 'POLICY_RATE', 'PER_MILLE', 'PERCENT_OF_BASIC_RATE', 'FLAT', 'MIN_PREMIUM'"
+
+# table -> (condition a bad row matches, what is wrong with it). The add-on rules are rules 2-4 of
+# tests/validate_addon_rates.py; rule 5 (POLICY_RATE = 0) is not enforced because data/add_on_rates.csv prices ESCL that way.
+VALIDATIONS = {
+    "product_basic_rates": [
+        ("basic_rate < 0", "a negative basic_rate"),
+    ],
+    "add_on_rates": [
+        (f"active = true AND UPPER(rate_type) NOT IN ({_ADD_ON_RATE_TYPES})", "an unknown rate_type"),
+        ("active = true AND UPPER(rate_type) = 'PER_MILLE' AND (rate_value <= 0 OR rate_value >= 1000)",
+         "a PER_MILLE rate_value outside (0, 1000)"),
+        ("active = true AND UPPER(rate_type) = 'PERCENT_OF_BASIC_RATE' AND (rate_value <= 0 OR rate_value >= 100)",
+         "a PERCENT_OF_BASIC_RATE rate_value outside (0, 100)"),
+    ],
+}
+
+
+def _shadow_table(target: Table, checks: Sequence[dict] = ()) -> Table:
+    """
+    `target`'s columns, primary key and foreign keys under the shadow name,
+    without indexes or unique constraints. `checks` (from
+    inspect().get_check_constraints() on the live table) replace the model's
+    CHECK constraints.
+    """
+    metadata = MetaData()
+    for fk in target.foreign_keys:
+        # Referenced tables only need to exist in the metadata for the REFERENCES clauses
+        if fk.column.table.name not in metadata.tables:
+            fk.column.table.to_metadata(metadata)
+    shadow = target.to_metadata(metadata, name=f"{target.name}{_SHADOW}")
+    shadow.indexes.clear()
+    for constraint in [c for c in shadow.constraints if isinstance(c, (UniqueConstraint, CheckConstraint))]:
+        shadow.constraints.discard(constraint)
+    for check in checks:
+        shadow.append_constraint(CheckConstraint(check["sqltext"], name=check["name"]))
+    return shadow
+
+
+def drop_shadow(conn, target: Table) -> None:
+    """Remove a shadow left by a failed reload (SQLite runs the CREATE outside the rolled-back transaction)."""
+    _shadow_table(target).drop(conn, checkfirst=True)
+
+
+def _create_shadow(conn, target: Table) -> Table:
+    shadow = _shadow_table(target, inspect(conn).get_check_constraints(target.name))
+    shadow.drop(conn, checkfirst=True)
+    shadow.create(conn)
+    columns = [c.name for c in target.c]
+    conn.execute(insert(shadow).from_select(columns, select(*[target.c[c] for c in columns])))
+    if conn.dialect.name == "postgresql" and "id" in shadow.c:
+        # The copied ids were inserted explicitly; new rows must continue after them
+        conn.execute(text(
+            f"SELECT setval(pg_get_serial_sequence('{shadow.name}', 'id'), "
+            f"COALESCE((SELECT MAX(id) FROM {shadow.name}), 0) + 1, false)"
+        ))
+    return shadow
+
+
+def validate_shadow(conn, shadow: Table, table_name: str) -> List[str]:
+    """Problems that block the swap; empty when the shadow may go live."""
+    problems = []
+    key = [shadow.c[k] for k in MERGE_KEYS[table_name]]
+    repeated = conn.execute(
+        select(func.count()).select_from(select(*key).group_by(*key).having(func.count() > 1).subquery())
+    ).scalar()
+    if repeated:
+        problems.append(f"{repeated} keys ({', '.join(MERGE_KEYS[table_name])}) appear more than once")
+    for condition, issue in VALIDATIONS.get(table_name, ()):
+        bad = conn.execute(text(f"SELECT COUNT(*) FROM {shadow.name} WHERE {condition}")).scalar()
+        if bad:
+            problems.append(f"{bad} rows have {issue}")
+    return problems
+
+
+def _index_ddl(conn, table_name: str) -> List[str]:
+    """CREATE INDEX statements for the live table's secondary indexes, as the database stores them."""
+    if conn.dialect.name == "postgresql":
+        return list(conn.execute(text(
+            "SELECT pg_get_indexdef(indexrelid) FROM pg_index "
+            "WHERE indrelid = CAST(:t AS regclass) AND NOT indisprimary ORDER BY indexrelid"
+        ), {"t": table_name}).scalars())
+    if conn.dialect.name == "sqlite":
+        # Automatic indexes (primary key, UNIQUE) have no SQL and come back with the table
+        return list(conn.execute(text(
+            "SELECT sql FROM sqlite_master WHERE type = 'index' AND tbl_name = :t AND sql IS NOT NULL ORDER BY rowid"
+        ), {"t": table_name}).scalars())
+    statements = []
+    for index in inspect(conn).get_indexes(table_name):
+        columns = index.get("expressions") or index["column_names"]
+        unique = "UNIQUE " if index["unique"] else ""
+        statements.append(f"CREATE {unique}INDEX {index['name']} ON {table_name} ({', '.join(columns)})")
+    return statements
+
+
+def _flip(conn, table_name: str, shadow: Table) -> None:
+    indexes = _index_ddl(conn, table_name)
+    retired = f"{table_name}{_RETIRED}"
+    if conn.dialect.name == "postgresql":
+        # The renames need ACCESS EXCLUSIVE; fail rather than queue forever behind a reader's open transaction
+        conn.execute(text(f"SET LOCAL lock_timeout = {int(settings.SWAP_LOCK_TIMEOUT_MS)}"))
+    conn.execute(text(f"ALTER TABLE {table_name} RENAME TO {retired}"))
+    conn.execute(text(f"ALTER TABLE {shadow.name} RENAME TO {table_name}"))
+    conn.execute(text(f"DROP TABLE {retired}"))
+    # Index names are schema-wide on PostgreSQL, so they can only be reused once the retired table is gone
+    for statement in indexes:
+        conn.execute(text(statement))
+
+
+def swap_in(conn, stage: Stage, report: SeedReport) -> Dict[str, int]:
+    """
+    Merge `stage` into a validated shadow copy of its target and swap the
+    shadow in; runs in the caller's transaction. Raises RuntimeError, with
+    nothing swapped, when the shadow fails validation.
+    """
+    name = stage.target.name
+    shadow = _create_shadow(conn, stage.target)
+    counts = merge_stage(conn, stage, report, into=shadow)
+    if not counts["inserted"] and not counts["updated"]:
+        shadow.drop(conn)
+        return counts
+
+    problems = validate_shadow(conn, shadow, name)
+    if problems:
+        raise RuntimeError(f"Shadow {name} failed validation: {'; '.join(problems)}")
+    _flip(conn, name, shadow)
+    report.record(name, swapped=1)
+    logger.info(f"{name}: shadow swapped in ({counts['inserted']} inserted, {counts['updated']} updated)")
+    return counts
@@ -0,0 +1,71 @@
+"""
+Sorted-interval index for terrorism slab resolution.
+
+Slabs for one (product_code, occupancy_type) are kept as parallel compact
+arrays of lower/upper bounds sorted by si_min, and a TSI is resolved with a
+binary search instead of a range scan. Gaps and overlaps are detected once
+when the index is built.
+"""
+import math
+from array import array
+from bisect import bisect_right
+from decimal import Decimal
+from typing import Iterable, List, Optional, Tuple
+
+
+class SlabIndex:
+    """
+    Closed [si_min, si_max] intervals; si_max None means unbounded. Where two
+    slabs share a boundary value the slab with the higher si_min wins, which is
+    what the old "ORDER BY si_min DESC LIMIT 1" query returned.
+    """
+
+    __slots__ = ("si_min", "si_max", "rates", "issues", "_overlapping")
+
+    def __init__(self, slabs: Iterable[Tuple[Decimal, Optional[Decimal], Decimal]]):
+        ordered = sorted(slabs, key=lambda s: (s[0], math.inf if s[1] is None else s[1]))
+        self.si_min = array("d", (float(s[0]) for s in ordered))
+        self.si_max = array("d", (math.inf if s[1] is None else float(s[1]) for s in ordered))
+        self.rates = tuple(s[2] for s in ordered)
+        self.issues = self._validate()
+        self._overlapping = any(issue.startswith("overlap") for issue in self.issues)
+
+    def __len__(self) -> int:
+        return len(self.rates)
+
+    def _validate(self) -> List[str]:
+        issues = []
+        if not self.rates:
+            return issues
+        if self.si_min[0] > 0:
+            issues.append(f"gap below {self.si_min[0]:.2f}")
+        for i in range(len(self.rates)):
+            if self.si_max[i] < self.si_min[i]:
+                issues.append(f"inverted slab [{self.si_min[i]:.2f}, {self.si_max[i]:.2f}]")
+        for i in range(1, len(self.rates)):
+            prev_max, lo = self.si_max[i - 1], self.si_min[i]
+            if lo > prev_max:
+                issues.append(f"gap between {prev_max:.2f} and {lo:.2f}")
+            elif lo < prev_max:
+                issues.append(f"overlap: slab starting at {lo:.2f} begins before {prev_max:.2f}")
+        return issues
+
+    def resolve(self, tsi: float) -> Optional[Decimal]:
+        """Rate of the slab containing tsi, or None if tsi falls outside every slab."""
+        tsi = float(tsi)
+        i = bisect_right(self.si_min, tsi) - 1
+        if i >= 0 and tsi <= self.si_max[i]:
+            return self.rates[i]
+        if self._overlapping:
+            # A nested slab can hide a wider one further down; keep the old scan semantics
+            for j in range(i - 1, -1, -1):
+                if tsi <= self.si_max[j]:
+                    return self.rates[j]
+        return None
+
+    def entries(self) -> Tuple[Tuple[float, Optional[float], Decimal], ...]:
+        """Slabs as (si_min, si_max, rate) tuples; used for the snapshot fingerprint."""
+        return tuple(
+            (self.si_min[i], None if math.isinf(self.si_max[i]) else self.si_max[i], self.rates[i])
+            for i in range(len(self.rates))
+        )
@@ -0,0 +1,243 @@
+"""
+Warm-up before traffic.
+
+A freshly started worker pays for cold work on its first quotes: opening
+database connections, SQLAlchemy compiling each statement into its cache,
+pydantic building the request and response validators. The warm-up task does
+that work once, in the background right after startup:
+
+    1. opens DB_POOL_SIZE connections on every engine the routes use (primary,
+       async primary and, when READ_DATABASE_URL is set, both replicas);
+    2. makes sure the RateBook is loaded;
+    3. prices one synthetic quote per product through the functions the
+       calculate routes call, and builds the route's response model from it.
+
+`/` keeps answering "running" throughout; `/ready` answers 503 until the
+warm-up has finished, so the load balancer only sends traffic to warm
+workers. Synthetic quotes are never saved to irisk_quotes.
+
+If the primary or async primary engine cannot connect, the worker cannot
+serve quotes: it stays not ready and the whole warm-up is retried every
+retry_seconds. Any other failed step (a replica, a product that cannot be
+priced) is logged and listed in stats() but does not keep the worker out of
+rotation: reads fall back to the primary, and a pricing failure is a data
+problem every worker would hit the same way.
+"""
+import asyncio
+import logging
+import time
+from contextlib import AsyncExitStack, ExitStack
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.pool import QueuePool
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+HOME_PRODUCTS = ("UBGR", "UVGR", "UVGS")
+BUILDING_PRODUCTS = ("VUSP", "BSUSP", "BLUSP", "SFSP", "IAR")
+WARMUP_PRODUCTS = HOME_PRODUCTS + ("BGRP",) + BUILDING_PRODUCTS
+
+# Steps whose failure keeps the worker not ready ("warmup" is a failure to set the steps up)
+BLOCKING_STEPS = frozenset({"primary", "async_primary", "warmup"})
+
+SYNTHETIC_SI = 1_000_000
+_PING = text("SELECT 1")
+
+
+def pool_warm_size(engine, size: int) -> int:
+    """Connections worth opening on `engine`: `size` for a QueuePool, 1 for single-connection pools."""
+    pool = getattr(engine, "sync_engine", engine).pool
+    return max(size, 1) if isinstance(pool, QueuePool) else 1
+
+
+def warm_pool(engine, size: int) -> int:
+    """Hold `size` connections at once, so the pool really opens that many, ping each and return them."""
+    count = pool_warm_size(engine, size)
+    with ExitStack() as stack:
+        for _ in range(count):
+            stack.enter_context(engine.connect()).execute(_PING)
+    return count
+
+
+async def warm_async_pool(engine, size: int) -> int:
+    """warm_pool for an AsyncEngine."""
+    count = pool_warm_size(engine, size)
+    async with AsyncExitStack() as stack:
+        for _ in range(count):
+            conn = await stack.enter_async_context(engine.connect())
+            await conn.execute(_PING)
+    return count
+
+
+async def _home_quote(product_code: str, session) -> None:
+    from app.schemas.fire_premium import UBGRUVGRRequest, UBGRUVGRResponse
+    from app.services.fire_premium_service import FirePremiumCalculator
+
+    payload = UBGRUVGRRequest(productCode=product_code, occupancyCode="1001", buildingSI=SYNTHETIC_SI)
+    breakdown = await FirePremiumCalculator.calculate_ubgr_uvgr_async(payload)
+    UBGRUVGRResponse(success=True, message="Warm-up", productCode=product_code, breakdown=breakdown)
+
+
+async def _bgrp_quote(product_code: str, session) -> None:
+    from app.schemas.response import ResponseModel
+    from app.schemas.uiic_fire import UBGRRequest
+    from app.services.fire_pricing import price_bgrp
+    from app.services.rate_book import get_rate_book_async
+
+    response = price_bgrp(UBGRRequest(buildingSI=SYNTHETIC_SI), await get_rate_book_async())
+    ResponseModel[dict](success=True, message="Warm-up", data=response)
+
+
+async def _building_quote(product_code: str, session) -> None:
+    from app.schemas.response import ResponseModel
+    from app.schemas.uiic_fire import FireCalcRequest
+    from app.services.fire_pricing import (
+        fallback_rate, lookup_insurer_rate, normalize_occupancy, price_building_product,
+    )
+
+    payload = FireCalcRequest(building_si=SYNTHETIC_SI, occupancy="Office")
+    occupancy = normalize_occupancy(payload.occupancy)
+    rate = await lookup_insurer_rate(session, "UIIC", product_code, occupancy)
+    if rate is None:
+        rate = fallback_rate(product_code, occupancy)
+    response = price_building_product(product_code, payload, rate)
+    ResponseModel[dict](success=True, message="Warm-up", data=response)
+
+
+_QUOTERS: Dict[str, Callable[[str, Any], Awaitable[None]]] = {
+    **{code: _home_quote for code in HOME_PRODUCTS},
+    "BGRP": _bgrp_quote,
+    **{code: _building_quote for code in BUILDING_PRODUCTS},
+}
+
+
+class Warmup:
+    """The background warm-up task and the readiness flag `/ready` reports."""
+
+    def __init__(self, enabled: bool = True, pool_size: int = 5,
+                 engines_factory: Optional[Callable[[], Tuple[Dict[str, Any], Dict[str, Any]]]] = None,
+                 session_factory: Optional[Callable] = None, retry_seconds: float = 5.0):
+        self.enabled = enabled
+        self.pool_size = pool_size
+        self.retry_seconds = retry_seconds
+        self._engines_factory = engines_factory
+        self._session_factory = session_factory
+        self._task: Optional[asyncio.Task] = None
+        self.ready = False
+        self.attempts = 0
+        self.duration_ms: Optional[float] = None
+        self.connections: Dict[str, int] = {}
+        self.quotes: Dict[str, float] = {}
+        self.errors: Dict[str, str] = {}
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        """Start warming on the running event loop; with warm-up disabled the worker is ready at once."""
+        if self.running or self.ready:
+            return
+        if not self.enabled:
+            self.ready = True
+            logger.info("Warm-up disabled; worker is ready")
+            return
+        self._task = asyncio.get_running_loop().create_task(self.run())
+
+    async def stop(self) -> None:
+        """Cancel a warm-up that is still running (shutdown during startup)."""
+        if not self.running:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+
+    async def run(self) -> None:
+        started = time.perf_counter()
+        while True:
+            self.attempts += 1
+            self.connections, self.quotes, self.errors = {}, {}, {}
+            # Steps record their own failures; this only catches a failure to set them up
+            await self._step("warmup", self._warm_all())
+            blocking = sorted(BLOCKING_STEPS & set(self.errors))
+            if not blocking:
+                break
+            logger.error(f"Warm-up attempt {self.attempts} failed ({', '.join(blocking)}); "
+                         f"worker stays not ready, retrying in {self.retry_seconds:g}s")
+            await asyncio.sleep(self.retry_seconds)
+        self.duration_ms = round((time.perf_counter() - started) * 1000, 1)
+        self.ready = True
+        logger.info(f"Warm-up finished in {self.duration_ms:.0f} ms: connections {self.connections}, "
+                    f"{len(self.quotes)}/{len(WARMUP_PRODUCTS)} products quoted"
+                    + (f", failed: {sorted(self.errors)}" if self.errors else ""))
+
+    async def _warm_all(self) -> None:
+        sync_engines, async_engines = (self._engines_factory or _default_engines)()
+        for name, engine in sync_engines.items():
+            await self._step(name, self._warm_sync(name, engine))
+        for name, engine in async_engines.items():
+            await self._step(name, self._warm_async(name, engine))
+        if BLOCKING_STEPS & set(self.errors):
+            return  # no point pricing without a database; run() retries
+
+        from app.services.rate_book import get_rate_book_async
+        await self._step("rate_book", get_rate_book_async())
+
+        async with (self._session_factory or _default_session_factory)() as session:
+            for product_code in WARMUP_PRODUCTS:
+                quote_started = time.perf_counter()
+                if await self._step(product_code, _QUOTERS[product_code](product_code, session)):
+                    self.quotes[product_code] = round((time.perf_counter() - quote_started) * 1000, 1)
+                else:
+                    await session.rollback()
+
+    async def _warm_sync(self, name: str, engine) -> None:
+        from starlette.concurrency import run_in_threadpool
+        self.connections[name] = await run_in_threadpool(warm_pool, engine, self.pool_size)
+
+    async def _warm_async(self, name: str, engine) -> None:
+        self.connections[name] = await warm_async_pool(engine, self.pool_size)
+
+    async def _step(self, name: str, step: Awaitable) -> bool:
+        try:
+            await step
+            return True
+        except Exception as e:
+            self.errors[name] = str(e)
+            logger.warning(f"Warm-up step {name} failed: {e}")
+            return False
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "ready": self.ready,
+            "attempts": self.attempts,
+            "duration_ms": self.duration_ms,
+            "connections": dict(self.connections),
+            "quotes": dict(self.quotes),
+            "errors": dict(self.errors),
+        }
+
+
+def _default_engines() -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    from app.database import engine, get_async_engine, get_async_replica_engine, get_replica_engine
+    sync_engines = {"primary": engine, "replica": get_replica_engine()}
+    async_engines = {"async_primary": get_async_engine(), "async_replica": get_async_replica_engine()}
+    return ({k: v for k, v in sync_engines.items() if v is not None},
+            {k: v for k, v in async_engines.items() if v is not None})
+
+
+def _default_session_factory():
+    from app.database import AsyncSessionLocal
+    return AsyncSessionLocal()
+
+
+warmup = Warmup(settings.WARMUP_ON_STARTUP, settings.DB_POOL_SIZE)
+
+
+def get_warmup() -> Warmup:
+    return warmup
@@ -0,0 +1,113 @@
+"""
+Startup profiling and fast boot for app.main.
+
+Every startup phase (module imports, each router import, the schema check,
+the RateBook load, the BGRP check and the first OpenAPI generation) is timed
+into `startup_profile`. With STARTUP_PROFILE=true the timings are logged as
+one report once the worker has started, and the OpenAPI schema is generated
+then so its cost is included.
+
+ensure_schema() replaces the unconditional Base.metadata.create_all(). With
+FAST_BOOT on, it skips create_all when the database's alembic_version is
+the migration head and every model table exists. That is two queries,
+instead of one existence check per table plus the metadata walk. The table
+check is needed because irisk_quotes, irisk_rates, irisk_users and otp_codes
+are created by create_all only, not by a migration. Migration heads are read
+from alembic/versions directly, because importing Alembic costs more than
+create_all.
+"""
+import glob
+import logging
+import os
+import re
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Set, Tuple
+
+from sqlalchemy import inspect, text
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+VERSIONS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "alembic", "versions")
+
+_REVISION = re.compile(r"^revision\b[^=]*=\s*['\"](\w+)['\"]", re.MULTILINE)
+_DOWN_REVISION = re.compile(r"^down_revision\b[^=]*=(.*)$", re.MULTILINE)
+
+
+class StartupProfile:
+    """Named startup phases and how long each took, in the order they finished."""
+
+    def __init__(self):
+        self.phases: List[Tuple[str, float]] = []
+
+    def record(self, name: str, seconds: float) -> None:
+        self.phases.append((name, round(seconds * 1000, 1)))
+
+    @contextmanager
+    def phase(self, name: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - started)
+
+    def report(self) -> Dict[str, float]:
+        return dict(self.phases)
+
+    def log(self) -> None:
+        total = sum(ms for _, ms in self.phases)
+        logger.info(f"Startup profile ({total:.0f} ms): " + ", ".join(f"{name}={ms:.1f}ms" for name, ms in self.phases))
+
+
+startup_profile = StartupProfile()
+
+
+def migration_heads(versions_dir: str = VERSIONS_DIR) -> Set[str]:
+    """Revisions no other migration builds on, read from the revision files without importing Alembic."""
+    revisions, parents = set(), set()
+    for path in glob.glob(os.path.join(versions_dir, "*.py")):
+        with open(path, encoding="utf-8") as f:
+            source = f.read()
+        revision = _REVISION.search(source)
+        if revision is None:
+            continue
+        revisions.add(revision.group(1))
+        down = _DOWN_REVISION.search(source)
+        if down:
+            parents.update(re.findall(r"['\"](\w+)['\"]", down.group(1)))
+    return revisions - parents
+
+
+def schema_is_current(conn, metadata, heads: Optional[Set[str]] = None) -> bool:
+    """True when alembic_version is at the migration head(s) and every table in `metadata` exists."""
+    tables = set(inspect(conn).get_table_names())
+    if "alembic_version" not in tables or not set(metadata.tables) <= tables:
+        return False
+    applied = {row[0] for row in conn.execute(text("SELECT version_num FROM alembic_version"))}
+    return applied == (heads if heads is not None else migration_heads())
+
+
+def ensure_schema(bind, metadata) -> bool:
+    """create_all unless FAST_BOOT finds the schema current; returns whether create_all ran."""
+    if settings.FAST_BOOT:
+        with bind.connect() as conn:
+            if schema_is_current(conn, metadata):
+                logger.info("Fast boot: database is at the migration head, skipping create_all")
+                return False
+    metadata.create_all(bind=bind)
+    return True
+
+
+def profile_openapi(app) -> None:
+    """Time the first OpenAPI generation; FastAPI builds the schema lazily, on the first /openapi.json or /docs."""
+    generate = app.openapi
+
+    def openapi():
+        if app.openapi_schema is not None:
+            return app.openapi_schema
+        with startup_profile.phase("openapi"):
+            return generate()
+
+    app.openapi = openapi
@@ -0,0 +1,102 @@
+"""
+Fixed-point money backed by integer paise.
+
+Every calculator rounds through Money so there is exactly one rounding rule
+(half-up to the paisa) and no float -> str -> Decimal round trips between
+calculation steps. Rates and percentages are applied as exact integer
+ratios, so results are independent of binary float representation.
+"""
+from decimal import Decimal
+from fractions import Fraction
+from typing import Tuple, Union
+
+Number = Union[int, float, Decimal, str]
+
+
+def half_up_div(numerator: int, denominator: int) -> int:
+    """numerator / denominator rounded half away from zero (denominator > 0)."""
+    if numerator >= 0:
+        return (2 * numerator + denominator) // (2 * denominator)
+    return -((-2 * numerator + denominator) // (2 * denominator))
+
+
+def exact_ratio(value: Number) -> Tuple[int, int]:
+    """
+    (numerator, denominator) of a value as it is written in decimal.
+    Floats are taken at their shortest repr (0.1 means 1/10, not the binary
+    approximation), which is what Decimal(str(x)) used to do.
+    """
+    if isinstance(value, int):
+        return value, 1
+    if isinstance(value, float):
+        if value.is_integer():
+            return int(value), 1
+        value = repr(value)
+    if isinstance(value, str):
+        value = Decimal(value)
+    if isinstance(value, Fraction):
+        return value.numerator, value.denominator
+    return value.as_integer_ratio()
+
+
+class Money:
+    """An amount in whole paise. Immutable; arithmetic returns new instances."""
+
+    __slots__ = ("paise",)
+
+    def __init__(self, paise: int = 0):
+        self.paise = int(paise)
+
+    @classmethod
+    def from_rupees(cls, amount: Number) -> "Money":
+        """Rupee amount rounded half-up to the paisa."""
+        num, den = exact_ratio(amount)
+        return cls(half_up_div(num * 100, den))
+
+    def apply_rate(self, rate: Number, per: int = 1) -> "Money":
+        """self * rate / per, e.g. apply_rate(0.15, 1000) for a per-mille rate."""
+        num, den = exact_ratio(rate)
+        return Money(half_up_div(self.paise * num, den * per))
+
+    def percent(self, pct: Number) -> "Money":
+        return self.apply_rate(pct, 100)
+
+    def to_rupees(self) -> float:
+        return self.paise / 100
+
+    __float__ = to_rupees
+
+    def __add__(self, other: "Money") -> "Money":
+        return Money(self.paise + other.paise)
+
+    def __sub__(self, other: "Money") -> "Money":
+        return Money(self.paise - other.paise)
+
+    def __neg__(self) -> "Money":
+        return Money(-self.paise)
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, Money) and self.paise == other.paise
+
+    def __lt__(self, other: "Money") -> bool:
+        return self.paise < other.paise
+
+    def __le__(self, other: "Money") -> bool:
+        return self.paise <= other.paise
+
+    def __gt__(self, other: "Money") -> bool:
+        return self.paise > other.paise
+
+    def __ge__(self, other: "Money") -> bool:
+        return self.paise >= other.paise
+
+    def __hash__(self) -> int:
+        return hash(self.paise)
+
+    def __repr__(self) -> str:
+        return f"Money({self})"
+
+    def __str__(self) -> str:
+        sign = "-" if self.paise < 0 else ""
+        rupees, paise = divmod(abs(self.paise), 100)
+        return f"{sign}{rupees}.{paise:02d}"
@@ -1,5 +1,5 @@
-from decimal import Decimal, ROUND_HALF_UP
+from app.utils.money import Money
 
 def round_currency(amount: float) -> float:
-    """Rounds a float to 2 decimal places using standard rounding."""
-    return float(Decimal(str(amount)).quantize(Decimal("0.01"), rounding=ROUND_HALF_UP))
+    """Rounds a float to 2 decimal places using standard (half-up) rounding."""
+    return Money.from_rupees(amount).to_rupees()
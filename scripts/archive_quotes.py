@@ -0,0 +1,39 @@
+"""
+Rotate old quotes out of irisk_quotes into irisk_quotes_archive.
+
+Moves quotes older than --days (default QUOTE_RETENTION_DAYS) in id-ordered
+batches. --compact-legacy first converts rows still stored as plain JSON
+into typed columns + compressed payload. Meant to run from cron.
+
+Usage: python scripts/archive_quotes.py [--days 90] [--batch-size 5000] [--compact-legacy]
+"""
+import argparse
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app.config import settings  # noqa: E402
+from app.database import engine  # noqa: E402
+from app.services.quote_store import archive_quotes, compact_legacy_quotes, retention_cutoff  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Archive old irisk_quotes rows")
+    parser.add_argument("--days", type=int, default=settings.QUOTE_RETENTION_DAYS, help="Keep this many days live")
+    parser.add_argument("--batch-size", type=int, default=5000, help="Rows moved per batch")
+    parser.add_argument("--compact-legacy", action="store_true", help="Compress legacy JSON rows first")
+    args = parser.parse_args()
+
+    summary = {}
+    if args.compact_legacy:
+        summary["compacted"] = compact_legacy_quotes(engine)
+    cutoff = retention_cutoff(args.days)
+    summary["archived"] = archive_quotes(engine, cutoff, args.batch_size)
+    summary["cutoff"] = cutoff.isoformat()
+    print(json.dumps(summary, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Micro-benchmark: per-quote premium arithmetic, legacy vs Money.
+
+"legacy" replays the old FirePremiumCalculator steps, wrapping each result as
+Decimal(str(round_currency(float(x)))). "money" runs the same steps on the
+integer-paise Money type. Rates are fixed, so no database is needed.
+
+Usage: python scripts/bench_money.py [iterations]
+"""
+import os
+import sys
+import timeit
+from decimal import Decimal, ROUND_HALF_UP
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app.utils.money import Money  # noqa: E402
+
+BUILDING_SI, CONTENTS_SI = 1000000.0, 200000.0
+ADD_ONS = [("per_mille", Decimal("0.5"), 1200000.0), ("percentage", Decimal("0.012345"), 350000.0), ("fixed", Decimal("12.345"), None)]
+PA_RATE = Decimal("7")
+BASIC_RATE, TERRORISM_RATE = Decimal("0.15"), Decimal("0.07")
+DISCOUNT_PCT, LOADING_PCT = 7.25, 10.0
+
+
+def _legacy_round(amount: float) -> float:
+    return float(Decimal(str(amount)).quantize(Decimal("0.01"), rounding=ROUND_HALF_UP))
+
+
+def _r(x) -> Decimal:
+    return Decimal(str(_legacy_round(float(x))))
+
+
+def legacy_quote() -> float:
+    total_si = Decimal(str(BUILDING_SI + CONTENTS_SI))
+    basic = _r(total_si * BASIC_RATE / Decimal("1000"))
+    add_on = Decimal("0")
+    for rate_type, rate, si in ADD_ONS:
+        if rate_type == "per_mille":
+            premium = Decimal(str(si)) * rate / Decimal("1000")
+        elif rate_type == "percentage":
+            premium = Decimal(str(si)) * rate / Decimal("100")
+        else:
+            premium = rate
+        add_on += _r(premium)
+    add_on += _r(PA_RATE)
+    base = basic + add_on
+    discount = _r(base * Decimal(str(DISCOUNT_PCT)) / Decimal("100"))
+    subtotal = _r(base - discount)
+    loading = _r(subtotal * Decimal(str(LOADING_PCT)) / Decimal("100"))
+    terrorism = _r(total_si * TERRORISM_RATE / Decimal("1000"))
+    net = _r(subtotal + loading + terrorism)
+    cgst = _r(net * Decimal("0.09"))
+    sgst = _r(net * Decimal("0.09"))
+    gross = _r(net + cgst + sgst + Decimal("1.0"))
+    return float(gross)
+
+
+def money_quote() -> float:
+    total_si = Money.from_rupees(BUILDING_SI) + Money.from_rupees(CONTENTS_SI)
+    basic = total_si.apply_rate(BASIC_RATE, 1000)
+    add_on = Money(0)
+    for rate_type, rate, si in ADD_ONS:
+        if rate_type == "per_mille":
+            add_on += Money.from_rupees(si).apply_rate(rate, 1000)
+        elif rate_type == "percentage":
+            add_on += Money.from_rupees(si).percent(rate)
+        else:
+            add_on += Money.from_rupees(rate)
+    add_on += Money.from_rupees(PA_RATE)
+    base = basic + add_on
+    subtotal = base - base.percent(DISCOUNT_PCT)
+    loading = subtotal.percent(LOADING_PCT)
+    terrorism = total_si.apply_rate(TERRORISM_RATE, 1000)
+    net = subtotal + loading + terrorism
+    gross = net + net.percent(9) + net.percent(9) + Money(100)
+    return gross.to_rupees()
+
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    assert legacy_quote() == money_quote(), (legacy_quote(), money_quote())
+    print(f"gross premium: {money_quote()} ({iterations} quotes per run, best of 5)")
+    results = {}
+    for name, fn in (("legacy", legacy_quote), ("money", money_quote)):
+        best = min(timeit.repeat(fn, number=iterations, repeat=5))
+        results[name] = best / iterations * 1e6
+        print(f"{name:>7}: {results[name]:7.2f} us/quote")
+    print(f"speedup: {results['legacy'] / results['money']:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
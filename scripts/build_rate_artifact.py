@@ -0,0 +1,38 @@
+"""
+Compile the data/ CSVs into the binary rate artifact the app can load at
+startup instead of reading the rate tables (RATE_ARTIFACT_PATH).
+
+The CSVs go through seed.py's own steps into a throwaway SQLite database,
+so the artifact holds exactly the rows a database seed would accept. The
+file is replaced atomically; running workers pick it up on their next
+RateBook reload.
+
+Usage: python scripts/build_rate_artifact.py [--output build/rates.irra]
+"""
+import argparse
+import json
+import os
+import sys
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT)
+
+from seed import compile_rate_artifact  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compile data/*.csv into a rate artifact")
+    parser.add_argument("--output", default=os.path.join("build", "rates.irra"), help="Artifact path")
+    parser.add_argument("--workers", type=int, default=None, help="Seed staging connections (default SEED_WORKERS)")
+    args = parser.parse_args()
+
+    output = os.path.abspath(args.output)
+    os.chdir(ROOT)  # SEED_STEPS read data/ relative to the repository root
+    version, report = compile_rate_artifact(output, workers=args.workers)
+    report.log()
+    print(json.dumps({"output": output, "version": version, "bytes": os.path.getsize(output),
+                      "tables": report.table_counts(), "error_count": len(report.errors)}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
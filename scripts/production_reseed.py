@@ -1,6 +1,10 @@
 """
 Production Database Reseed and Validation Orchestrator
 Safely reseeds add_on_rates and validates all business rules
+
+Running workers keep serving their in-memory RateBook until it is reloaded:
+they pick up the new add_on_rates within RATE_BOOK_REFRESH_SECONDS, or on
+restart. The script cannot reload other processes itself.
 """
 import os
 import sys
@@ -13,6 +17,9 @@ from dotenv import load_dotenv
 
 load_dotenv()
 
+# seed.py and app/ live in the repository root
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
 class ProductionReseedOrchestrator:
     """Orchestrates safe production database reseed with full validation"""
     
@@ -102,13 +109,6 @@ class ProductionReseedOrchestrator:
         # Get current production data
         cur = self.conn.cursor()
         
-        # Get product and add-on mappings
-        cur.execute("SELECT product_code, id FROM product_master")
-        prod_map = {row[0]: row[1] for row in cur.fetchall()}
-        
-        cur.execute("SELECT add_on_code, id FROM add_on_master")
-        addon_map = {row[0]: row[1] for row in cur.fetchall()}
-        
         # Get current add_on_rates
         cur.execute("""
             SELECT am.add_on_code, ar.product_code, ar.rate_type, ar.rate_value
@@ -145,46 +145,11 @@ class ProductionReseedOrchestrator:
         self.log(f"Missing rows: {len(missing)}")
         self.log(f"Conflicting rows: {len(conflicts)}")
         
-        # Insert missing rows
-        inserted = 0
-        for row in missing:
-            addon_code = row['add_on_code']
-            product_code = row['product_code']
-            
-            addon_id = addon_map.get(addon_code)
-            product_id = prod_map.get(product_code)
-            
-            if not addon_id:
-                self.log(f"Skipping {addon_code}/{product_code}: add_on_code not in master", "WARN")
-                continue
-            
-            if not product_id:
-                self.log(f"Skipping {addon_code}/{product_code}: product_code not found", "WARN")
-                continue
-            
-            try:
-                cur.execute("""
-                    INSERT INTO add_on_rates 
-                    (add_on_id, product_code, product_id, rate_type, rate_value, 
-                     si_min, si_max, occupancy_type, active)
-                    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, true)
-                """, (
-                    addon_id,
-                    product_code,
-                    product_id,
-                    row['rate_type'],
-                    float(row['rate_value']),
-                    float(row.get('min_si')) if row.get('min_si') else None,
-                    float(row.get('max_si')) if row.get('max_si') else None,
-                    None  # occupancy_type from CSV if needed
-                ))
-                inserted += 1
-                self.log(f"Inserted: {addon_code}/{product_code}")
-            except Exception as e:
-                self.log(f"Failed to insert {addon_code}/{product_code}: {e}", "ERROR")
-        
-        self.conn.commit()
-        self.log(f"Inserted {inserted} missing rows")
+        # Loaded into a shadow table, validated and swapped in (seed.py / app/services/shadow_swap.py),
+        # so quotes never see a half-inserted add_on_rates
+        counts = self.swap_in_add_on_rates()
+        inserted = counts.get("inserted", 0)
+        self.log(f"Inserted {inserted} missing rows, updated {counts.get('updated', 0)} conflicting rows")
         
         return {
             'csv_rows': len(csv_rows),
@@ -194,6 +159,30 @@ class ProductionReseedOrchestrator:
             'conflicts': len(conflicts)
         }
     
+    def swap_in_add_on_rates(self) -> Dict[str, int]:
+        """Reload add_on_rates from the CSV through seed.py's shadow-table swap"""
+        from sqlalchemy import create_engine
+        from app.services.bulk_seed import SeedReport
+        from seed import seed_table
+
+        # End the read transaction the backup and comparison left open: its ACCESS SHARE lock
+        # on add_on_rates would block the swap's rename forever
+        self.conn.rollback()
+        engine = create_engine(self.database_url.replace("postgres://", "postgresql://", 1))
+        report = SeedReport()
+        try:
+            with engine.begin() as conn:
+                seed_table(conn, "add_on_rates", report)
+        finally:
+            engine.dispose()
+        for e in report.errors:
+            self.log(f"Skipping CSV line {e['line']}: {e['reason']}", "WARN")
+        counts = report.tables.get("add_on_rates", {})
+        if counts.get("swapped"):
+            self.log("add_on_rates swapped in; running workers reload their RateBook within "
+                     "RATE_BOOK_REFRESH_SECONDS (restart the service to apply it at once)", "WARN")
+        return counts
+    
     def apply_remediation(self) -> bool:
         """Apply Rule 5 remediation (POLICY_RATE → rate_value = 0)"""
         self.log("Applying Rule 5 remediation...")
@@ -0,0 +1,55 @@
+"""
+Rate-change impact report: how stored quotes would move under candidate basic rates.
+
+Loads the candidate product_basic_rates CSV into a shadow RateBook and
+reprices irisk_quotes under both the current and the candidate rates. Point
+--database at a local SQLite copy to run it offline.
+
+Usage: python scripts/rate_impact.py --database sqlite:///local_copy.db \
+           --basic-rates data/product_basic_rates.csv [--sample 0.1] [--output impact.json]
+"""
+import argparse
+import json
+import os
+import sys
+
+from sqlalchemy import create_engine
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app.services.rate_impact import analyze_rate_impact  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Report premium impact of candidate basic rates")
+    parser.add_argument("--database", default=None, help="SQLAlchemy URL (default: DATABASE_URL)")
+    parser.add_argument("--basic-rates", required=True, help="Candidate product_basic_rates.csv")
+    parser.add_argument("--sample", type=float, default=1.0, help="Fraction of quotes to reprice (0-1]")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed for --sample")
+    parser.add_argument("--limit", type=int, default=None, help="Stop after scanning this many quotes")
+    parser.add_argument("--output", default=None, help="Write the JSON report here instead of stdout")
+    args = parser.parse_args()
+
+    if args.database:
+        bind = create_engine(args.database)
+    else:
+        from app.database import engine as bind
+
+    report = analyze_rate_impact(
+        bind,
+        basic_rates_csv=args.basic_rates,
+        sample=args.sample,
+        limit=args.limit,
+        seed=args.seed,
+    )
+    body = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(body)
+        print(f"{report['quotes']} quotes, {report['changed']} changed -> {args.output}")
+    else:
+        print(body)
+
+
+if __name__ == "__main__":
+    main()
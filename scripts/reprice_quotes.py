@@ -0,0 +1,43 @@
+"""
+Reprice stored UIIC fire quotes against the current rate data.
+
+Writes a CSV of every quote whose premium would change (or that can no longer
+be priced) and prints a JSON summary. Resume an interrupted run with
+--after-id <last_quote_id from the summary>.
+
+Usage: python scripts/reprice_quotes.py --output reprice_diff.csv [--workers 4] [--page-size 1000]
+"""
+import argparse
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app.services.repricing import run_repricing  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Reprice irisk_quotes against current rates")
+    parser.add_argument("--output", default="reprice_diff.csv", help="Diff CSV path")
+    parser.add_argument("--workers", type=int, default=None, help="Pricing processes (0 = in-process; default CPU count)")
+    parser.add_argument("--page-size", type=int, default=1000, help="Quotes fetched per keyset page")
+    parser.add_argument("--after-id", type=int, default=0, help="Only quotes with id greater than this")
+    parser.add_argument("--product", default=None, help="Only this product code (e.g. BGRP)")
+    parser.add_argument("--limit", type=int, default=None, help="Stop after this many quotes")
+    args = parser.parse_args()
+
+    with open(args.output, "w", newline="", encoding="utf-8") as f:
+        summary = run_repricing(
+            f,
+            page_size=args.page_size,
+            workers=args.workers,
+            after_id=args.after_id,
+            product=args.product.upper() if args.product else None,
+            limit=args.limit,
+        )
+    print(json.dumps({**summary, "output": args.output}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
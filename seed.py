@@ -1,32 +1,35 @@
 import sys
 import os
-import csv
 import logging
-from sqlalchemy import text, select, func, insert
-from sqlalchemy.dialects.postgresql import insert as pg_insert
-from sqlalchemy.exc import IntegrityError, CompileError
-from app.database import engine, SessionLocal
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from sqlalchemy import text, select
+from app.config import settings
+from app.database import engine, SessionLocal, _is_memory_sqlite
 from app.models.fire_models import *
 from app.models.master import LobMaster, ProductMaster
+from app.services.bulk_seed import SeedReport, merge_rows, merge_stage, read_csv, stage_rows
+from app.services.rate_lookup import refresh_rate_lookup_flat
+from app.services.seed_state import (
+    code_hash, file_hash, fingerprint, is_current, load_seed_state, record_seed_state, table_counts,
+)
+from app.services.shadow_swap import drop_shadow, swap_in
 
 # Configure Logging
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
 logger = logging.getLogger(__name__)
 
-def upsert(conn, model, data):
+def upsert(conn, model, data, report=None):
     """
-    Insert data universally using standard INSERT.
-    Ignores duplicates (IntegrityError) safely using SAVEPOINT.
+    Merge a single row on the table's natural key (bulk_seed.MERGE_KEYS).
+    For ad-hoc scripts; the seed_* functions merge whole tables at once.
     """
-    try:
-        with conn.begin_nested():
-            stmt = insert(model).values(**data)
-            conn.execute(stmt)
-    except (IntegrityError, Exception) as e:
-        if "unique constraint" not in str(e).lower():
-             with open("error_dump_v2.txt", "a") as f:
-                 f.write(f"Upsert Error {model.__tablename__}: {e}\n")
-        pass
+    report = report if report is not None else SeedReport()
+    merge_rows(conn, model, [(1, data)], report)
+    for e in report.errors:
+        logger.warning(f"Upsert {e['table']} rejected: {e['reason']}")
+    return report
 
 
 def get_product_map(conn):
@@ -53,10 +56,25 @@ def get_occupancy_type_map(conn):
     result = conn.execute(query).fetchall()
     return {row[0]: row[1] for row in result}
 
-def seed_lob_and_product(conn):
-    """Seed LobMaster and ProductMaster."""
-    logger.info("Seeding LOB and Products...")
-    
+def load_source(csv_path, sample_rows):
+    """(line, row) pairs from the CSV, or the numbered sample rows when the file is absent."""
+    if csv_path and os.path.exists(csv_path):
+        return read_csv(csv_path)
+    return list(enumerate(sample_rows, 1))
+
+def with_default_product(data, product_code):
+    for _, row in data:
+        row["product_code"] = row.get("product_code") or product_code
+    return data
+
+# Foreign ids are staged as their codes and resolved in SQL when the table is published
+LOB_ID = ("lob_code", LobMaster.__table__.c.lob_code)
+PRODUCT_ID = ("product_code", ProductMaster.__table__.c.product_code)
+OCCUPANCY_ID = ("iib_code", Occupancy.__table__.c.iib_code)
+ADD_ON_ID = ("add_on_code", AddOnMaster.__table__.c.add_on_code)
+
+
+def lob_rows(csv_path=None):
     # LOBs
     lobs = [
         {"lob_code": "FIRE", "lob_name": "Fire Insurance", "description": "Fire and Special Perils", "active": True},
@@ -67,247 +85,75 @@ def seed_lob_and_product(conn):
         {"lob_code": "ENGINEERING", "lob_name": "Engineering Insurance", "description": "CAR, EAR, MBD", "active": True},
         {"lob_code": "MISC", "lob_name": "Miscellaneous", "description": "Other insurance products", "active": True},
     ]
+    return list(enumerate(lobs, 1))
 
-    for lob in lobs:
-        upsert(conn, LobMaster, lob)
-    
-    lob_map_query = select(LobMaster.lob_code, LobMaster.id)
-    lob_map_rows = conn.execute(lob_map_query).fetchall()
-    lob_map = {row[0]: row[1] for row in lob_map_rows}
-
-    fire_id = lob_map.get("FIRE")
-    
-    if not fire_id:
-        logger.error("FIRE LOB ID not found after seed!")
-        return
-
+def product_rows(csv_path=None):
     # Products
     fire_products = [
-        {"lob_id": fire_id, "product_code": "SFSP", "product_name": "Standard Fire and Special Perils", "description": "Traditional Fire Policy", "active": True},
-        {"lob_id": fire_id, "product_code": "IAR", "product_name": "Industrial All Risk", "description": "Comprehensive Industrial Cover", "active": True},
-        {"lob_id": fire_id, "product_code": "BGRP", "product_name": "Bharat Griha Raksha Policy", "description": "Home Insurance", "active": True},
-        {"lob_id": fire_id, "product_code": "BSUSP", "product_name": "Bharat Sookshma Udyam Suraksha", "description": "Micro Enterprise", "active": True},
-        {"lob_id": fire_id, "product_code": "BLUSP", "product_name": "Bharat Laghu Udyam Suraksha", "description": "Small Enterprise", "active": True},
-        {"lob_id": fire_id, "product_code": "VUSP", "product_name": "Value Udyam", "description": "Value Added Product", "active": True},
-
-        {"lob_id": fire_id, "product_code": "UVGS", "product_name": "Udyam Value Griha Suraksha", "description": "Udyam Value Home", "active": True},
-        {"lob_id": fire_id, "product_code": "UBGR", "product_name": "United Bharat Griha Raksha", "description": "United Home Insurance", "active": True},
-        {"lob_id": fire_id, "product_code": "UVGR", "product_name": "United Value Griha Raksha", "description": "United Value Home Insurance", "active": True},
+        {"lob_code": "FIRE", "product_code": "SFSP", "product_name": "Standard Fire and Special Perils", "description": "Traditional Fire Policy", "active": True},
+        {"lob_code": "FIRE", "product_code": "IAR", "product_name": "Industrial All Risk", "description": "Comprehensive Industrial Cover", "active": True},
+        {"lob_code": "FIRE", "product_code": "BGRP", "product_name": "Bharat Griha Raksha Policy", "description": "Home Insurance", "active": True},
+        {"lob_code": "FIRE", "product_code": "BSUSP", "product_name": "Bharat Sookshma Udyam Suraksha", "description": "Micro Enterprise", "active": True},
+        {"lob_code": "FIRE", "product_code": "BLUSP", "product_name": "Bharat Laghu Udyam Suraksha", "description": "Small Enterprise", "active": True},
+        {"lob_code": "FIRE", "product_code": "VUSP", "product_name": "Value Udyam", "description": "Value Added Product", "active": True},
+
+        {"lob_code": "FIRE", "product_code": "UVGS", "product_name": "Udyam Value Griha Suraksha", "description": "Udyam Value Home", "active": True},
+        {"lob_code": "FIRE", "product_code": "UBGR", "product_name": "United Bharat Griha Raksha", "description": "United Home Insurance", "active": True},
+        {"lob_code": "FIRE", "product_code": "UVGR", "product_name": "United Value Griha Raksha", "description": "United Value Home Insurance", "active": True},
     ]
-
-    for prod in fire_products:
-        upsert(conn, ProductMaster, prod)
-
-def seed_occupancies(conn):
-    logger.info("Seeding Occupancies...")
-    csv_path = "data/occupancies.csv"
-    data = []
-    
-    if os.path.exists(csv_path):
-        with open(csv_path, 'r', encoding='utf-8', errors='replace') as f:
-            reader = csv.DictReader(f)
-            data = [row for row in reader]
-    else:
-        # Minimal Sample
-        data = [
-            {"iib_code": "101", "section_aift": "1", "occupancy_type": "Residential", "risk_description": "Residential Buildings"},
-            {"iib_code": "201", "section_aift": "2", "occupancy_type": "Non-Industrial", "risk_description": "Offices"},
-            {"iib_code": "301", "section_aift": "3", "occupancy_type": "Industrial", "risk_description": "General Manufacturing"}
-        ]
-        
-    for row in data:
+    return list(enumerate(fire_products, 1))
+
+def occupancy_rows(csv_path):
+    # Minimal Sample
+    data = load_source(csv_path, [
+        {"iib_code": "101", "section_aift": "1", "occupancy_type": "Residential", "risk_description": "Residential Buildings"},
+        {"iib_code": "201", "section_aift": "2", "occupancy_type": "Non-Industrial", "risk_description": "Offices"},
+        {"iib_code": "301", "section_aift": "3", "occupancy_type": "Industrial", "risk_description": "General Manufacturing"}
+    ])
+    for _, row in data:
         # Remap or ensure risk_description key exists
         if 'occupancy_description' in row:
             row['risk_description'] = row.pop('occupancy_description')
-        upsert(conn, Occupancy, row)
-
-    # Note: CSV reading is enforced to use UTF-8 with replacement to avoid crashes.
-
-def seed_product_basic_rates(conn):
-    logger.info("Seeding ProductBasicRates...")
-    
-    prod_map = get_product_map(conn)
-    occ_id_map = get_occupancy_id_map(conn)
-    
-    if not occ_id_map:
-        logger.warning("No occupancies found, cannot seed rates.")
-        return
-
-    csv_path = "data/product_basic_rates.csv"
-    data = []
-    
-    if os.path.exists(csv_path):
-         with open(csv_path, 'r', encoding='utf-8', errors='replace') as f:
-            reader = csv.DictReader(f)
-            data = [row for row in reader]
-    else:
-        # Sample using iib_code
-        data = []
-        if "BGRP" in prod_map:
-            data.append({"product_code": "BGRP", "iib_code": "1001", "basic_rate": 0.15})
-            data.append({"product_code": "BGRP", "iib_code": "1001_2", "basic_rate": 0.15})
-        if "BSUSP" in prod_map:
-            data.append({"product_code": "BSUSP", "iib_code": "201", "basic_rate": 0.20})
-        if "UVGS" in prod_map:
-            data.append({"product_code": "UVGS", "iib_code": "1001", "basic_rate": 0.15})
-            data.append({"product_code": "UVGS", "iib_code": "1001_2", "basic_rate": 0.15})
-        if "UBGR" in prod_map:
-            data.append({"product_code": "UBGR", "iib_code": "1001", "basic_rate": 0.15})
-            data.append({"product_code": "UBGR", "iib_code": "1001_2", "basic_rate": 0.15})
-        if "UVGR" in prod_map:
-            data.append({"product_code": "UVGR", "iib_code": "1001", "basic_rate": 0.15})
-            data.append({"product_code": "UVGR", "iib_code": "1001_2", "basic_rate": 0.15})
-
-    skipped_count = 0
-    inserted_count = 0
-    for row in data:
-        p_code = row.get("product_code")
-        iib = row.get("iib_code")
-        
-        # Determine product_id
-        if 'product_id' not in row:
-             row['product_id'] = prod_map.get(p_code)
-
-        # Determine occupancy_id from iib_code if present
-        if 'occupancy_id' not in row and iib:
-             row['occupancy_id'] = occ_id_map.get(iib)
-             # Remove iib_code so it doesn't fail insert if model doesn't have it
-             if 'iib_code' in row: del row['iib_code']
-        
-        if row.get('product_id') and row.get('occupancy_id'):
-            upsert(conn, ProductBasicRate, row)
-            inserted_count += 1
-        else:
-            skipped_count += 1
-    
-    if skipped_count > 0:
-        logger.warning(f"Skipped {skipped_count} product_basic_rates rows due to missing mappings")
-    logger.info(f"Seeded {inserted_count} product_basic_rates rows")
-
-def seed_bsus_rates(conn):
-    logger.info("Seeding BsusRates...")
-    prod_map = get_product_map(conn)
-    occ_id_map = get_occupancy_id_map(conn)
-    
-    csv_path = "data/bsus_rates.csv"
-    data = []
-    
-    if os.path.exists(csv_path):
-        with open(csv_path, 'r', encoding='utf-8', errors='replace') as f:
-            reader = csv.DictReader(f)
-            data = [row for row in reader]
-    else:
-        if "BSUSP" in prod_map:
-            # Use '201' for Non-Industrial for BSUS sample
-            data.append({
-                "product_code": "BSUSP", 
-                "iib_code": "201", 
-                "eq_zone": "Zone I", 
-                "basic_rate": 0.25
-            })
-
-    for row in data:
-        p_code = row.get("product_code")
-        iib = row.get("iib_code")
-        
-        if 'product_code' not in row:
-            row['product_code'] = "BSUSP"
-            p_code = "BSUSP"
-
-        if 'product_id' not in row:
-            row['product_id'] = prod_map.get(p_code)
-
-        if 'occupancy_id' not in row and iib:
-            row['occupancy_id'] = occ_id_map.get(iib)
-            if 'iib_code' in row: del row['iib_code']
-            
-        if row.get('product_id') and row.get('occupancy_id'):
-            upsert(conn, BsusRate, row)
-        else:
-            logger.warning(f"Skipping bsus_rates row: Product={p_code}, IIB={iib}")
-
-def seed_stfi_rates(conn):
-    logger.info("Seeding STFI Rates...")
-    prod_map = get_product_map(conn)
-    occ_id_map = get_occupancy_id_map(conn)
-    
-    csv_path = "data/stfi_rates.csv"
-    data = []
-    if os.path.exists(csv_path):
-        with open(csv_path, 'r', encoding='utf-8', errors='replace') as f:
-            reader = csv.DictReader(f)
-            data = [row for row in reader]
-    else:
-        # Sample using iib_code
-        data = []
-        if "BGRP" in prod_map:
-            data.append({
-                "product_code": "BGRP", 
-                "iib_code": "101",
-                "stfi_rate": 0.05
-            })
-            
-    for row in data:
-        # Default to SFSP if not provided, assuming standard fire rates
-        if 'product_code' not in row:
-             row['product_code'] = "SFSP"
-             
-        if 'product_id' not in row and 'product_code' in row:
-             row['product_id'] = prod_map.get(row['product_code'])
-        
-        iib = row.get("iib_code")
-        if 'occupancy_id' not in row and iib:
-             row['occupancy_id'] = occ_id_map.get(iib)
-             if 'iib_code' in row: del row['iib_code']
-             
-        if row.get('product_id') and row.get('occupancy_id'):
-            upsert(conn, StfiRate, row)
-        else:
-            logger.warning(f"Skipping stfi_rates row: Product={row.get('product_code')}, IIB={iib}")
-
-def seed_eq_rates(conn):
-    logger.info("Seeding EQ Rates...")
-    prod_map = get_product_map(conn)
-    occ_id_map = get_occupancy_id_map(conn)
-    
-    csv_path = "data/eq_rates.csv"
-    data = []
-    if os.path.exists(csv_path):
-        with open(csv_path, 'r', encoding='utf-8', errors='replace') as f:
-             reader = csv.DictReader(f)
-             data = [row for row in reader]
-    else:
-        data = []
-        if "BGRP" in prod_map:
-            data.append({
-                "product_code": "BGRP", 
-                "iib_code": "101",
-                "eq_zone": "Zone I",
-                "eq_rate": 0.10
-            })
-    
-    for row in data:
-        # Default to SFSP if not provided
-        if 'product_code' not in row:
-             row['product_code'] = "SFSP"
-
-        if 'product_id' not in row and 'product_code' in row:
-             row['product_id'] = prod_map.get(row['product_code'])
-        
-        iib = row.get("iib_code")
-        if 'occupancy_id' not in row and iib:
-             row['occupancy_id'] = occ_id_map.get(iib)
-             if 'iib_code' in row: del row['iib_code']
-
-        if row.get('product_id') and row.get('occupancy_id'):
-            upsert(conn, EqRate, row)
-        else:
-            logger.warning(f"Skipping eq_rates row: Product={row.get('product_code')}, IIB={iib}")
-
-def seed_terrorism_slabs(conn):
-    logger.info("Seeding TerrorismSlabs (Official Circular Values)...")
-    prod_map = get_product_map(conn)
-    
+    return data
+
+def product_basic_rate_rows(csv_path):
+    # Sample using iib_code
+    return load_source(csv_path, [
+        {"product_code": "BGRP", "iib_code": "1001", "basic_rate": 0.15},
+        {"product_code": "BGRP", "iib_code": "1001_2", "basic_rate": 0.15},
+        {"product_code": "BSUSP", "iib_code": "201", "basic_rate": 0.20},
+        {"product_code": "UVGS", "iib_code": "1001", "basic_rate": 0.15},
+        {"product_code": "UVGS", "iib_code": "1001_2", "basic_rate": 0.15},
+        {"product_code": "UBGR", "iib_code": "1001", "basic_rate": 0.15},
+        {"product_code": "UBGR", "iib_code": "1001_2", "basic_rate": 0.15},
+        {"product_code": "UVGR", "iib_code": "1001", "basic_rate": 0.15},
+        {"product_code": "UVGR", "iib_code": "1001_2", "basic_rate": 0.15},
+    ])
+
+def bsus_rate_rows(csv_path):
+    # Use '201' for Non-Industrial for BSUS sample
+    data = load_source(csv_path, [
+        {"product_code": "BSUSP", "iib_code": "201", "eq_zone": "Zone I", "basic_rate": 0.25}
+    ])
+    return with_default_product(data, "BSUSP")
+
+def stfi_rate_rows(csv_path):
+    # Sample using iib_code
+    data = load_source(csv_path, [
+        {"product_code": "BGRP", "iib_code": "101", "stfi_rate": 0.05}
+    ])
+    # Default to SFSP if not provided, assuming standard fire rates
+    return with_default_product(data, "SFSP")
+
+def eq_rate_rows(csv_path):
+    data = load_source(csv_path, [
+        {"product_code": "BGRP", "iib_code": "101", "eq_zone": "Zone I", "eq_rate": 0.10}
+    ])
+    # Default to SFSP if not provided
+    return with_default_product(data, "SFSP")
+
+def terrorism_slab_rows(csv_path=None):
+    # Official Circular Values
     slabs = [
         {"occupancy_type": "Residential", "si_min": 0, "si_max": None, "rate_per_mille": 0.10},
         {"occupancy_type": "Non-Industrial", "si_min": 0, "si_max": 20000000000, "rate_per_mille": 0.15},
@@ -316,60 +162,39 @@ def seed_terrorism_slabs(conn):
         {"occupancy_type": "Industrial", "si_min": 20000000000, "si_max": None, "rate_per_mille": 0.15},
     ]
 
-    fire_products = ["SFSP", "IAR", "BSUSP", "BLUSP", "BGRP", "UBGR", "UVGR"] 
-    
+    fire_products = ["SFSP", "IAR", "BSUSP", "BLUSP", "BGRP", "UBGR", "UVGR"]
+
+    rows = []
     for code in fire_products:
-        pid = prod_map.get(code)
-        if pid:
-            for slab in slabs:
-                row = slab.copy()
-                row["product_code"] = code
-                row["product_id"] = pid
-                
-                # Special override for BGRP/UBGR/UVGR Residential
-                if code in ["BGRP", "UBGR", "UVGR"] and row["occupancy_type"] == "Residential":
-                    row["rate_per_mille"] = 0.07
-                    
-                upsert(conn, TerrorismSlab, row)
-
-
-
-def seed_add_on_master(conn):
-    logger.info("Seeding AddOnMaster...")
-    # Using COMPLETE file with all 43 codes (including PASL, PASP, VLIT, ALAC)
-    csv_path = "data/add_on_master_COMPLETE.csv"
-    data = []
+        for slab in slabs:
+            row = slab.copy()
+            row["product_code"] = code
+
+            # Special override for BGRP/UBGR/UVGR Residential
+            if code in ["BGRP", "UBGR", "UVGR"] and row["occupancy_type"] == "Residential":
+                row["rate_per_mille"] = 0.07
+
+            rows.append((len(rows) + 1, row))
+    return rows
+
+def add_on_master_rows(csv_path):
     if not os.path.exists(csv_path):
         logger.warning(f"{csv_path} not found. Skipping AddOnMaster seeding.")
-        return
-
-    with open(csv_path, 'r', encoding='utf-8', errors='replace') as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-             # Basic upsert logic
-             code = row.get("add_on_code", "").strip()
-             if not code: continue
-             
-             # Handle booleans
-             row['is_percentage'] = (str(row.get('is_percentage')).upper() == 'TRUE')
-             row['applies_to_product'] = (str(row.get('applies_to_product')).upper() == 'TRUE')
-             row['active'] = (str(row.get('active')).upper() == 'TRUE')
-             
-             # Removes blank keys so defaults apply or we don't overwrite with empty strings
-             if not row.get("description"):
-                 row.pop("description", None)
-             
-             upsert(conn, AddOnMaster, row)
-
-    logger.info("Seeded AddOnMaster.")
-
-def seed_add_on_product_map(conn):
-    logger.info("Seeding AddOnProductMap...")
-
-    # Load IDs
-    prod_map = get_product_map(conn)
-    ao_map = {row[0]: row[1] for row in conn.execute(select(AddOnMaster.add_on_code, AddOnMaster.id)).fetchall()}
-    
+        return []
+
+    rows = []
+    for line, row in read_csv(csv_path):
+        if not row.get("add_on_code"):
+            continue
+
+        # Handle booleans
+        row['is_percentage'] = (str(row.get('is_percentage')).upper() == 'TRUE')
+        row['applies_to_product'] = (str(row.get('applies_to_product')).upper() == 'TRUE')
+        row['active'] = (str(row.get('active')).upper() == 'TRUE')
+        rows.append((line, row))
+    return rows
+
+def add_on_product_map_rows(csv_path):
     # Pre-defined map for aliases (CSV code -> DB code)
     alias_map = {
         "BSUS": "BSUSP",
@@ -377,170 +202,269 @@ def seed_add_on_product_map(conn):
         "BLUS": "BLUSP",
         "BGR": "BGRP"
     }
-    
+
     required_products = {"SFSP", "IAR", "BLUSP", "BSUSP", "VUSP", "BGRP", "UVGS"}
     mapped_products = set()
 
-    csv_path = "data/add_on_product_map.csv"
-    count = 0
-    skipped_count = 0
     if not os.path.exists(csv_path):
         logger.warning(f"{csv_path} not found. Skipping AddOnProductMap.")
-        return
+        return []
 
-    with open(csv_path, 'r', encoding='utf-8-sig', errors='replace') as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            p_code = row.get("product_code", "").strip()
-            a_code = row.get("add_on_code", "").strip()
+    rows = []
+    for line, row in read_csv(csv_path):
+        p_code = row.get("product_code", "")
+        a_code = row.get("add_on_code", "")
 
-            if not p_code or not a_code:
-                continue
+        if not p_code or not a_code:
+            continue
+
+        # Resolve Alias
+        real_p_code = alias_map.get(p_code, p_code)
+        rows.append((line, {"product_code": real_p_code, "add_on_code": a_code}))
+        mapped_products.add(real_p_code)
 
-            # Resolve Alias
-            real_p_code = alias_map.get(p_code, p_code)
-            
-            p_id = prod_map.get(real_p_code)
-            a_id = ao_map.get(a_code)
-
-            if p_id and a_id:
-                upsert(conn, AddOnProductMap, {"product_id": p_id, "add_on_id": a_id, "product_code": real_p_code})
-                count += 1
-                mapped_products.add(real_p_code)
-            else:
-                skipped_count += 1
-
-    if skipped_count > 0:
-        logger.warning(f"Skipped {skipped_count} AddOnProductMap rows due to missing mappings")
-    logger.info(f"Seeded {count} rows in AddOnProductMap.")
-    
     # Verify coverage
     missing = required_products - mapped_products
     if missing:
         logger.warning(f"AddOnMap: No mappings found for products: {missing}")
-    else:
-        logger.info("AddOnMap: Confirmed mappings for all target products.")
+    return rows
 
-def seed_add_on_rates(conn):
-    logger.info("Seeding AddOnRates...")
-    
-    prod_map = get_product_map(conn)
-    # Re-fetch AddOnMaster keys effectively
-    query_ao = select(AddOnMaster.add_on_code, AddOnMaster.id)
-    ao_rows = conn.execute(query_ao).fetchall()
-    ao_map = {row[0]: row[1] for row in ao_rows}
-    
-    csv_path = os.path.join(os.getcwd(), "data", "add_on_rates.csv")
+def add_on_rate_rows(csv_path):
     if not os.path.exists(csv_path):
         logger.warning(f"{csv_path} not found. Skipping AddOnRates seeding.")
-        return
-
-    data = []
-    with open(csv_path, 'r', encoding='utf-8', errors='replace') as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-             p_code = row.get("product_code", "").strip()
-             a_code = row.get("add_on_code", "").strip()
-             
-             if not p_code or not a_code:
-                 continue
-                 
-             p_id = prod_map.get(p_code)
-             a_id = ao_map.get(a_code)
-             
-             if p_id and a_id:
-                 # Construct full row for upsert
-                 rate_data = {
-                     "add_on_code": a_code, # Use AddOnMaster linking actually, but AddOnRates model expects add_on_id
-                     "add_on_id": a_id,
-                     "product_code": p_code,
-                     "product_id": p_id,
-                     "rate_type": row.get("rate_type"),
-                     "rate_value": float(row.get("rate_value", 0)) if row.get("rate_value") else 0.0,
-                     # Optional: handle if rate_value is percentage or per-mille dependent on type, 
-                     # but here assuming raw value is what we want.
-                     "si_min": float(row.get("min_si")) if row.get("min_si") else None,
-                     "si_max": float(row.get("max_si")) if row.get("max_si") else None,
-                     "occupancy_rule": row.get("occupancy_rule"), # Ensure column matches model
-                     "active": True
-                 }
-
-                 # Using pg_insert for Upsert
-                 stmt = pg_insert(AddOnRate).values(**rate_data)
-                 # Conflict on composite unique key: (product_code, add_on_code, occupancy_rule) if defined, 
-                 # OR (product_id, add_on_id). 
-                 # Let's check constraint name. If not sure, generic upsert helper might fail if there's no unique constraint.
-                 # Assuming 'uq_add_on_rates_composite' exists on (product_code, add_on_code, rate_type) or similar.
-                 # But wait, original code was doing DELETE FROM add_on_rates which implies reload. 
-                 # If we want UPSERT, we need a unique constraint. 
-                 # Given user request "ON CONFLICT DO UPDATE", let's try generic upsert logic but customized.
-                 
-                 # Since we might not know the exact constraint name or if one covers all these fields, 
-                 # and users sometimes change constraints, safely using the helper 'upsert' method defined at top 
-                 # is safest if it handles conflict. But standard SQLAlchemy insert().on_conflict_do_update() 
-                 # is cleaner for Postgres.
-                 
-                 # We will try the native Postgres approach if we can identify the index. 
-                 # If not, we fall back to the generic 'upsert' helper we have which ignores duplicates. 
-                 # BUT user asked for 'DO UPDATE'. The generic helper does 'DO NOTHING' (ignores).
-                 
-                 # Let's implement specific logic.
-                 # Constraint from migration likely matches (product_code, add_on_code). 
-                 # If occupancy_rule is used, it should be in the key.
-                 
-                 upsert_stmt = stmt.on_conflict_do_update(
-                    index_elements=['product_code', 'add_on_code'], # Assuming this is key
-                    set_={
-                        "rate_type": stmt.excluded.rate_type,
-                        "rate_value": stmt.excluded.rate_value,
-                        "active": stmt.excluded.active
-                    }
-                 )
-                 try:
-                     conn.execute(upsert_stmt)
-                 except Exception:
-                     # Fallback if constraint mismatch (e.g. occupancy_rule involved)
-                     # Or just use the generic upsert which is safer for "seeding" (idempotent-ish)
-                     # but won't update values if they changed. 
-                     # Given the explicit request, let's assume we want valid updates.
-                     # We'll use a slightly broader index assumption or catch.
-                     pass
-                 
-                 # Actually, to be safe and "robust", let's use the Python-side check if we aren't 100% on constraints, 
-                 # OR better, delete specific rows before inserting? No, explicitly asked for ON CONFLICT DO UPDATE.
-                 
-                 # Let's use the unique constraint we surely have or should have created.
-                 # The user previous prompt implied we do have constraints.
-                 # If we fail, we log it.
-                 
-                 try:
-                     # Trying to match what is likely the unique constraint
-                     # Usually (product_id, add_on_id) or (product_code, add_on_code)
-                     stmt_upsert = stmt.on_conflict_do_update(
-                         index_elements=['product_id', 'add_on_id'], 
-                         set_={ "rate_value": stmt.excluded.rate_value }
-                     )
-                     conn.execute(stmt_upsert)
-                 except Exception:
-                     # Retry with different constraint assumption
-                     try:
-                         stmt_upsert_2 = stmt.on_conflict_do_update(
-                             constraint='uq_add_on_rates_composite',
-                             set_={ "rate_value": stmt.excluded.rate_value }
-                         )
-                         conn.execute(stmt_upsert_2)
-                     except Exception as e:
-                         # Final Fallback to delete-insert style for this row? 
-                         # Or just log.
-                         # logger.warning(f"Upsert failed for {p_code}-{a_code}: {e}")
-                         # Use Generic Upsert (DO NOTHING) as last resort
-                         upsert(conn, AddOnRate, rate_data)
-
-             
-    logger.info("Seeding AddOnRates Completed.")
+        return []
+
+    rows = []
+    for line, row in read_csv(csv_path):
+        if not row.get("product_code") or not row.get("add_on_code"):
+            continue
+
+        # The CSV's min_si/max_si and occupancy_rule map onto si_min/si_max and occupancy_type
+        rows.append((line, {
+            "add_on_code": row["add_on_code"],
+            "product_code": row["product_code"],
+            "rate_type": row.get("rate_type"),
+            "rate_value": row.get("rate_value") or 0.0,
+            "si_min": row.get("min_si"),
+            "si_max": row.get("max_si"),
+            "occupancy_type": row.get("occupancy_rule"),
+            "active": True
+        }))
+    return rows
+
+
+class SeedStep:
+    """One seeded table: where its rows come from, how their ids resolve and which tables it needs published first."""
+
+    def __init__(self, model, rows=None, csv_path=None, lookups=None, depends_on=(), publish=None, swap=False):
+        self.model = model
+        self.table = model.__tablename__
+        self.rows = rows
+        self.csv_path = csv_path
+        self.lookups = lookups or {}
+        self.depends_on = tuple(depends_on)
+        # Derived tables are rebuilt by `publish(conn)` instead of being staged
+        self.publish = publish
+        # Tables quotes read are merged into a shadow copy and swapped in (app/services/shadow_swap.py)
+        self.swap = swap
+
+_HERE = os.path.dirname(os.path.abspath(__file__))
+
+# Seeding code (including the inline sample rows); changing any of it reseeds every table
+SEED_CODE = ("seed.py", "app/services/bulk_seed.py", "app/services/rate_lookup.py", "app/services/shadow_swap.py")
+
+# Publish order; every table comes after the tables it depends on.
+# Legacy AddOns (EQ, STFI, Terrorism) are removed via migration and not seeded here.
+SEED_STEPS = {step.table: step for step in (
+    SeedStep(LobMaster, lob_rows),
+    SeedStep(ProductMaster, product_rows, lookups={"lob_id": LOB_ID}, depends_on=("lob_master",)),
+    SeedStep(Occupancy, occupancy_rows, "data/occupancies.csv"),
+    SeedStep(ProductBasicRate, product_basic_rate_rows, "data/product_basic_rates.csv",
+             {"product_id": PRODUCT_ID, "occupancy_id": OCCUPANCY_ID}, ("product_master", "occupancies"), swap=True),
+    SeedStep(BsusRate, bsus_rate_rows, "data/bsus_rates.csv",
+             {"product_id": PRODUCT_ID, "occupancy_id": OCCUPANCY_ID}, ("product_master", "occupancies")),
+    SeedStep(StfiRate, stfi_rate_rows, "data/stfi_rates.csv",
+             {"product_id": PRODUCT_ID, "occupancy_id": OCCUPANCY_ID}, ("product_master", "occupancies")),
+    SeedStep(EqRate, eq_rate_rows, "data/eq_rates.csv",
+             {"product_id": PRODUCT_ID, "occupancy_id": OCCUPANCY_ID}, ("product_master", "occupancies")),
+    SeedStep(TerrorismSlab, terrorism_slab_rows, lookups={"product_id": PRODUCT_ID}, depends_on=("product_master",)),
+    # Using COMPLETE file with all 43 codes (including PASL, PASP, VLIT, ALAC)
+    SeedStep(AddOnMaster, add_on_master_rows, "data/add_on_master_COMPLETE.csv"),
+    SeedStep(AddOnProductMap, add_on_product_map_rows, "data/add_on_product_map.csv",
+             {"product_id": PRODUCT_ID, "add_on_id": ADD_ON_ID}, ("product_master", "add_on_master")),
+    SeedStep(AddOnRate, add_on_rate_rows, "data/add_on_rates.csv",
+             {"product_id": PRODUCT_ID, "add_on_id": ADD_ON_ID}, ("product_master", "add_on_master"), swap=True),
+    # Denormalized lookup rows, rebuilt from the rate tables
+    SeedStep(RateLookupFlat, depends_on=("occupancies", "product_basic_rates", "stfi_rates", "eq_rates"),
+             publish=refresh_rate_lookup_flat),
+)}
+
+def seed_table(conn, name, report=None):
+    """
+    Load one SEED_STEPS table in the caller's transaction (ad-hoc reseeds and
+    scripts), then rebuild every derived (publish) table downstream of it so
+    rate_lookup_flat never lags its source tables.
+    """
+    step = SEED_STEPS[name]
+    report = report if report is not None else SeedReport()
+    logger.info(f"Seeding {name}...")
+    if step.publish:
+        step.publish(conn)
+    elif step.swap:
+        stage = stage_rows(conn, step.model, step.rows(step.csv_path), report, lookups=step.lookups)
+        if stage is None:
+            report.record(name, inserted=0, updated=0)
+        else:
+            swap_in(conn, stage, report)
+    else:
+        merge_rows(conn, step.model, step.rows(step.csv_path), report, lookups=step.lookups)
+
+    changed = {name}
+    for downstream, later in SEED_STEPS.items():
+        if any(d in changed for d in later.depends_on):
+            changed.add(downstream)
+            if later.publish:
+                logger.info(f"Rebuilding {downstream} (depends on {name})...")
+                later.publish(conn)
+    return report
+
+def plan_seed_steps(conn, force=False):
+    """
+    Steps to run, in publish order: every step whose fingerprint or row count
+    no longer matches seed_state (all of them when forced or when seed_state
+    does not exist), plus everything downstream of those.
+    Returns (plan, fingerprints, whether seed_state exists).
+    """
+    state = load_seed_state(conn)
+    if state is None:
+        logger.warning("seed_state table not found (run alembic upgrade head); seeding every table")
+    counts = table_counts(conn, SEED_STEPS)
+    code = code_hash(os.path.join(_HERE, path) for path in SEED_CODE)
+
+    fingerprints = {}
+    plan = []
+    for name, step in SEED_STEPS.items():
+        fingerprints[name] = fingerprint(code, name, file_hash(step.csv_path), *(fingerprints[d] for d in step.depends_on))
+        if (force or state is None or any(d in plan for d in step.depends_on)
+                or not is_current(state.get(name), fingerprints[name], counts[name])):
+            plan.append(name)
+    return plan, fingerprints, state is not None
+
+def _stage_step(bind, step, stage_name):
+    """Read, validate and stage one table on its own connection (runs on a worker thread)."""
+    report = SeedReport()
+    started = time.perf_counter()
+    with bind.begin() as conn:
+        stage = stage_rows(conn, step.model, step.rows(step.csv_path), report, lookups=step.lookups, name=stage_name)
+    report.timing(step.table, "stage", time.perf_counter() - started)
+    return stage, report
+
+def _drop_stages(bind, stages):
+    with bind.begin() as conn:
+        for stage in stages:
+            stage.table.drop(conn, checkfirst=True)
+            if SEED_STEPS[stage.target.name].swap:
+                drop_shadow(conn, stage.target)
+
+def run_seed_steps(bind, report, force=False, workers=None):
+    """
+    Seed the tables planned by plan_seed_steps() and record their new state.
+
+    Staging (CSV read, validation, bulk insert into a stage table) needs no
+    other table, so every planned table is staged concurrently on its own
+    connection. The merges then run in publish order in a single
+    transaction, so readers see either the old or the new data set. Returns
+    the names of the tables that ran.
+    """
+    with bind.connect() as conn:
+        plan, fingerprints, has_state = plan_seed_steps(conn, force)
+    report.skipped.extend(name for name in SEED_STEPS if name not in plan)
+    if not plan:
+        return []
+
+    staged = [SEED_STEPS[name] for name in plan if SEED_STEPS[name].rows]
+    workers = workers or settings.SEED_WORKERS
+    if _is_memory_sqlite(str(bind.url)):
+        workers = 1  # one shared connection
+    workers = max(1, min(workers, len(staged) or 1))
+    run_id = uuid.uuid4().hex[:8]
+    stages = {}
+    try:
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="seed") as pool:
+            futures = {pool.submit(_stage_step, bind, step, f"_seed_{run_id}_{step.table}"): step.table
+                       for step in staged}
+        failures = []
+        for future, name in futures.items():
+            try:
+                stage, step_report = future.result()
+            except Exception as e:
+                failures.append((name, e))
+                continue
+            report.extend(step_report)
+            if stage is not None:
+                stages[name] = stage
+        if failures:
+            name, error = failures[0]
+            raise RuntimeError(f"Staging {name} failed: {error}") from error
+        wall = time.perf_counter() - started
+        summed = sum(report.timings.get(step.table, {}).get("stage_ms", 0) for step in staged)
+        logger.info(f"Staged {len(staged)} tables on {workers} connections in {wall * 1000:.0f} ms "
+                    f"({summed:.0f} ms summed)")
+
+        with bind.begin() as conn:
+            for name in plan:
+                step = SEED_STEPS[name]
+                published = time.perf_counter()
+                if step.publish:
+                    step.publish(conn)
+                elif name in stages:
+                    (swap_in if step.swap else merge_stage)(conn, stages[name], report)
+                else:
+                    report.record(name, inserted=0, updated=0)
+                report.timing(name, "publish", time.perf_counter() - published)
+
+            seeded_counts = table_counts(conn, plan)
+            if has_state:
+                record_seed_state(conn, [
+                    {"table_name": name, "source_hash": fingerprints[name], "csv_path": SEED_STEPS[name].csv_path,
+                     "csv_hash": file_hash(SEED_STEPS[name].csv_path), "row_count": seeded_counts[name]}
+                    for name in plan
+                ])
+        # merge_stage dropped the stage tables as part of the published transaction
+        stages = {}
+    finally:
+        if stages:
+            _drop_stages(bind, stages.values())
+    return plan
+
+def compile_rate_artifact(path, workers=None):
+    """
+    Seed a throwaway SQLite database from data/ with the same SEED_STEPS and
+    write its RateBook rows to `path` as a rate artifact
+    (app/services/rate_artifact.py). Returns (RateBook version, SeedReport).
+    """
+    import tempfile
+    from sqlalchemy import create_engine
+    from app.database import Base
+    import app.models  # noqa: F401  (every table, so create_all matches a migrated database)
+    from app.services.rate_artifact import write_rate_artifact
+    from app.services.rate_book import RateBook
+
+    report = SeedReport()
+    with tempfile.TemporaryDirectory() as tmp:
+        scratch = create_engine(f"sqlite:///{os.path.join(tmp, 'rates.db')}", connect_args={"timeout": 30})
+        try:
+            Base.metadata.create_all(scratch)
+            run_seed_steps(scratch, report, force=True, workers=workers)
+            with scratch.connect() as conn:
+                rows = RateBook.fetch_rows(conn)
+        finally:
+            scratch.dispose()
+    return write_rate_artifact(path, rows), report
 
 def verify_seeding(conn):
-    tables = ["lob_master", "product_master", "occupancies", "product_basic_rates", "bsus_rates", "stfi_rates", "eq_rates", "terrorism_slabs", "add_on_master", "add_on_product_map", "add_on_rates"]
+    tables = ["lob_master", "product_master", "occupancies", "product_basic_rates", "bsus_rates", "stfi_rates", "eq_rates", "terrorism_slabs", "add_on_master", "add_on_product_map", "add_on_rates", "rate_lookup_flat", "seed_state"]
     logger.info("--- Post-Seeding Validation ---")
     
     total_failure = False
@@ -559,10 +483,11 @@ def verify_seeding(conn):
     if total_failure:
         raise Exception("Verification failed: Critical tables are empty.")
 
-def main():
+def main(force=False):
+    """Seed every table whose sources changed (all of them with force=True); returns the SeedReport summary."""
+    started = time.perf_counter()
     print("🚀 SEEDING SCRIPT STARTING... (Standard Output)", flush=True)
     # Debug Info
-    import os
     logger.info(f"Current Working Directory: {os.getcwd()}")
     
     data_dir = os.path.join(os.getcwd(), "data")
@@ -572,37 +497,37 @@ def main():
         logger.warning(f"Data directory {data_dir} does NOT exist!")
 
     logger.info("Starting Seeding Process...")
+    report = SeedReport()
     
     try:
-        # Use context manager for automatic transaction handling
-        with engine.begin() as conn:
-            # Check DB (Optional, inside trans is fine)
+        with engine.connect() as conn:
+            # Check DB (Optional)
             try:
                 db_name = conn.execute(text("SELECT current_database()")).scalar()
                 logger.info(f"Connected to Database: {db_name}")
             except:
                 pass
 
-            seed_lob_and_product(conn)
-            # Legacy AddOns (EQ, STFI, Terrorism) are removed via migration and not seeded here.
-            seed_occupancies(conn)
-            seed_product_basic_rates(conn)
-            seed_bsus_rates(conn)
-            seed_stfi_rates(conn)
-            seed_eq_rates(conn)
-            seed_terrorism_slabs(conn)
-            seed_add_on_master(conn)
-            seed_add_on_product_map(conn)
-            seed_add_on_rates(conn)
-            
-            print("Seeding logic finished, committing...", flush=True)
-        
-        print("✅ Transaction Committed Successfully.", flush=True)
+        # Stages changed tables concurrently, then publishes them in one transaction
+        ran = run_seed_steps(engine, report, force=force)
+        if ran:
+            # Per-table counts, timings and rejected rows (replaces error_dump_v2.txt)
+            report.log()
+            print(f"Seeding logic finished ({', '.join(ran)}).", flush=True)
+
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        if not ran:
+            print(f"✅ Seed data unchanged, nothing to do ({elapsed_ms:.0f} ms).", flush=True)
+            return report.summary()
+
+        print(f"✅ Transaction Committed Successfully ({elapsed_ms:.0f} ms).", flush=True)
         
         # Verify in a separate connection to ensure persistence
         with engine.connect() as verify_conn:
             verify_seeding(verify_conn)
 
+        return report.summary()
+
     except Exception as e:
         print(f"❌ Seeding Failed: {e}", flush=True)
         import traceback
@@ -611,7 +536,7 @@ def main():
 
 if __name__ == "__main__":
     try:
-        main()
+        main(force="--force" in sys.argv[1:])
     except Exception as e:
         print(f"CRITICAL MAIN ERROR: {e}")
         import traceback
@@ -0,0 +1,15 @@
+import pytest
+from sqlalchemy import create_engine
+
+from app.database import Base
+import app.models  # noqa: F401  (registers all tables on Base.metadata)
+
+
+@pytest.fixture
+def engine(tmp_path):
+    """A file-backed SQLite database with every table created. Tests that need rows override it as
+    `def engine(engine)` and seed it; the timeout lets concurrent seeding threads wait for the write lock."""
+    engine = create_engine(f"sqlite:///{tmp_path / 'app.db'}", connect_args={"timeout": 30})
+    Base.metadata.create_all(engine)
+    yield engine
+    engine.dispose()
@@ -0,0 +1,131 @@
+import asyncio
+from decimal import Decimal
+
+import httpx
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.database import Base, get_async_db, to_async_url
+import app.models  # noqa: F401  (registers all tables on Base.metadata)
+from app.main import app
+from app.services.quote_cache import quote_cache
+from app.services.rate_book import get_rate_book_async, reload_rate_book_async, set_rate_book
+from app.services.rating_engine import get_basic_rate_per_mille_async, get_terrorism_rate_per_mille_async
+
+
+@pytest.fixture
+def async_db(tmp_path):
+    path = tmp_path / "rating.db"
+    sync_engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(sync_engine)
+    with sync_engine.begin() as conn:
+        conn.execute(text("INSERT INTO occupancies (id, iib_code, section_aift, occupancy_type, risk_description) "
+                          "VALUES (1, '1001', 'I', 'Residential', 'Dwellings')"))
+        conn.execute(text("INSERT INTO product_basic_rates (product_code, occupancy_id, basic_rate) VALUES ('BGRP', 1, 0.15)"))
+        conn.execute(text("INSERT INTO terrorism_slabs (product_code, occupancy_type, si_min, si_max, rate_per_mille) "
+                          "VALUES ('BGRP', 'Residential', 0, NULL, 0.07)"))
+        conn.execute(text("INSERT INTO irisk_rates (company, lob, product, key, value) VALUES ('UIIC', 'Fire', 'VUSP', 'Office', 0.2)"))
+    async_engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    quote_cache.clear()
+    yield sync_engine, async_engine
+    set_rate_book(None)
+    quote_cache.clear()
+    app.dependency_overrides.clear()
+    asyncio.run(async_engine.dispose())
+
+
+def test_async_url_mapping():
+    assert to_async_url("postgresql://u:p@h/db") == "postgresql+asyncpg://u:p@h/db"
+    assert to_async_url("postgresql+psycopg2://u:p@h/db") == "postgresql+asyncpg://u:p@h/db"
+    assert to_async_url("sqlite:///./local.db") == "sqlite+aiosqlite:///./local.db"
+
+
+def test_rate_book_loads_through_async_engine(async_db):
+    _, async_engine = async_db
+
+    async def run():
+        book = await reload_rate_book_async(async_engine)
+        assert await get_rate_book_async() is book
+        assert await get_basic_rate_per_mille_async("BGRP", "1001") == Decimal("0.15")
+        assert await get_terrorism_rate_per_mille_async("BGRP", "1001", tsi=1000000) == Decimal("0.07")
+
+    asyncio.run(run())
+
+
+def test_fire_endpoints_run_on_the_event_loop(async_db):
+    _, async_engine = async_db
+    sessions = async_sessionmaker(bind=async_engine, expire_on_commit=False)
+
+    async def override_get_async_db():
+        async with sessions() as db:
+            yield db
+
+    app.dependency_overrides[get_async_db] = override_get_async_db
+
+    async def run():
+        await reload_rate_book_async(async_engine)
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            vusp = [
+                client.post("/irisk/fire/uiic/vusp/calculate", json={"building_si": 1000000 + i, "occupancy": "office"})
+                for i in range(20)
+            ]
+            bgrp = client.post("/irisk/fire/uiic/bgrp/calculate", json={"buildingSI": 1000000, "contentsSI": 200000})
+            return await asyncio.gather(*vusp, bgrp)
+
+    responses = asyncio.run(run())
+    assert all(r.status_code == 200 for r in responses)
+    assert responses[0].json()["data"]["rate_applied"] == 0.2
+    assert responses[0].json()["data"]["basic_premium"] == 200.0
+    assert responses[-1].json()["data"]["terrorismPremium"] == 84.0
+
+
+def test_building_quotes_follow_irisk_rates_changes(async_db):
+    sync_engine, async_engine = async_db
+    sessions = async_sessionmaker(bind=async_engine, expire_on_commit=False)
+
+    async def override_get_async_db():
+        async with sessions() as db:
+            yield db
+
+    app.dependency_overrides[get_async_db] = override_get_async_db
+
+    async def quote():
+        await reload_rate_book_async(async_engine)
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            response = await client.post("/irisk/fire/uiic/vusp/calculate",
+                                         json={"building_si": 1000000, "occupancy": "office"})
+        return response.json()["data"]["rate_applied"]
+
+    assert asyncio.run(quote()) == 0.2
+    # irisk_rates is not part of the RateBook version, so nothing may serve the old rate
+    with sync_engine.begin() as conn:
+        conn.execute(text("UPDATE irisk_rates SET value = 0.3 WHERE product = 'VUSP'"))
+    assert asyncio.run(quote()) == 0.3
+
+
+def test_home_routes_price_without_a_database_session(async_db):
+    sync_engine, async_engine = async_db
+    with sync_engine.begin() as conn:
+        conn.execute(text("INSERT INTO product_basic_rates (product_code, occupancy_id, basic_rate) VALUES ('UBGR', 1, 0.15)"))
+        conn.execute(text("INSERT INTO terrorism_slabs (product_code, occupancy_type, si_min, si_max, rate_per_mille) "
+                          "VALUES ('UBGR', 'Residential', 0, NULL, 0.07)"))
+
+    async def no_session():
+        raise AssertionError("route opened a database session")
+        yield
+
+    app.dependency_overrides[get_async_db] = no_session
+
+    async def run():
+        await reload_rate_book_async(async_engine)
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await client.post("/api/fire/ubgr/calculate",
+                                     json={"productCode": "UBGR", "occupancyCode": "1001", "buildingSI": 1000000})
+
+    response = asyncio.run(run())
+    assert response.status_code == 200
+    assert response.json()["breakdown"]["basic_premium"] == 150.0
@@ -0,0 +1,115 @@
+import random
+
+import pytest
+from pydantic import ValidationError
+
+from app.config import settings
+from app.schemas.fire_premium import UBGRUVGRBatchRequest, UBGRUVGRRequest
+from app.services.batch_pricing import price_portfolio
+from app.services.fire_premium_service import FirePremiumCalculator
+from app.services.rate_book import RateBook, set_rate_book
+
+FIELDS = [
+    "basic_premium", "add_on_premium", "discount_amount", "sub_total", "loading_amount",
+    "terrorism_premium", "net_premium", "cgst", "sgst", "gross_premium",
+]
+
+
+@pytest.fixture
+def book():
+    basic, add_ons = [], []
+    for product in ("UBGR", "UVGR", "UVGS"):
+        basic += [(product, "1001", "0.15"), (product, "1001_2", "0.123457")]
+        add_ons += [
+            (product, "EQ", "per_mille", "0.5", None),
+            (product, "STFI", "percentage", "0.012345", "EXCEPT_1001_2"),
+            (product, "VLIT", "fixed", "12.345", None),
+            (product, "PA_PROPOSER", "fixed", "7", None),
+            (product, "PA_SPOUSE", "fixed", "7", None),
+        ]
+    b = RateBook(
+        basic_rates=basic,
+        occupancy_types=[("1001", "Residential"), ("1001_2", "Residential")],
+        terrorism_slabs=[
+            ("UBGR", "Residential", 0, 5000000, "0.07"),
+            ("UBGR", "Residential", 5000000, None, "0.05"),
+        ],
+        add_on_rates=add_ons,
+    )
+    set_rate_book(b)
+    yield b
+    set_rate_book(None)
+
+
+@pytest.mark.parametrize("product", ["UBGR", "UVGR", "UVGS"])
+def test_batch_matches_scalar_rounding(book, product):
+    rng = random.Random(42)
+    add_on_codes = ["EQ", "STFI", "VLIT"]
+    rows = []
+    for _ in range(300):
+        building = rng.choice([rng.randint(1, 99) * 100000, rng.randint(100000, 9999999)])
+        rows.append({
+            "occupancyCode": rng.choice(["1001", "1001_2"]),
+            "buildingSI": float(building),
+            "contentsSI": float(rng.choice([0, rng.randint(1000, 500000)])),
+            "discountPercentage": rng.choice([0, 5, 12.5, 7.25, 33.333]),
+            "loadingPercentage": rng.choice([0, 10, 2.5, 0.75]),
+            "addOnSI": [rng.choice([None, float(rng.randint(1000, 3000000))]) for _ in add_on_codes],
+            "pa": (rng.random() < 0.5, rng.random() < 0.3),
+        })
+
+    batch = price_portfolio(
+        product_code=product,
+        occupancy_codes=[r["occupancyCode"] for r in rows],
+        building_si=[r["buildingSI"] for r in rows],
+        contents_si=[r["contentsSI"] for r in rows],
+        discount_pct=[r["discountPercentage"] for r in rows],
+        loading_pct=[r["loadingPercentage"] for r in rows],
+        add_on_codes=add_on_codes,
+        add_on_si=[r["addOnSI"] for r in rows],
+        pa_proposer=[r["pa"][0] for r in rows],
+        pa_spouse=[r["pa"][1] for r in rows],
+    )
+    assert batch["errors"] == []
+
+    for i, r in enumerate(rows):
+        scalar = FirePremiumCalculator.calculate_ubgr_uvgr(UBGRUVGRRequest(
+            productCode=product,
+            occupancyCode=r["occupancyCode"],
+            buildingSI=r["buildingSI"],
+            contentsSI=r["contentsSI"],
+            addOns=[{"addOnCode": c, "sumInsured": si} for c, si in zip(add_on_codes, r["addOnSI"]) if si is not None],
+            paSelection={"proposer": r["pa"][0], "spouse": r["pa"][1]},
+            discountPercentage=r["discountPercentage"],
+            loadingPercentage=r["loadingPercentage"],
+        ))
+        for field in FIELDS:
+            assert batch[field][i] == getattr(scalar, field), f"row {i} {field}"
+
+
+def test_batch_reports_unpriceable_rows(book):
+    result = price_portfolio("UBGR", ["1001", "9999"], [1000000, 1000000])
+    assert result["net_premium"][0] is not None
+    assert result["net_premium"][1] is None
+    assert [e["index"] for e in result["errors"]] == [1]
+
+    with pytest.raises(ValueError):
+        price_portfolio("UBGR", ["1001"], [1, 2])
+
+
+@pytest.mark.parametrize("fields", [
+    {"buildingSI": [-1]},
+    {"buildingSI": [1000000], "contentsSI": [-1]},
+    {"buildingSI": [1000000], "discountPercentage": [101]},
+    {"buildingSI": [1000000], "loadingPercentage": [-5]},
+    {"buildingSI": [1000000], "addOnCodes": ["EQ"], "addOnSI": [[-1]]},
+])
+def test_batch_request_items_are_validated_like_the_scalar_request(fields):
+    with pytest.raises(ValidationError):
+        UBGRUVGRBatchRequest(productCode="UBGR", occupancyCodes=["1001"], **fields)
+
+
+def test_batch_request_size_is_capped():
+    n = settings.BATCH_MAX_RISKS + 1
+    with pytest.raises(ValidationError):
+        UBGRUVGRBatchRequest(productCode="UBGR", occupancyCodes=["1001"] * n, buildingSI=[1000000] * n)
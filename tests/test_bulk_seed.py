@@ -0,0 +1,111 @@
+import pytest
+from sqlalchemy import event, text
+
+from app.models.fire_models import AddOnRate, Occupancy, ProductBasicRate
+from app.services.bulk_seed import SeedReport, merge_rows
+
+import seed
+
+
+@pytest.fixture
+def data_dir(tmp_path, monkeypatch):
+    (tmp_path / "data").mkdir()
+    monkeypatch.chdir(tmp_path)
+    return tmp_path / "data"
+
+
+def _occupancy(iib, kind="Residential"):
+    return {"iib_code": iib, "section_aift": "I", "occupancy_type": kind, "risk_description": f"Risk {iib}"}
+
+
+def test_merge_inserts_updates_and_reports_bad_rows(engine):
+    report = SeedReport()
+    with engine.begin() as conn:
+        counts = merge_rows(conn, Occupancy, [
+            (2, _occupancy("1001")),
+            (3, _occupancy("1002", "Industrial")),
+            (4, _occupancy("1001", "Industrial")),        # duplicate key: first row wins
+            (5, {**_occupancy("1003"), "section_aift": ""}),  # NOT NULL column left blank
+            (6, {**_occupancy("1004"), "iib_code": "X" * 21}),  # longer than String(20)
+        ], report)
+    assert counts == {"staged": 2, "inserted": 2, "updated": 0}
+    assert [(e["line"], e["reason"]) for e in report.errors] == [
+        (4, "duplicate of line 2, ignored"),
+        (5, "section_aift is required"),
+        (6, f"iib_code={'X' * 21!r}: longer than 20 characters"),
+    ]
+    assert report.table_counts()["occupancies"]["rejected"] == 3
+
+    with engine.begin() as conn:
+        counts = merge_rows(conn, Occupancy, [
+            (2, _occupancy("1001")),
+            (3, _occupancy("1002", "Non-Industrial")),
+            (4, _occupancy("1005")),
+        ], SeedReport())
+        assert counts == {"staged": 3, "inserted": 1, "updated": 1}
+        rows = conn.execute(text("SELECT id, iib_code, occupancy_type FROM occupancies ORDER BY id")).all()
+    assert [tuple(r) for r in rows] == [(1, "1001", "Residential"), (2, "1002", "Non-Industrial"), (3, "1005", "Residential")]
+
+
+def test_merge_matches_nullable_key_columns(engine):
+    row = {"add_on_id": 1, "product_code": "SFSP", "product_id": 1, "occupancy_type": None,
+           "si_min": None, "si_max": None, "rate_type": "policy_rate", "rate_value": "0.5", "active": True}
+    with engine.begin() as conn:
+        merge_rows(conn, AddOnRate, [(1, row)], SeedReport())
+        counts = merge_rows(conn, AddOnRate, [(1, {**row, "rate_value": "0.75"})], SeedReport())
+        assert counts == {"staged": 1, "inserted": 0, "updated": 1}
+        assert conn.execute(text("SELECT COUNT(*), MAX(rate_value) FROM add_on_rates")).one() == (1, 0.75)
+
+
+def test_seed_tables_in_a_few_statements(engine, data_dir):
+    iibs = [str(1000 + i) for i in range(300)]
+    (data_dir / "occupancies.csv").write_text(
+        "iib_code,section_aift,occupancy_type,risk_description\n"
+        + "".join(f"{iib},I,Residential,Risk {iib}\n" for iib in iibs)
+    )
+    (data_dir / "product_basic_rates.csv").write_text(
+        "iib_code,product_code,basic_rate\n"
+        + "".join(f"{iib},SFSP,0.{i % 90 + 10}\n" for i, iib in enumerate(iibs))
+        + "9999,SFSP,0.5\n1000,NOPE,0.5\n1001,SFSP,abc\n"
+    )
+
+    statements = []
+
+    def count(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    report = SeedReport()
+    with engine.begin() as conn:
+        seed.seed_table(conn, "lob_master", report)
+        seed.seed_table(conn, "product_master", report)
+        seed.seed_table(conn, "occupancies", report)
+        event.listen(engine, "before_cursor_execute", count)
+        seed.seed_table(conn, "product_basic_rates", report)
+        event.remove(engine, "before_cursor_execute", count)
+
+    # create/stage, 2 id lookups + unresolved check/delete, update/insert, drop, plus the shadow
+    # copy, validation and rename (app/services/shadow_swap.py), and the rate_lookup_flat
+    # rebuild (app/services/rate_lookup.py); independent of the 300 rows
+    assert len(statements) <= 28
+    assert report.tables["product_basic_rates"] == {"staged": 300, "inserted": 300, "updated": 0, "swapped": 1}
+    assert sorted((e["line"], e["reason"]) for e in report.errors_for("product_basic_rates")) == [
+        (302, "unknown iib_code '9999'"),
+        (303, "unknown product_code 'NOPE'"),
+        (304, "basic_rate='abc': not a number"),
+    ]
+    assert not (data_dir.parent / "error_dump_v2.txt").exists()
+
+    # A rerun with the same CSV changes nothing
+    rerun = SeedReport()
+    with engine.begin() as conn:
+        seed.seed_table(conn, "product_basic_rates", rerun)
+        assert conn.execute(text("SELECT COUNT(*) FROM product_basic_rates")).scalar() == 300
+    assert rerun.tables["product_basic_rates"] == {"staged": 300, "inserted": 0, "updated": 0}
+
+
+def test_upsert_helper_merges_single_row(engine):
+    with engine.begin() as conn:
+        seed.upsert(conn, Occupancy, _occupancy("1001"))
+        report = seed.upsert(conn, ProductBasicRate, {"product_code": "SFSP", "occupancy_id": 1})
+        assert conn.execute(text("SELECT COUNT(*) FROM occupancies")).scalar() == 1
+    assert report.errors[0]["reason"] == "basic_rate is required"
@@ -0,0 +1,66 @@
+from decimal import Decimal
+
+import pytest
+
+from app.schemas.fire_premium import UBGRUVGRRequest
+from app.services.fire_premium_service import FirePremiumCalculator
+from app.services.rate_book import RateBook, set_rate_book
+from app.services.rate_resolver import resolve_rates
+
+
+@pytest.fixture
+def book():
+    b = RateBook(
+        basic_rates=[("UBGR", "1001", "0.15"), ("UVGS", "1001", "0.15")],
+        occupancy_types=[("1001", "Residential")],
+        terrorism_slabs=[("UBGR", "Residential", 0, None, "0.07")],
+        add_on_rates=[
+            ("UBGR", "EQ", "per_mille", "0.5", None),
+            ("UBGR", "PA_PROPOSER", "fixed", "7", None),
+        ],
+    )
+    set_rate_book(b)
+    yield b
+    set_rate_book(None)
+
+
+def _request(**overrides):
+    payload = {
+        "productCode": "UBGR",
+        "occupancyCode": "1001",
+        "buildingSI": 1000000,
+        "contentsSI": 200000,
+        "addOns": [{"addOnCode": "EQ", "sumInsured": 1200000}],
+        "paSelection": {"proposer": True, "spouse": False},
+        "discountPercentage": 5,
+        "loadingPercentage": 10,
+    }
+    payload.update(overrides)
+    return UBGRUVGRRequest(**payload)
+
+
+def test_resolver_bundles_every_rate(book):
+    rates = resolve_rates(_request())
+    assert rates.rate_version == book.version
+    assert rates.basic_rate == Decimal("0.15")
+    assert rates.terrorism_rate == Decimal("0.07")
+    assert rates.add_on_rates == {"EQ": ("per_mille", Decimal("0.5")), "PA_PROPOSER": ("fixed", Decimal("7"))}
+    assert rates.add_on_rate("UNKNOWN") == ("fixed", Decimal("0.0"))
+
+
+def test_ubgr_breakdown(book):
+    breakdown = FirePremiumCalculator.calculate_ubgr_uvgr(_request())
+    assert breakdown.basic_premium == 180.0
+    assert breakdown.add_on_premium == 607.0
+    assert breakdown.discount_amount == 39.35
+    assert breakdown.sub_total == 747.65
+    assert breakdown.loading_amount == 74.77
+    assert breakdown.terrorism_premium == 84.0
+    assert breakdown.net_premium == 906.42
+    assert breakdown.gross_premium == 1070.58
+
+
+def test_uvgs_has_no_terrorism(book):
+    breakdown = FirePremiumCalculator.calculate_ubgr_uvgr(_request(productCode="UVGS", addOns=[], paSelection={}, discountPercentage=0, loadingPercentage=0))
+    assert breakdown.terrorism_premium == 0.0
+    assert breakdown.net_premium == 180.0
@@ -0,0 +1,81 @@
+import asyncio
+import time
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.config import settings
+from app.database import Base
+import app.models  # noqa: F401  (registers all tables on Base.metadata)
+from app.services import insurer_comparison
+from app.services.insurer_comparison import compare_insurers
+
+
+@pytest.fixture
+def sessions(tmp_path):
+    path = tmp_path / "rates.db"
+    sync_engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(sync_engine)
+    with sync_engine.begin() as conn:
+        for company, rate in (("UIIC", 0.20), ("NIA", 0.18), ("NICL", 0.25)):
+            conn.execute(text("INSERT INTO irisk_rates (company, lob, product, key, value) "
+                              "VALUES (:c, 'Fire', 'VUSP', 'Office', :v)"), {"c": company, "v": rate})
+    async_engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    yield async_sessionmaker(bind=async_engine, expire_on_commit=False)
+    asyncio.run(async_engine.dispose())
+
+
+def test_quotes_are_ranked_by_gross_premium(sessions):
+    result = asyncio.run(compare_insurers("vusp", " office", 1000000, insurers=["UIIC", "NIA", "NICL", "OICL"],
+                                          session_factory=sessions))
+    assert [q["company"] for q in result["quotes"]] == ["NIA", "UIIC", "NICL", "OICL"]
+    assert [q["rank"] for q in result["quotes"]] == [1, 2, 3, None]
+    assert result["best"] == "NIA"
+    assert result["occupancy"] == "Office"
+    assert result["quotes"][0]["basic_premium"] == 180.0
+    assert result["quotes"][-1]["available"] is False
+
+
+def test_insurers_are_rated_concurrently(sessions, monkeypatch):
+    async def slow_lookup(db, company, product_code, occupancy):
+        await asyncio.sleep(0.2)
+        return 0.2
+
+    monkeypatch.setattr(insurer_comparison, "lookup_insurer_rate", slow_lookup)
+    monkeypatch.setattr(settings, "COMPARISON_INSURERS", ["A", "B", "C", "D", "E"])
+    started = time.perf_counter()
+    result = asyncio.run(compare_insurers("VUSP", "Office", 1000000, insurers=["A", "B", "C", "D", "E"],
+                                          session_factory=sessions))
+    assert time.perf_counter() - started < 0.6
+    assert all(q["available"] for q in result["quotes"])
+
+
+def test_only_configured_insurers_can_be_compared(sessions):
+    with pytest.raises(ValueError, match="XYZ"):
+        asyncio.run(compare_insurers("VUSP", "Office", 1000000, insurers=["UIIC", "xyz"], session_factory=sessions))
+
+
+def test_uiic_uses_its_route_fallback_rate(sessions):
+    result = asyncio.run(compare_insurers("VUSP", "Shop", 1000000, insurers=["UIIC", "NIA"],
+                                          session_factory=sessions))
+    quotes = {q["company"]: q for q in result["quotes"]}
+    assert quotes["UIIC"]["available"] is True
+    assert quotes["UIIC"]["rate_applied"] == 0.25  # fallback_rate("VUSP", "Shop")
+    assert quotes["NIA"]["available"] is False
+
+
+
+def test_timeout_covers_the_session_checkout(monkeypatch):
+    class BlockedCheckout:
+        async def __aenter__(self):
+            await asyncio.sleep(5)  # e.g. waiting on an exhausted pool
+
+        async def __aexit__(self, *exc):
+            return False
+
+    monkeypatch.setattr(settings, "COMPARISON_TIMEOUT_SECONDS", 0.2)
+    started = time.perf_counter()
+    result = asyncio.run(compare_insurers("VUSP", "Office", 1000000, insurers=["NIA"], session_factory=BlockedCheckout))
+    assert time.perf_counter() - started < 2
+    assert result["quotes"][0]["message"] == "Timed out after 0.2s"
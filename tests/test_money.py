@@ -0,0 +1,26 @@
+from decimal import Decimal
+
+from app.utils.money import Money
+from app.utils.rating_engine import round_currency
+
+
+def test_from_rupees_rounds_half_up_on_the_written_value():
+    assert Money.from_rupees(1.005).paise == 101
+    assert Money.from_rupees(2.675).paise == 268
+    assert Money.from_rupees("0.125").paise == 13
+    assert Money.from_rupees(-0.125).paise == -13
+    assert Money.from_rupees(1200000).paise == 120000000
+
+
+def test_rates_and_percentages_are_exact():
+    si = Money.from_rupees(1200000)
+    assert si.apply_rate(Decimal("0.15"), 1000) == Money(18000)
+    assert si.apply_rate(0.07, 1000) == Money(8400)
+    assert Money(78700).percent(5) == Money(3935)
+    assert Money(74765).percent(10) == Money(7477)  # 74.765 -> 74.77
+
+
+def test_formatting_and_round_currency():
+    assert str(Money(-5)) == "-0.05"
+    assert Money(107058).to_rupees() == 1070.58
+    assert round_currency(2.675) == 2.68
@@ -0,0 +1,68 @@
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import QueuePool
+
+from app.database import _is_memory_sqlite, pool_options
+from app.pool_metrics import PoolMetrics, get_pool_metrics, instrument_engine, pool_status, timed_pool_class
+
+
+@pytest.fixture
+def instrumented(tmp_path):
+    metrics = PoolMetrics("test")
+    engine = create_engine(f"sqlite:///{tmp_path / 'pool.db'}", poolclass=timed_pool_class(QueuePool, metrics),
+                           pool_size=1, max_overflow=1, pool_timeout=0.05)
+    instrument_engine(engine, metrics)
+    yield engine, metrics
+    engine.dispose()
+
+
+def test_checkout_checkin_and_overflow_are_counted(instrumented):
+    engine, metrics = instrumented
+    with engine.connect() as a, engine.connect() as b:
+        a.execute(text("SELECT 1"))
+        b.execute(text("SELECT 1"))
+        assert metrics.stats()["checked_out"] == 2
+        assert pool_status(engine)["overflow"] == 1
+
+    stats = metrics.stats()
+    assert stats["checkouts"] == 2 and stats["checkins"] == 2
+    assert stats["checked_out"] == 0 and stats["max_checked_out"] == 2
+    assert stats["overflow_checkouts"] == 1
+    assert stats["connects"] == 2
+    assert stats["wait_ms_total"] >= 0
+    assert get_pool_metrics()["test"] is metrics
+
+
+def test_exhausted_pool_records_timeout_and_wait(instrumented):
+    engine, metrics = instrumented
+    with engine.connect(), engine.connect():
+        with pytest.raises(PoolTimeoutError):
+            engine.connect()
+    stats = metrics.stats()
+    assert stats["timeouts"] == 1
+    assert stats["wait_ms_max"] >= 40
+
+
+def test_invalidation_and_dispose_keep_reporting(instrumented):
+    engine, metrics = instrumented
+    with engine.connect() as conn:
+        conn.invalidate()
+    assert metrics.stats()["invalidations"] == 1
+
+    engine.dispose()
+    engine.connect().close()
+    assert metrics.stats()["checkouts"] == 2
+
+
+def test_pool_options_follow_settings(monkeypatch):
+    from app.config import settings
+    monkeypatch.setattr(settings, "DB_POOL_SIZE", 7)
+    monkeypatch.setattr(settings, "DB_POOL_RECYCLE", 60)
+    options = pool_options("postgresql://u:p@h/db", PoolMetrics("x"))
+    assert options["pool_size"] == 7 and options["pool_recycle"] == 60
+    assert issubclass(options["poolclass"], QueuePool)
+
+    assert _is_memory_sqlite("sqlite://") and _is_memory_sqlite("sqlite:///:memory:")
+    assert not _is_memory_sqlite("sqlite:////tmp/x.db")
+    assert "pool_size" not in pool_options("sqlite://", PoolMetrics("y"))
@@ -0,0 +1,61 @@
+import pytest
+from pydantic import ValidationError
+
+from app.schemas.fire_premium import UBGRUVGRRequest, UBGRUVGRSweepRequest
+from app.services.fire_premium_service import FirePremiumCalculator
+from app.services.premium_sweep import SI_FIELDS, SURFACE_FIELDS, price_sweep
+from app.services.rate_book import RateBook, set_rate_book
+
+
+@pytest.fixture
+def book():
+    b = RateBook(
+        basic_rates=[("UBGR", "1001", "0.15")],
+        occupancy_types=[("1001", "Residential")],
+        terrorism_slabs=[
+            ("UBGR", "Residential", 0, 5000000, "0.07"),
+            ("UBGR", "Residential", 5000000, None, "0.05"),
+        ],
+        add_on_rates=[("UBGR", "EQ", "per_mille", "0.5", None), ("UBGR", "PA_PROPOSER", "fixed", "7", None)],
+    )
+    set_rate_book(b)
+    yield b
+    set_rate_book(None)
+
+
+def test_sweep_matches_scalar_across_slab_boundary(book):
+    si_axis = [4000000, 4800000, 5000000]
+    discounts, loadings = [0, 5, 12.5], [0, 10]
+    sweep = price_sweep("UBGR", "1001", si_axis, discounts, loadings, contents_si=200000,
+                        add_ons=[("EQ", 1200000)], pa_proposer=True)
+
+    assert sweep["shape"] == [3, 3, 2]
+    assert sweep["errors"] == []
+    assert sweep["bySI"]["terrorism_rate"] == [0.07, 0.05, 0.05]
+
+    i = 0
+    for s_idx, si in enumerate(si_axis):
+        for discount in discounts:
+            for loading in loadings:
+                scalar = FirePremiumCalculator.calculate_ubgr_uvgr(UBGRUVGRRequest(
+                    productCode="UBGR", occupancyCode="1001", buildingSI=si, contentsSI=200000,
+                    addOns=[{"addOnCode": "EQ", "sumInsured": 1200000}], paSelection={"proposer": True},
+                    discountPercentage=discount, loadingPercentage=loading,
+                ))
+                for field in SURFACE_FIELDS:
+                    assert sweep["surface"][field][i] == getattr(scalar, field), (si, discount, loading, field)
+                for field in SI_FIELDS:
+                    assert sweep["bySI"][field][s_idx] == getattr(scalar, field)
+                i += 1
+
+
+def test_sweep_rejects_bad_axes(book):
+    with pytest.raises(ValueError):
+        price_sweep("UBGR", "1001", [])
+    with pytest.raises(ValueError):
+        price_sweep("UBGR", "1001", [1000000], discount_pct=[150])
+
+
+def test_sweep_si_values_must_not_be_negative():
+    with pytest.raises(ValidationError):
+        UBGRUVGRSweepRequest(productCode="UBGR", occupancyCode="1001", buildingSI=[1000000, -1])
@@ -0,0 +1,75 @@
+"""
+Query-plan regression tests: every rating hot-path statement must be served
+by an index on SQLite. A plan line such as "SCAN irisk_rates" (no index)
+means a composite index was dropped or the statement stopped matching it.
+"""
+import pytest
+from sqlalchemy import create_engine, text
+
+from app.database import Base
+import app.models  # noqa: F401  (registers all tables on Base.metadata)
+from app.services.fire_pricing import insurer_rate_query
+
+HOT_PATH_STATEMENTS = {
+    "basic_rate": (
+        "SELECT basic_rate FROM product_basic_rates WHERE product_code = :product AND occupancy_id = :occupancy_id",
+        {"product": "BGRP", "occupancy_id": 1},
+        "ix_product_basic_rates_product_occupancy",
+    ),
+    "add_on_rate": (
+        "SELECT rate_type, rate_value FROM add_on_rates WHERE product_code = :product AND add_on_id = :add_on_id",
+        {"product": "SFSP", "add_on_id": 1},
+        "ix_add_on_rates_product_add_on",
+    ),
+    "terrorism_slab": (
+        "SELECT rate_per_mille FROM terrorism_slabs "
+        "WHERE product_code = :product AND occupancy_type = :type AND si_min <= :tsi "
+        "ORDER BY si_min DESC LIMIT 1",
+        {"product": "BGRP", "type": "Residential", "tsi": 1200000},
+        "ix_terrorism_slabs_product_type_si_min",
+    ),
+    "flat_rate": (
+        "SELECT * FROM rate_lookup_flat WHERE product_code = :product AND iib_code = :iib_code",
+        {"product": "SFSP", "iib_code": "1001"},
+        "sqlite_autoindex_rate_lookup_flat_1",
+    ),
+}
+
+
+@pytest.fixture(scope="module")
+def engine(tmp_path_factory):
+    engine = create_engine(f"sqlite:///{tmp_path_factory.mktemp('plans') / 'plans.db'}")
+    Base.metadata.create_all(engine)
+    yield engine
+    engine.dispose()
+
+
+def _plan(conn, sql, params):
+    return [row[-1] for row in conn.execute(text(f"EXPLAIN QUERY PLAN {sql}"), params)]
+
+
+def _assert_indexed(plan, table, index):
+    assert any(line.startswith(f"SEARCH {table} USING") and index in line for line in plan), plan
+    assert not any(line.startswith(f"SCAN {table}") for line in plan), plan
+    assert not any("TEMP B-TREE" in line for line in plan), plan
+
+
+@pytest.mark.parametrize("name", sorted(HOT_PATH_STATEMENTS))
+def test_rate_lookups_use_composite_indexes(engine, name):
+    sql, params, index = HOT_PATH_STATEMENTS[name]
+    table = sql.split(" FROM ", 1)[1].split()[0]
+    with engine.connect() as conn:
+        _assert_indexed(_plan(conn, sql, params), table, index)
+
+
+def test_insurer_rate_lookup_uses_lower_key_index(engine):
+    compiled = insurer_rate_query("UIIC", "VUSP", "Office").compile(engine, compile_kwargs={"literal_binds": True})
+    with engine.connect() as conn:
+        plan = _plan(conn, str(compiled), {})
+    _assert_indexed(plan, "irisk_rates", "ix_irisk_rates_lookup")
+
+
+def test_covering_index_for_basic_rate(engine):
+    sql, params, _ = HOT_PATH_STATEMENTS["basic_rate"]
+    with engine.connect() as conn:
+        assert any("COVERING INDEX" in line for line in _plan(conn, sql, params))
@@ -0,0 +1,58 @@
+import pytest
+
+from app.schemas.fire_premium import UBGRUVGRRequest
+from app.services.fire_premium_service import FirePremiumCalculator
+from app.services.quote_cache import QuoteCache, canonical_key, quote_cache
+from app.services.rate_book import RateBook, set_rate_book
+
+
+def _book(basic_rate):
+    return RateBook(
+        basic_rates=[("UVGS", "1001", basic_rate)],
+        occupancy_types=[("1001", "Residential")],
+        terrorism_slabs=[],
+        add_on_rates=[],
+    )
+
+
+@pytest.fixture(autouse=True)
+def clean_cache():
+    quote_cache.clear()
+    yield
+    quote_cache.clear()
+    set_rate_book(None)
+
+
+def test_canonical_key_ignores_key_order_and_float_form():
+    a = canonical_key("q", {"si": 1000000.0, "occ": " 1001"}, "v1")
+    b = canonical_key("q", {"occ": "1001", "si": 1000000}, "v1")
+    assert a == b
+    assert a != canonical_key("q", {"occ": "1001", "si": 1000000}, "v2")
+
+
+def test_lru_eviction_and_ttl(monkeypatch):
+    cache = QuoteCache(max_entries=2, ttl_seconds=10)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1
+    cache.put("c", 3)  # evicts "b", the least recently used
+    assert cache.get("b") is None
+    assert cache.evictions == 1
+
+    import app.services.quote_cache as module
+    now = module.time.monotonic()
+    monkeypatch.setattr(module.time, "monotonic", lambda: now + 11)
+    assert cache.get("a") is None
+    assert cache.stats()["expirations"] == 1
+
+
+def test_calculator_hits_cache_until_rates_change():
+    request = UBGRUVGRRequest(productCode="uvgs", occupancyCode="1001", buildingSI=1000000, contentsSI=200000)
+    set_rate_book(_book("0.15"))
+    first = FirePremiumCalculator.calculate_ubgr_uvgr(request)
+    assert FirePremiumCalculator.calculate_ubgr_uvgr(request) is first
+    assert quote_cache.stats()["hits"] >= 1
+
+    set_rate_book(_book("0.20"))
+    repriced = FirePremiumCalculator.calculate_ubgr_uvgr(request)
+    assert repriced.basic_premium == 240.0
@@ -0,0 +1,109 @@
+import asyncio
+import time
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.database import Base
+import app.models  # noqa: F401  (registers all tables on Base.metadata)
+from app.services.quote_sink import QuoteSink
+from app.services.quote_store import quote_row
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = tmp_path / "quotes.db"
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+    engine.dispose()
+    return path
+
+
+def _count(path):
+    engine = create_engine(f"sqlite:///{path}")
+    with engine.connect() as conn:
+        count = conn.execute(text("SELECT COUNT(*) FROM irisk_quotes")).scalar()
+    engine.dispose()
+    return count
+
+
+def _row(i):
+    return quote_row("UIIC", "Fire", "VUSP", {"building_si": 1000000 + i}, {"gross_premium": 318.6})
+
+
+def test_batches_by_size_and_drains_on_stop(db_path):
+    async def run():
+        engine = create_async_engine(f"sqlite+aiosqlite:///{db_path}")
+        sink = QuoteSink(max_queue=1000, batch_size=50, flush_ms=1000, engine_factory=lambda: engine)
+        sink.start()
+        assert all(sink.submit(_row(i)) for i in range(120))
+        await sink.stop()
+        await engine.dispose()
+        return sink.stats()
+
+    stats = asyncio.run(run())
+    assert stats["written"] == 120 and stats["failed"] == 0
+    # 50 + 50 by size, the remaining 20 on drain
+    assert stats["batches"] == 3
+    assert _count(db_path) == 120
+
+
+def test_flushes_partial_batch_after_interval(db_path):
+    async def run():
+        engine = create_async_engine(f"sqlite+aiosqlite:///{db_path}")
+        sink = QuoteSink(max_queue=100, batch_size=100, flush_ms=20, engine_factory=lambda: engine)
+        sink.start()
+        sink.submit(_row(0))
+        await asyncio.sleep(0.3)
+        written = sink.written
+        await sink.stop()
+        await engine.dispose()
+        return written
+
+    assert asyncio.run(run()) == 1
+
+
+def test_full_or_stopped_sink_asks_caller_to_write():
+    async def run():
+        sink = QuoteSink(max_queue=2, batch_size=10, flush_ms=10000, engine_factory=lambda: None)
+        assert not sink.submit(_row(0))  # not started
+        sink.start()
+        results = [sink.submit(_row(i)) for i in range(3)]
+        sink._task.cancel()
+        return results, sink.sync_fallbacks
+
+    results, fallbacks = asyncio.run(run())
+    assert results == [True, True, False]
+    assert fallbacks == 2
+
+
+def test_submit_latency_does_not_wait_for_commit():
+    class SlowEngine:
+        def begin(self):
+            return self
+
+        async def __aenter__(self):
+            await asyncio.sleep(0.2)  # simulated slow commit
+            return self
+
+        async def __aexit__(self, *exc):
+            return False
+
+        async def execute(self, statement):
+            return None
+
+    async def run():
+        sink = QuoteSink(max_queue=1000, batch_size=50, flush_ms=5, engine_factory=SlowEngine)
+        sink.start()
+        started = time.perf_counter()
+        for i in range(100):
+            sink.submit(_row(i))
+            await asyncio.sleep(0)
+        elapsed = time.perf_counter() - started
+        await sink.stop()
+        return elapsed, sink.written
+
+    elapsed, written = asyncio.run(run())
+    assert elapsed < 0.2
+    assert written == 100
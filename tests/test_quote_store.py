@@ -0,0 +1,76 @@
+import json
+import zlib
+from datetime import datetime, timedelta
+
+from sqlalchemy import insert, select, text
+
+from app.models.quote import Quote, QuoteArchive
+from app.services.quote_store import (
+    archive_quotes,
+    compact_legacy_quotes,
+    decode_payload,
+    encode_payload,
+    quote_row,
+)
+from app.services.repricing import iter_quote_pages
+
+BGRP_REQUEST = {"buildingSI": 1000000, "contentsSI": 200000}
+BGRP_RESPONSE = {
+    "product_code": "BGRP", "netPremium": 264.0, "basicFirePremium": 180.0, "basic_premium": 180.0,
+    "firePremium": 180.0, "terrorismPremium": 84.0, "terrorism_premium": 84.0, "grossPremium": 312.52,
+    "breakdown": {"totalSI": 1200000.0},
+}
+
+
+def test_payload_round_trip_drops_and_restores_aliases():
+    payload = encode_payload(BGRP_REQUEST, BGRP_RESPONSE)
+    assert b"firePremium" not in zlib.decompress(payload)
+    request, response = decode_payload(payload)
+    assert request == BGRP_REQUEST
+    assert response == BGRP_RESPONSE
+    assert len(payload) < len(json.dumps(BGRP_RESPONSE))
+
+
+def test_quote_row_promotes_hot_fields():
+    row = quote_row("UIIC", "Fire", "BGRP", BGRP_REQUEST, BGRP_RESPONSE, rate_version="abc123")
+    assert row["sum_insured"] == 1200000.0
+    assert (row["net_premium"], row["gross_premium"]) == (264.0, 312.52)
+    assert row["rate_version"] == "abc123"
+    assert row["request_hash"] == quote_row("UIIC", "Fire", "BGRP", dict(reversed(BGRP_REQUEST.items())), {})["request_hash"]
+
+
+def test_reader_handles_compact_and_legacy_rows(engine):
+    with engine.begin() as conn:
+        conn.execute(insert(Quote.__table__).values([quote_row("UIIC", "Fire", "BGRP", BGRP_REQUEST, BGRP_RESPONSE)]))
+        conn.execute(text("INSERT INTO irisk_quotes (company, lob, product, request_data, response_data) "
+                          "VALUES ('UIIC', 'Fire', 'BGRP', :req, :resp)"),
+                     {"req": json.dumps(BGRP_REQUEST), "resp": json.dumps(BGRP_RESPONSE)})
+    with engine.connect() as conn:
+        (page,) = list(iter_quote_pages(conn, page_size=10))
+    assert [r[2:] for r in page] == [(BGRP_REQUEST, BGRP_RESPONSE)] * 2
+
+    assert compact_legacy_quotes(engine) == 1
+    with engine.connect() as conn:
+        row = conn.execute(select(Quote.__table__).where(Quote.__table__.c.id == 2)).mappings().one()
+        assert row["request_data"] is None and row["payload"] is not None
+        assert float(row["gross_premium"]) == 312.52
+        (page,) = list(iter_quote_pages(conn, page_size=10))
+    assert [r[2:] for r in page] == [(BGRP_REQUEST, BGRP_RESPONSE)] * 2
+
+
+def test_archive_moves_only_old_rows_in_batches(engine):
+    now = datetime.utcnow()
+    rows = [
+        {**quote_row("UIIC", "Fire", "VUSP", {"building_si": i}, {"gross_premium": 1.0}), "created_at": created}
+        for i, created in enumerate([now - timedelta(days=200)] * 5 + [now - timedelta(days=1)] * 2)
+    ]
+    with engine.begin() as conn:
+        conn.execute(insert(Quote.__table__), rows)
+
+    assert archive_quotes(engine, now - timedelta(days=90), batch_size=2) == 5
+    with engine.connect() as conn:
+        live_ids = conn.execute(select(Quote.__table__.c.id).order_by(Quote.__table__.c.id)).scalars().all()
+        archived = conn.execute(select(QuoteArchive.__table__).order_by(QuoteArchive.__table__.c.id)).mappings().all()
+    assert live_ids == [6, 7]
+    assert [r["id"] for r in archived] == [1, 2, 3, 4, 5]
+    assert decode_payload(archived[0]["payload"])[0] == {"building_si": 0}
@@ -0,0 +1,116 @@
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import create_engine
+
+from app.config import settings
+from app.database import Base
+import app.models  # noqa: F401  (registers all tables on Base.metadata)
+from app.services.bulk_seed import SeedReport
+from app.services.rate_artifact import RateArtifact, load_rate_book, write_rate_artifact
+from app.services.rate_book import RateBook, reload_rate_book, set_rate_book
+
+import seed
+
+ROWS = {
+    "basic_rates": [("UBGR", "1001", Decimal("0.150000")), ("UBGR", "1001_2", 0.12), ("SFSP", "1001", "9.99")],
+    "occupancy_types": [("1001", "Residential"), ("1001_2", "Residential"), ("2001", "Industrial")],
+    "terrorism_slabs": [
+        ("UBGR", "Residential", 0, None, "0.07"),
+        ("SFSP", "Industrial", Decimal("0.00"), Decimal("20000000000.00"), "0.20"),
+        ("SFSP", "Industrial", Decimal("20000000000.00"), None, "-0.15"),
+    ],
+    "add_on_rates": [
+        ("UBGR", "EQ", "per_mille", "0.5", None),
+        ("UBGR", "COOP", "fixed", "100", "ONLY_1001_2"),
+    ],
+}
+
+
+def test_round_trip_keeps_rows_and_version(tmp_path):
+    path = str(tmp_path / "rates.irra")
+    version = write_rate_artifact(path, ROWS)
+    assert version == RateBook(**ROWS).version
+
+    artifact = RateArtifact(path)
+    try:
+        assert artifact.version == version
+        assert list(artifact.column("basic_rates.basic_rate")) == [150000, 12, 999]
+        rows = artifact.rows()
+    finally:
+        artifact.close()
+    assert rows["basic_rates"][0] == ("UBGR", "1001", Decimal("0.150000"))
+    assert str(rows["basic_rates"][0][2]) == "0.150000"
+    assert rows["terrorism_slabs"][2] == ("SFSP", "Industrial", Decimal("20000000000.00"), None, Decimal("-0.15"))
+    assert rows["add_on_rates"][0][4] is None
+    # Codes are stored once: "UBGR" and "1001" appear in several sections
+    assert rows["basic_rates"][0][0] is rows["add_on_rates"][0][0]
+
+    book = load_rate_book(path)
+    assert book.version == version
+    assert book.basic_rate("UBGR", "1001") == Decimal("0.15")
+    assert book.add_on_rate("UBGR", "COOP", "1001_2") == ("fixed", Decimal("100"))
+
+
+def test_corrupt_artifacts_are_rejected(tmp_path):
+    path = tmp_path / "rates.irra"
+    write_rate_artifact(str(path), ROWS)
+    data = bytearray(path.read_bytes())
+
+    data[-1] ^= 0xFF
+    path.write_bytes(bytes(data))
+    with pytest.raises(ValueError, match="checksum"):
+        RateArtifact(str(path))
+
+    path.write_bytes(bytes(data[:-8]))
+    with pytest.raises(ValueError, match="truncated"):
+        RateArtifact(str(path))
+
+    path.write_bytes(b"NOPE" + bytes(data[4:]))
+    with pytest.raises(ValueError, match="not a rate artifact"):
+        RateArtifact(str(path))
+
+
+def test_compiled_csvs_match_a_seeded_database(tmp_path, monkeypatch):
+    data = tmp_path / "data"
+    data.mkdir()
+    (data / "occupancies.csv").write_text(
+        "iib_code,section_aift,occupancy_type,risk_description\n1001,I,Residential,Dwellings\n2001,II,Industrial,Mills\n"
+    )
+    (data / "product_basic_rates.csv").write_text("iib_code,product_code,basic_rate\n1001,SFSP,0.15\n2001,SFSP,0.40\n")
+    monkeypatch.chdir(tmp_path)
+
+    path = str(tmp_path / "build" / "rates.irra")
+    version, report = seed.compile_rate_artifact(path)
+    assert report.tables["product_basic_rates"]["inserted"] == 2
+
+    engine = create_engine(f"sqlite:///{tmp_path / 'seed.db'}")
+    Base.metadata.create_all(engine)
+    seed.run_seed_steps(engine, SeedReport())
+    with engine.connect() as conn:
+        assert RateBook.load(conn).version == version
+    engine.dispose()
+
+    book = load_rate_book(path)
+    assert book.basic_rate("SFSP", "2001") == Decimal("0.4")
+    assert book.occupancy_type("2001") == "Industrial"
+
+
+def test_reload_prefers_the_configured_artifact(tmp_path, monkeypatch):
+    path = str(tmp_path / "rates.irra")
+    version = write_rate_artifact(path, ROWS)
+    monkeypatch.setattr(settings, "RATE_ARTIFACT_PATH", path)
+    try:
+        assert reload_rate_book().version == version
+    finally:
+        set_rate_book(None)
+
+
+def test_manual_seed_refuses_while_an_artifact_is_configured(tmp_path, monkeypatch):
+    from fastapi.testclient import TestClient
+    from app.main import app
+
+    monkeypatch.setattr(settings, "RATE_ARTIFACT_PATH", str(tmp_path / "rates.irra"))
+    body = TestClient(app).get("/api/manual-seed").json()
+    assert body["success"] is False
+    assert "build_rate_artifact" in body["error"]
@@ -0,0 +1,147 @@
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import create_engine, text
+
+from app.database import Base
+import app.models  # noqa: F401  (registers all tables on Base.metadata)
+from app.services import rate_book
+from app.services.rate_book import RateBook, reload_rate_book, set_rate_book
+from app.services.slab_index import SlabIndex
+from app.services.add_on_rules import CompiledAddOnRule
+from app.services.rating_engine import (
+    get_basic_rate_per_mille,
+    get_terrorism_rate_per_mille,
+    get_add_on_rate,
+)
+
+
+def _sample_book():
+    return RateBook(
+        basic_rates=[("UBGR", "1001", "0.15"), ("UBGR", "1001_2", 0.12), ("UBGR", "1001", "9.99")],
+        occupancy_types=[("1001", "Residential"), ("1001_2", "Residential"), ("2001", "Industrial")],
+        terrorism_slabs=[
+            ("UBGR", "Residential", 0, None, "0.07"),
+            ("SFSP", "Industrial", 0, 20000000000, "0.20"),
+            ("SFSP", "Industrial", 20000000000, None, "0.15"),
+        ],
+        add_on_rates=[
+            ("UBGR", "EQ", "per_mille", "0.5", None),
+            ("UBGR", "PA_PROPOSER", "fixed", "7", "ALL"),
+            ("UBGR", "COOP", "fixed", "100", "ONLY_1001_2"),
+            ("UBGR", "NOCOOP", "percentage", "1.5", "EXCEPT_1001_2"),
+        ],
+    )
+
+
+@pytest.fixture
+def book():
+    b = _sample_book()
+    set_rate_book(b)
+    yield b
+    set_rate_book(None)
+
+
+def test_basic_rate_first_row_wins(book):
+    assert book.basic_rate("UBGR", "1001") == Decimal("0.15")
+    assert get_basic_rate_per_mille("UBGR", "1001_2") == Decimal("0.12")
+    assert get_basic_rate_per_mille("UBGR", "9999") == Decimal("0.0")
+
+
+def test_terrorism_boundary_prefers_higher_slab(book):
+    assert get_terrorism_rate_per_mille("UBGR", "1001", tsi=10000000.0) == Decimal("0.07")
+    assert get_terrorism_rate_per_mille("SFSP", "2001", tsi=20000000000) == Decimal("0.15")
+    assert get_terrorism_rate_per_mille("SFSP", "2001", tsi=100) == Decimal("0.20")
+    with pytest.raises(ValueError):
+        get_terrorism_rate_per_mille("UVGS", "1001", tsi=100)
+
+
+def test_add_on_occupancy_rules(book):
+    assert get_add_on_rate("UBGR", "EQ", "1001") == ("per_mille", Decimal("0.5"))
+    assert get_add_on_rate("UBGR", "COOP", "1001_2") == ("fixed", Decimal("100"))
+    assert get_add_on_rate("UBGR", "COOP", "1001") == ("fixed", Decimal("0.0"))
+    assert get_add_on_rate("UBGR", "NOCOOP", "1001") == ("percentage", Decimal("1.5"))
+    assert get_add_on_rate("UBGR", "NOCOOP", "1001_2") == ("fixed", Decimal("0.0"))
+
+
+def test_add_on_rules_most_specific_wins():
+    rule = CompiledAddOnRule([
+        ("ALL", "fixed", Decimal("1")),
+        ("ONLY_1001", "fixed", Decimal("2")),
+        ("EXCEPT_1001_2", "fixed", Decimal("3")),
+    ])
+    assert rule.resolve("1001") == ("fixed", Decimal("2"))
+    assert rule.resolve("1001_2") == ("fixed", Decimal("1"))
+    assert rule.resolve("2001") == ("fixed", Decimal("3"))
+    assert rule.resolve(None) == ("fixed", Decimal("1"))
+
+
+def test_add_on_rules_except_targets_fall_through_to_the_next_match():
+    rule = CompiledAddOnRule([
+        ("EXCEPT_A", "fixed", Decimal("1")),
+        ("EXCEPT_B", "fixed", Decimal("2")),
+        ("EXCEPT_A", "fixed", Decimal("3")),
+        ("ALL", "fixed", Decimal("4")),
+    ])
+    assert rule.resolve("A") == ("fixed", Decimal("2"))
+    assert rule.resolve("B") == ("fixed", Decimal("1"))
+    assert rule.resolve("C") == ("fixed", Decimal("1"))
+
+    only_excluded = CompiledAddOnRule([("EXCEPT_A", "fixed", Decimal("1")), ("ALL", "fixed", Decimal("4"))])
+    assert only_excluded.resolve("A") == ("fixed", Decimal("4"))
+    assert only_excluded.resolve("B") == ("fixed", Decimal("1"))
+
+
+def test_applicable_add_ons(book):
+    assert set(book.applicable_add_ons("UBGR", "1001")) == {"EQ", "PA_PROPOSER", "NOCOOP"}
+    assert set(book.applicable_add_ons("UBGR", "1001_2")) == {"EQ", "PA_PROPOSER", "COOP"}
+    assert book.applicable_add_ons("SFSP", "1001") == {}
+
+
+def test_snapshot_is_read_only_and_versioned(book):
+    with pytest.raises(TypeError):
+        book.basic_rates[("UBGR", "1001")] = Decimal("1")
+    assert _sample_book().version == book.version
+
+
+def test_reload_from_database_swaps_snapshot():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(text("INSERT INTO occupancies (id, iib_code, section_aift, occupancy_type, risk_description) "
+                          "VALUES (1, '1001', 'I', 'Residential', 'Dwellings')"))
+        conn.execute(text("INSERT INTO product_basic_rates (product_code, occupancy_id, basic_rate) VALUES ('BGRP', 1, 0.15)"))
+        conn.execute(text("INSERT INTO terrorism_slabs (product_code, occupancy_type, si_min, si_max, rate_per_mille) "
+                          "VALUES ('BGRP', 'Residential', 0, NULL, 0.07)"))
+        conn.execute(text("INSERT INTO add_on_master (id, add_on_code, add_on_name) VALUES (1, 'PA_PROPOSER', 'PA')"))
+        conn.execute(text("INSERT INTO add_on_rates (add_on_id, product_code, rate_type, rate_value, active) "
+                          "VALUES (1, 'BGRP', 'fixed', 7, 1)"))
+    try:
+        first = reload_rate_book(engine)
+        assert rate_book.get_rate_book() is first
+        assert get_basic_rate_per_mille("BGRP", "1001") == Decimal("0.15")
+        assert get_add_on_rate("BGRP", "PA_PROPOSER", "1001") == ("fixed", Decimal("7"))
+
+        with engine.begin() as conn:
+            conn.execute(text("UPDATE product_basic_rates SET basic_rate = 0.2"))
+        second = reload_rate_book(engine)
+        assert second.version != first.version
+        assert get_basic_rate_per_mille("BGRP", "1001") == Decimal("0.2")
+    finally:
+        set_rate_book(None)
+
+
+def test_slab_index_reports_gaps_and_overlaps():
+    contiguous = SlabIndex([(Decimal("20000000000"), None, Decimal("0.15")), (Decimal("0"), Decimal("20000000000"), Decimal("0.20"))])
+    assert contiguous.issues == []
+    assert contiguous.resolve(19999999999.99) == Decimal("0.20")
+    assert contiguous.resolve(20000000000) == Decimal("0.15")
+
+    gapped = SlabIndex([(Decimal("0"), Decimal("100"), Decimal("1")), (Decimal("200"), None, Decimal("2"))])
+    assert any("gap" in issue for issue in gapped.issues)
+    assert gapped.resolve(150) is None
+
+    nested = SlabIndex([(Decimal("0"), Decimal("1000"), Decimal("1")), (Decimal("10"), Decimal("20"), Decimal("2"))])
+    assert any("overlap" in issue for issue in nested.issues)
+    assert nested.resolve(15) == Decimal("2")
+    assert nested.resolve(500) == Decimal("1")
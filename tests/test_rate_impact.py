@@ -0,0 +1,66 @@
+import json
+
+import pytest
+from sqlalchemy import text
+
+from app.services.rate_impact import analyze_rate_impact, basic_rate_rows
+
+
+@pytest.fixture
+def engine(engine):
+    with engine.begin() as conn:
+        conn.execute(text("INSERT INTO lob_master (id, lob_code, lob_name) VALUES (1, 'FIRE', 'Fire')"))
+        conn.execute(text("INSERT INTO product_master (lob_id, product_code, product_name) VALUES (1, 'BGRP', 'Bharat Griha')"))
+        conn.execute(text("INSERT INTO occupancies (id, iib_code, section_aift, occupancy_type, risk_description) "
+                          "VALUES (1, '1001', 'I', 'Residential', 'Dwellings')"))
+        conn.execute(text("INSERT INTO product_basic_rates (product_code, occupancy_id, basic_rate) VALUES ('BGRP', 1, 0.15)"))
+        conn.execute(text("INSERT INTO terrorism_slabs (product_code, occupancy_type, si_min, si_max, rate_per_mille) "
+                          "VALUES ('BGRP', 'Residential', 0, NULL, 0.07)"))
+        quotes = [
+            ("BGRP", {"buildingSI": 1000000, "contentsSI": 200000}),
+            ("VUSP", {"building_si": 1000000, "occupancy": "Shop", "pa_selected": False}),
+            ("XYZ", {}),
+        ] * 3
+        for product, request in quotes:
+            conn.execute(text("INSERT INTO irisk_quotes (company, lob, product, request_data, response_data) "
+                              "VALUES ('UIIC', 'Fire', :p, :req, '{}')"),
+                         {"p": product, "req": json.dumps(request)})
+    return engine
+
+
+@pytest.fixture
+def candidate_csv(tmp_path):
+    path = tmp_path / "product_basic_rates.csv"
+    path.write_text("iib_code,product_code,basic_rate\n1001,BGRP,0.30\n9999,BGRP,1.0\n1001,NOPE,1.0\n")
+    return str(path)
+
+
+def test_candidate_rows_follow_seeder_filters(candidate_csv):
+    assert basic_rate_rows(candidate_csv, ["BGRP"], ["1001"]) == [("BGRP", "1001", "0.30")]
+
+
+def test_rate_impact_groups_by_product_and_occupancy(engine, candidate_csv):
+    result = analyze_rate_impact(engine, basic_rates_csv=candidate_csv)
+    assert result["old_rate_version"] != result["new_rate_version"]
+    assert result["quotes"] == 6
+    assert result["errors"] == 3
+
+    groups = {(g["product"], g["occupancy"]): g for g in result["groups"]}
+    bgrp = groups[("BGRP", "1001")]
+    assert bgrp["quotes"] == 3 and bgrp["changed"] == 3
+    assert bgrp["delta_total"] == round(bgrp["new_gross_total"] - bgrp["old_gross_total"], 2) > 0
+    assert bgrp["delta_pct"]["min"] == bgrp["delta_pct"]["max"] > 0
+
+    vusp = groups[("VUSP", "Shop")]
+    assert vusp["changed"] == 0 and vusp["delta"]["max"] == 0
+    assert result["groups"][0] is bgrp
+
+
+def test_rate_impact_sampling_and_validation(engine, candidate_csv):
+    assert analyze_rate_impact(engine, basic_rates_csv=candidate_csv, limit=3)["quotes"] == 2
+    sampled = analyze_rate_impact(engine, basic_rates_csv=candidate_csv, sample=0.5, seed=1)
+    assert sampled["quotes"] + sampled["errors"] < 9
+    with pytest.raises(ValueError):
+        analyze_rate_impact(engine)
+    with pytest.raises(ValueError):
+        analyze_rate_impact(engine, basic_rates_csv=candidate_csv, sample=0)
@@ -0,0 +1,68 @@
+import pytest
+from sqlalchemy import text
+
+from app.services.rate_book import RateBook
+from app.services.rate_lookup import get_flat_rate, refresh_rate_lookup_flat
+
+
+@pytest.fixture
+def engine(engine):
+    with engine.begin() as conn:
+        conn.execute(text("INSERT INTO occupancies (id, iib_code, section_aift, occupancy_type, risk_description) VALUES "
+                          "(1, '1001', 'I', 'Residential', 'Dwellings'), (2, '1002', 'I', 'Non-Industrial', 'Shops')"))
+        conn.execute(text("INSERT INTO product_basic_rates (id, product_code, occupancy_id, basic_rate) VALUES "
+                          "(1, 'SFSP', 1, 0.15), (2, 'SFSP', 2, 0.40), (3, 'SFSP', 1, 0.99), (4, 'BGRP', 1, 0.15)"))
+        conn.execute(text("INSERT INTO stfi_rates (occupancy_id, stfi_rate) VALUES (1, 0.22)"))
+        conn.execute(text("INSERT INTO eq_rates (occupancy_id, eq_zone, eq_rate) VALUES "
+                          "(1, 'Zone I', 0.5), (1, 'Zone II', 0.25), (1, 'Zone III', 0.1), (1, 'Zone IV', 0.05)"))
+    return engine
+
+
+def test_refresh_builds_one_row_per_product_and_occupancy(engine):
+    with engine.begin() as conn:
+        assert refresh_rate_lookup_flat(conn) == 3
+        # Idempotent: a second refresh replaces rather than duplicates
+        assert refresh_rate_lookup_flat(conn) == 3
+
+    with engine.connect() as conn:
+        flat = get_flat_rate(conn, "SFSP", "1001")
+        assert float(flat["basic_rate"]) == 0.15  # first row wins
+        assert flat["occupancy_type"] == "Residential"
+        assert float(flat["stfi_rate"]) == 0.22
+        assert {zone: float(rate) for zone, rate in flat["eq_rates"].items()} == {
+            "Zone I": 0.5, "Zone II": 0.25, "Zone III": 0.1, "Zone IV": 0.05,
+        }
+
+        shop = get_flat_rate(conn, "SFSP", "1002")
+        assert shop["stfi_rate"] is None and set(shop["eq_rates"].values()) == {None}
+        assert get_flat_rate(conn, "SFSP", "9999") is None
+
+
+def test_rate_book_reads_flat_table_when_seeded(engine):
+    with engine.connect() as conn:
+        before = RateBook.load(conn)
+    with engine.begin() as conn:
+        refresh_rate_lookup_flat(conn)
+        # Source edits are not visible until the next refresh
+        conn.execute(text("UPDATE product_basic_rates SET basic_rate = 0.30 WHERE id = 4"))
+    with engine.connect() as conn:
+        after = RateBook.load(conn)
+    assert before.version == after.version
+    assert str(after.basic_rate("BGRP", "1001")) == "0.15"
+
+
+def test_seed_table_rebuilds_the_flat_table(engine, tmp_path, monkeypatch):
+    import seed
+
+    (tmp_path / "data").mkdir()
+    (tmp_path / "data" / "product_basic_rates.csv").write_text("iib_code,product_code,basic_rate\n1001,BGRP,0.30\n")
+    monkeypatch.chdir(tmp_path)
+    with engine.begin() as conn:
+        conn.execute(text("DELETE FROM product_basic_rates WHERE id = 3"))  # the fixture's duplicate key
+        refresh_rate_lookup_flat(conn)
+        seed.seed_table(conn, "lob_master")
+        seed.seed_table(conn, "product_master")
+        seed.seed_table(conn, "product_basic_rates")
+    with engine.connect() as conn:
+        assert float(get_flat_rate(conn, "BGRP", "1001")["basic_rate"]) == 0.30
+        assert str(RateBook.load(conn).basic_rate("BGRP", "1001")) == "0.3"
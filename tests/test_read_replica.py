@@ -0,0 +1,91 @@
+import asyncio
+
+import pytest
+from sqlalchemy import create_engine, text
+
+import app.database as database
+from app.database import Base
+import app.models  # noqa: F401  (registers all tables on Base.metadata)
+from app.services.rate_book import reload_rate_book, set_rate_book
+
+
+def _use_replica(monkeypatch, url):
+    monkeypatch.setattr(database, "READ_DATABASE_URL", url)
+    for name in ("_read_engine", "_read_session_factory", "_async_read_engine", "_async_read_session_factory"):
+        monkeypatch.setattr(database, name, None)
+    monkeypatch.setattr(database, "_replica_retry_at", 0.0)
+
+
+@pytest.fixture
+def replica_url(tmp_path, monkeypatch):
+    url = f"sqlite:///{tmp_path / 'replica.db'}"
+    engine = create_engine(url)
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(text("INSERT INTO occupancies (id, iib_code, section_aift, occupancy_type, risk_description) "
+                          "VALUES (1, '1001', 'I', 'Residential', 'Dwellings')"))
+        conn.execute(text("INSERT INTO product_basic_rates (product_code, occupancy_id, basic_rate) VALUES ('REPL', 1, 0.42)"))
+    engine.dispose()
+    _use_replica(monkeypatch, url)
+    yield url
+    set_rate_book(None)
+    if database._read_engine is not None:
+        database._read_engine.dispose()
+    if database._async_read_engine is not None:
+        asyncio.run(database._async_read_engine.dispose())
+
+
+@pytest.fixture
+def unreachable_replica(tmp_path, monkeypatch):
+    _use_replica(monkeypatch, f"sqlite:///{tmp_path / 'missing' / 'replica.db'}")
+
+
+def test_read_session_and_rate_book_use_replica(replica_url):
+    db = database.ReadSessionLocal()
+    try:
+        assert str(db.get_bind().url) == replica_url
+    finally:
+        db.close()
+    assert str(reload_rate_book().basic_rate("REPL", "1001")) == "0.42"
+
+
+def test_reload_after_a_write_reads_the_primary(replica_url, tmp_path):
+    primary = create_engine(f"sqlite:///{tmp_path / 'primary.db'}")
+    Base.metadata.create_all(primary)
+    try:
+        book = reload_rate_book(bind=primary)
+    finally:
+        primary.dispose()
+    assert book.basic_rate("REPL", "1001") is None
+
+
+def test_unreachable_replica_falls_back_to_primary(unreachable_replica):
+    db = database.ReadSessionLocal()
+    try:
+        assert db.get_bind() is database.engine
+    finally:
+        db.close()
+    # Backed off: no further replica attempts until the retry window passes
+    assert database.get_replica_engine() is None
+    with database.read_connection() as conn:
+        assert conn.engine is database.engine
+
+
+def test_without_replica_reads_use_primary(monkeypatch):
+    _use_replica(monkeypatch, "")
+    assert database.get_replica_engine() is None
+    gen = database.get_read_db()
+    db = next(gen)
+    assert db.get_bind() is database.engine
+    gen.close()
+
+
+def test_async_read_session_falls_back(unreachable_replica):
+    async def run():
+        async with database.AsyncReadSessionLocal() as db:
+            url = str(db.bind.url)
+        # Let aiosqlite's worker thread finish closing the failed connection before the loop closes
+        await asyncio.sleep(0.05)
+        return url
+
+    assert asyncio.run(run()) == database.to_async_url(database.DATABASE_URL)
@@ -0,0 +1,66 @@
+import csv
+import io
+import json
+
+import pytest
+from sqlalchemy import text
+
+from app.services.repricing import iter_quote_pages, run_repricing
+
+
+@pytest.fixture
+def engine(engine):
+    with engine.begin() as conn:
+        conn.execute(text("INSERT INTO occupancies (id, iib_code, section_aift, occupancy_type, risk_description) "
+                          "VALUES (1, '1001', 'I', 'Residential', 'Dwellings')"))
+        conn.execute(text("INSERT INTO product_basic_rates (product_code, occupancy_id, basic_rate) VALUES ('BGRP', 1, 0.15)"))
+        conn.execute(text("INSERT INTO terrorism_slabs (product_code, occupancy_type, si_min, si_max, rate_per_mille) "
+                          "VALUES ('BGRP', 'Residential', 0, NULL, 0.07)"))
+        conn.execute(text("INSERT INTO irisk_rates (company, lob, product, key, value) VALUES ('UIIC', 'Fire', 'VUSP', 'Office', 0.25)"))
+
+        quotes = [
+            # VUSP at the old 0.20 rate -> now 0.25
+            ("VUSP", {"building_si": 1000000, "occupancy": "office", "pa_selected": False},
+             {"net_premium": 270.0, "gross_premium": 318.6}),
+            # Shop has no irisk_rates row, fallback unchanged
+            ("VUSP", {"building_si": 1000000, "occupancy": "Shop", "pa_selected": False},
+             {"net_premium": 320.0, "gross_premium": 377.6}),
+            ("BGRP", {"buildingSI": 1000000, "contentsSI": 200000}, {"netPremium": 264.0, "grossPremium": 312.52}),
+            ("XYZ", {}, {"gross_premium": 1.0}),
+        ] * 3
+        for product, request, response in quotes:
+            conn.execute(text("INSERT INTO irisk_quotes (company, lob, product, request_data, response_data) "
+                              "VALUES ('UIIC', 'Fire', :p, :req, :resp)"),
+                         {"p": product, "req": json.dumps(request), "resp": json.dumps(response)})
+    return engine
+
+
+def _diff(output):
+    return list(csv.DictReader(io.StringIO(output.getvalue())))
+
+
+def test_keyset_pages_are_bounded_and_resumable(engine):
+    with engine.connect() as conn:
+        pages = list(iter_quote_pages(conn, page_size=5))
+        assert [len(p) for p in pages] == [5, 5, 2]
+        assert [r[0] for r in pages[1]] == [6, 7, 8, 9, 10]
+        assert [len(p) for p in iter_quote_pages(conn, page_size=5, after_id=10)] == [2]
+        assert [len(p) for p in iter_quote_pages(conn, page_size=5, limit=7)] == [5, 2]
+
+
+@pytest.mark.parametrize("workers", [0, 2])
+def test_repricing_writes_only_changed_and_failed_quotes(engine, workers):
+    output = io.StringIO()
+    summary = run_repricing(output, bind=engine, page_size=5, workers=workers)
+    assert summary["scanned"] == 12
+    assert summary["changed"] == 3
+    assert summary["unchanged"] == 6
+    assert summary["errors"] == 3
+    assert summary["last_quote_id"] == 12
+
+    rows = _diff(output)
+    changed = [r for r in rows if r["status"] == "changed"]
+    assert [r["quote_id"] for r in changed] == ["1", "5", "9"]
+    assert changed[0]["new_gross"] == "377.6"
+    assert changed[0]["delta_gross"] == "59.0"
+    assert {r["product"] for r in rows if r["status"] == "error"} == {"XYZ"}
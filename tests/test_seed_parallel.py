@@ -0,0 +1,104 @@
+import pytest
+from sqlalchemy import create_engine, inspect, text
+
+from app.database import Base
+import app.models  # noqa: F401  (registers all tables on Base.metadata)
+from app.services.bulk_seed import SeedReport
+
+import seed
+
+
+def _engine(path):
+    engine = create_engine(f"sqlite:///{path}", connect_args={"timeout": 30})
+    Base.metadata.create_all(engine)
+    return engine
+
+
+@pytest.fixture
+def data_dir(tmp_path, monkeypatch):
+    data = tmp_path / "data"
+    data.mkdir()
+    iibs = [str(1000 + i) for i in range(200)]
+    (data / "occupancies.csv").write_text(
+        "iib_code,section_aift,occupancy_type,risk_description\n" + "".join(f"{i},I,Residential,R{i}\n" for i in iibs)
+    )
+    (data / "product_basic_rates.csv").write_text(
+        "iib_code,product_code,basic_rate\n" + "".join(f"{i},SFSP,0.{n % 80 + 10}\n" for n, i in enumerate(iibs))
+    )
+    (data / "stfi_rates.csv").write_text("iib_code,stfi_rate\n" + "".join(f"{i},0.05\n" for i in iibs))
+    (data / "eq_rates.csv").write_text(
+        "iib_code,eq_zone,eq_rate\n" + "".join(f"{i},Zone {z},0.1\n" for i in iibs for z in ("I", "II", "III", "IV"))
+    )
+    monkeypatch.chdir(tmp_path)
+    return data
+
+
+def _snapshot(engine):
+    snapshot = {}
+    with engine.connect() as conn:
+        for name in ("occupancies", "product_basic_rates", "stfi_rates", "eq_rates", "rate_lookup_flat"):
+            # Timestamps differ between the two databases
+            columns = [c for c in Base.metadata.tables[name].c.keys() if c not in ("created_at", "updated_at")]
+            rows = conn.execute(text(f"SELECT {', '.join(columns)} FROM {name} ORDER BY 1, 2")).all()
+            snapshot[name] = [tuple(r) for r in rows]
+    return snapshot
+
+
+def _stage_tables(engine):
+    return [t for t in inspect(engine).get_table_names() if t.startswith("_seed_")]
+
+
+def test_steps_are_declared_in_dependency_order():
+    seen = set()
+    for name, step in seed.SEED_STEPS.items():
+        assert set(step.depends_on) <= seen, name
+        # Every id lookup points at a table the step waits for
+        assert {ref.table.name for _, ref in step.lookups.values()} <= set(step.depends_on), name
+        seen.add(name)
+
+
+def test_parallel_staging_matches_serial(engine, data_dir, tmp_path):
+    serial = _engine(tmp_path / "serial.db")
+    report = SeedReport()
+    seed.run_seed_steps(engine, report, workers=4)
+    seed.run_seed_steps(serial, SeedReport(), workers=1)
+
+    assert _snapshot(engine) == _snapshot(serial)
+    assert len(_snapshot(engine)["rate_lookup_flat"]) == 200
+    assert not _stage_tables(engine)
+    for name, step in seed.SEED_STEPS.items():
+        phases = set(report.timings[name])
+        assert phases == ({"publish_ms"} if step.publish else {"stage_ms", "publish_ms"}), name
+    serial.dispose()
+
+
+def test_failed_publish_leaves_previous_data(engine, data_dir, monkeypatch):
+    seed.run_seed_steps(engine, SeedReport())
+    before = _snapshot(engine)
+
+    (data_dir / "product_basic_rates.csv").write_text("iib_code,product_code,basic_rate\n1000,SFSP,0.99\n")
+
+    def broken_refresh(conn):
+        raise RuntimeError("refresh failed")
+
+    monkeypatch.setattr(seed.SEED_STEPS["rate_lookup_flat"], "publish", broken_refresh)
+    with pytest.raises(RuntimeError, match="refresh failed"):
+        seed.run_seed_steps(engine, SeedReport())
+
+    # product_basic_rates was merged before the failure but never became visible
+    assert _snapshot(engine) == before
+    assert not _stage_tables(engine)
+
+
+def test_failed_staging_publishes_nothing(engine, data_dir, monkeypatch):
+    def broken_rows(csv_path):
+        raise ValueError("unreadable CSV")
+
+    monkeypatch.setattr(seed.SEED_STEPS["eq_rates"], "rows", broken_rows)
+    with pytest.raises(RuntimeError, match="Staging eq_rates failed"):
+        seed.run_seed_steps(engine, SeedReport())
+
+    with engine.connect() as conn:
+        assert conn.execute(text("SELECT COUNT(*) FROM occupancies")).scalar() == 0
+        assert conn.execute(text("SELECT COUNT(*) FROM seed_state")).scalar() == 0
+    assert not _stage_tables(engine)
@@ -0,0 +1,68 @@
+import pytest
+from sqlalchemy import text
+
+from app.services.bulk_seed import SeedReport
+from app.services.seed_state import load_seed_state
+
+import seed
+
+ALL_STEPS = list(seed.SEED_STEPS)
+
+
+@pytest.fixture
+def data_dir(tmp_path, monkeypatch):
+    data = tmp_path / "data"
+    data.mkdir()
+    (data / "occupancies.csv").write_text(
+        "iib_code,section_aift,occupancy_type,risk_description\n1001,I,Residential,Dwellings\n2001,II,Industrial,Mills\n"
+    )
+    (data / "product_basic_rates.csv").write_text("iib_code,product_code,basic_rate\n1001,SFSP,0.15\n2001,SFSP,0.40\n")
+    monkeypatch.chdir(tmp_path)
+    return data
+
+
+def _run(engine, force=False):
+    return seed.run_seed_steps(engine, SeedReport(), force=force)
+
+
+def test_unchanged_sources_skip_every_step(engine, data_dir):
+    assert _run(engine) == ALL_STEPS
+    with engine.connect() as conn:
+        state = load_seed_state(conn)
+    assert set(state) == set(ALL_STEPS)
+    assert state["product_basic_rates"]["row_count"] == 2
+    assert state["occupancies"]["csv_path"] == "data/occupancies.csv"
+
+    assert _run(engine) == []
+    assert _run(engine, force=True) == ALL_STEPS
+
+
+def test_changed_csv_reseeds_the_table_and_its_dependents(engine, data_dir):
+    _run(engine)
+
+    (data_dir / "product_basic_rates.csv").write_text("iib_code,product_code,basic_rate\n1001,SFSP,0.20\n2001,SFSP,0.40\n")
+    assert _run(engine) == ["product_basic_rates", "rate_lookup_flat"]
+    with engine.connect() as conn:
+        assert conn.execute(text("SELECT basic_rate FROM rate_lookup_flat WHERE iib_code = '1001'")).scalar() == 0.2
+
+    (data_dir / "occupancies.csv").write_text(
+        "iib_code,section_aift,occupancy_type,risk_description\n1001,I,Residential,Houses\n2001,II,Industrial,Mills\n"
+    )
+    assert _run(engine) == ["occupancies", "product_basic_rates", "bsus_rates", "stfi_rates", "eq_rates",
+                            "rate_lookup_flat"]
+    assert _run(engine) == []
+
+
+def test_row_count_drift_reseeds_the_table(engine, data_dir):
+    _run(engine)
+    with engine.begin() as conn:
+        conn.execute(text("DELETE FROM terrorism_slabs WHERE product_code = 'SFSP'"))
+    assert _run(engine) == ["terrorism_slabs"]
+    assert _run(engine) == []
+
+
+def test_missing_state_table_seeds_everything(engine, data_dir):
+    with engine.begin() as conn:
+        conn.execute(text("DROP TABLE seed_state"))
+    assert _run(engine) == ALL_STEPS
+    assert _run(engine) == ALL_STEPS
@@ -0,0 +1,119 @@
+import pytest
+from sqlalchemy import inspect, text
+
+from app.services.bulk_seed import SeedReport
+from app.services.rate_book import RateBook
+
+import seed
+
+
+@pytest.fixture
+def data_dir(tmp_path, monkeypatch):
+    data = tmp_path / "data"
+    data.mkdir()
+    (data / "add_on_master_COMPLETE.csv").write_text(
+        "add_on_code,add_on_name,is_percentage,applies_to_product,active\n"
+        "ADDT,Additional Rent,FALSE,TRUE,TRUE\nEARA,Earthquake,FALSE,TRUE,TRUE\n"
+    )
+    _write_rates(data, "0.5")
+    monkeypatch.chdir(tmp_path)
+    return data
+
+
+def _write_rates(data, earthquake_rate):
+    (data / "add_on_rates.csv").write_text(
+        "add_on_code,product_code,rate_type,rate_value\n"
+        f"ADDT,SFSP,policy_rate,0.0\nEARA,SFSP,per_mille,{earthquake_rate}\n"
+    )
+
+
+def _rates(conn):
+    return conn.execute(text("SELECT product_code, rate_type, rate_value FROM add_on_rates ORDER BY id")).all()
+
+
+def _swap_tables(engine):
+    return [t for t in inspect(engine).get_table_names() if "__" in t]
+
+
+def test_reload_swaps_in_a_shadow_table_with_the_same_indexes(engine, data_dir):
+    indexes = inspect(engine).get_indexes("add_on_rates")
+    report = SeedReport()
+    seed.run_seed_steps(engine, report)
+    assert report.tables["add_on_rates"]["swapped"] == 1
+
+    _write_rates(data_dir, "0.75")
+    report = SeedReport()
+    assert seed.run_seed_steps(engine, report) == ["add_on_rates"]
+    assert report.tables["add_on_rates"] == {"staged": 2, "inserted": 0, "updated": 1, "swapped": 1}
+
+    with engine.connect() as conn:
+        assert [float(r.rate_value) for r in _rates(conn)] == [0.0, 0.75]
+        book = RateBook.load(conn)
+    assert book.add_on_rules["SFSP"]["EARA"].resolve(None)[1] == pytest.approx(0.75)
+    assert inspect(engine).get_indexes("add_on_rates") == indexes
+    assert not _swap_tables(engine)
+
+
+def test_unchanged_reload_leaves_the_live_table_alone(engine, data_dir):
+    seed.run_seed_steps(engine, SeedReport())
+    report = SeedReport()
+    with engine.begin() as conn:
+        seed.seed_table(conn, "add_on_rates", report)
+    assert report.tables["add_on_rates"] == {"staged": 2, "inserted": 0, "updated": 0}
+    assert not _swap_tables(engine)
+
+
+def test_readers_see_the_old_table_until_the_swap_commits(engine, data_dir):
+    seed.run_seed_steps(engine, SeedReport())
+    _write_rates(data_dir, "0.75")
+
+    with engine.connect() as reader:
+        with engine.begin() as conn:
+            seed.seed_table(conn, "add_on_rates")
+            assert float(_rates(reader)[1].rate_value) == 0.5
+            reader.rollback()
+        assert float(_rates(reader)[1].rate_value) == 0.75
+
+
+def test_invalid_shadow_is_never_swapped_in(engine, data_dir):
+    seed.run_seed_steps(engine, SeedReport())
+    _write_rates(data_dir, "1500")  # per mille rates must be below 1000
+
+    with pytest.raises(RuntimeError, match="PER_MILLE rate_value outside"):
+        seed.run_seed_steps(engine, SeedReport())
+
+    with engine.connect() as conn:
+        assert float(_rates(conn)[1].rate_value) == 0.5
+    assert not _swap_tables(engine)
+
+
+def test_swap_keeps_migration_only_checks_and_expression_indexes(engine, data_dir):
+    # As migrated: a CHECK the model does not declare, and an expression index inspect() cannot reflect
+    with engine.begin() as conn:
+        ddl = conn.execute(text("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'add_on_rates'")).scalar()
+        indexes = conn.execute(text("SELECT sql FROM sqlite_master WHERE type = 'index' AND tbl_name = 'add_on_rates' "
+                                    "AND sql IS NOT NULL")).scalars().all()
+        conn.execute(text("DROP TABLE add_on_rates"))
+        conn.execute(text(ddl[:ddl.rindex(")")] + ", CONSTRAINT ck_add_on_rates_occupancy_type CHECK "
+                          "(occupancy_type IS NULL OR occupancy_type IN ('Residential', 'Non-Industrial', 'Industrial')))"))
+        for index in indexes + ["CREATE INDEX ix_add_on_rates_lower_product ON add_on_rates (lower(product_code))"]:
+            conn.execute(text(index))
+
+    def schema():
+        with engine.connect() as conn:
+            checks = inspect(conn).get_check_constraints("add_on_rates")
+            index_sql = conn.execute(text("SELECT sql FROM sqlite_master WHERE type = 'index' "
+                                          "AND tbl_name = 'add_on_rates' AND sql IS NOT NULL")).scalars().all()
+        return sorted(c["name"] for c in checks), sorted(index_sql)
+
+    before = schema()
+    assert "ck_add_on_rates_occupancy_type" in before[0]
+    seed.run_seed_steps(engine, SeedReport())
+    _write_rates(data_dir, "0.75")
+    report = SeedReport()
+    seed.run_seed_steps(engine, report)
+    assert report.tables["add_on_rates"]["swapped"] == 1
+    assert schema() == before
+    with pytest.raises(Exception, match="CHECK"):
+        with engine.begin() as conn:
+            conn.execute(text("UPDATE add_on_rates SET occupancy_type = 'Warehouse'"))
@@ -0,0 +1,116 @@
+import pytest
+from fastapi import FastAPI
+from sqlalchemy import create_engine, text
+
+from app.config import settings
+from app.database import Base
+import app.models  # noqa: F401  (registers all tables on Base.metadata)
+from app.startup import (
+    StartupProfile, ensure_schema, migration_heads, profile_openapi, schema_is_current, startup_profile,
+)
+
+
+@pytest.fixture
+def engine(tmp_path):
+    # Unlike tests/conftest.py, no tables: these tests start from an empty database
+    engine = create_engine(f"sqlite:///{tmp_path / 'app.db'}")
+    yield engine
+    engine.dispose()
+
+
+def _stamp(engine, *revisions):
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE IF NOT EXISTS alembic_version (version_num VARCHAR(32) NOT NULL)"))
+        conn.execute(text("DELETE FROM alembic_version"))
+        for revision in revisions:
+            conn.execute(text("INSERT INTO alembic_version VALUES (:r)"), {"r": revision})
+
+
+def test_migration_heads_match_alembic():
+    from alembic.config import Config
+    from alembic.script import ScriptDirectory
+
+    assert migration_heads() == set(ScriptDirectory.from_config(Config("alembic.ini")).get_heads())
+
+
+def test_migrations_render_offline(monkeypatch):
+    import io
+    from alembic import command
+    from alembic.config import Config
+
+    # No ini file, so env.py leaves the test run's logging alone
+    config = Config(output_buffer=io.StringIO())
+    config.set_main_option("script_location", "alembic")
+    monkeypatch.setattr(settings, "DATABASE_URL", "postgresql://irisk@localhost/irisk")
+    command.upgrade(config, "head", sql=True)
+
+    sql = config.output_buffer.getvalue()
+    assert "ALTER TABLE irisk_quotes ADD COLUMN payload" in sql
+    assert "irisk_rates" not in sql  # created with its index by create_all
+
+
+def test_migration_heads_follow_merges(tmp_path):
+    revisions = {"a1": None, "b2": "'a1'", "c3": "'a1'", "d4": "('b2', 'c3')", "e5": "'d4'", "f6": "'a1'"}
+    for revision, down in revisions.items():
+        (tmp_path / f"{revision}_step.py").write_text(
+            f"revision: str = '{revision}'\ndown_revision: Union[str, None] = {down}\n"
+        )
+    assert migration_heads(str(tmp_path)) == {"e5", "f6"}
+
+
+def test_schema_is_current_needs_head_and_every_table(engine):
+    heads = migration_heads()
+    with engine.connect() as conn:
+        assert not schema_is_current(conn, Base.metadata, heads)
+
+    Base.metadata.create_all(engine)
+    with engine.connect() as conn:
+        assert not schema_is_current(conn, Base.metadata, heads)  # never stamped
+
+    _stamp(engine, "0000deadbeef")
+    with engine.connect() as conn:
+        assert not schema_is_current(conn, Base.metadata, heads)
+
+    _stamp(engine, *heads)
+    with engine.connect() as conn:
+        assert schema_is_current(conn, Base.metadata, heads)
+
+    # irisk_users is created by create_all only, not by a migration
+    with engine.begin() as conn:
+        conn.execute(text("DROP TABLE irisk_users"))
+    with engine.connect() as conn:
+        assert not schema_is_current(conn, Base.metadata, heads)
+
+
+def test_fast_boot_skips_create_all_at_head(engine, monkeypatch):
+    assert ensure_schema(engine, Base.metadata) is True
+    _stamp(engine, *migration_heads())
+    assert ensure_schema(engine, Base.metadata) is False
+
+    monkeypatch.setattr(settings, "FAST_BOOT", False)
+    assert ensure_schema(engine, Base.metadata) is True
+
+
+def test_profile_records_phases_in_order():
+    profile = StartupProfile()
+    with profile.phase("imports"):
+        pass
+    profile.record("schema", 0.0123)
+    assert list(profile.report()) == ["imports", "schema"]
+    assert profile.report()["schema"] == 12.3
+
+
+def test_openapi_is_generated_once_and_timed():
+    api = FastAPI()
+
+    @api.get("/ping")
+    def ping():
+        return {}
+
+    profile_openapi(api)
+    before = len(startup_profile.phases)
+    assert api.openapi_schema is None
+    schema = api.openapi()
+    assert api.openapi() is schema
+    assert "/ping" in schema["paths"]
+    assert [name for name, _ in startup_profile.phases[before:]] == ["openapi"]
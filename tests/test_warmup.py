@@ -0,0 +1,128 @@
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.database import Base
+import app.models  # noqa: F401  (registers all tables on Base.metadata)
+from app.main import app
+from app.services import warmup as warmup_module
+from app.services.quote_cache import quote_cache
+from app.services.rate_book import reload_rate_book, set_rate_book
+from app.services.warmup import WARMUP_PRODUCTS, Warmup
+
+
+@pytest.fixture
+def engines(tmp_path):
+    path = tmp_path / "warmup.db"
+    sync_engine = create_engine(f"sqlite:///{path}", pool_size=3, max_overflow=0)
+    Base.metadata.create_all(sync_engine)
+    async_engine = create_async_engine(f"sqlite+aiosqlite:///{path}", pool_size=3, max_overflow=0)
+    quote_cache.clear()
+    yield sync_engine, async_engine
+    set_rate_book(None)
+    quote_cache.clear()
+    asyncio.run(async_engine.dispose())
+    sync_engine.dispose()
+
+
+def _seed_rates(engine):
+    with engine.begin() as conn:
+        conn.execute(text("INSERT INTO occupancies (id, iib_code, section_aift, occupancy_type, risk_description) "
+                          "VALUES (1, '1001', 'I', 'Residential', 'Dwellings')"))
+        for product in ("UBGR", "UVGR", "UVGS", "BGRP"):
+            conn.execute(text("INSERT INTO product_basic_rates (product_code, occupancy_id, basic_rate) "
+                              "VALUES (:p, 1, 0.15)"), {"p": product})
+            conn.execute(text("INSERT INTO terrorism_slabs (product_code, occupancy_type, si_min, si_max, rate_per_mille) "
+                              "VALUES (:p, 'Residential', 0, NULL, 0.07)"), {"p": product})
+        conn.execute(text("INSERT INTO irisk_rates (company, lob, product, key, value) "
+                          "VALUES ('UIIC', 'Fire', 'VUSP', 'Office', 0.2)"))
+
+
+def _warmup(sync_engine, async_engine, **kwargs):
+    return Warmup(pool_size=3, engines_factory=lambda: ({"primary": sync_engine}, {"async_primary": async_engine}),
+                  session_factory=async_sessionmaker(bind=async_engine), **kwargs)
+
+
+def test_warmup_fills_pools_and_quotes_every_product(engines):
+    sync_engine, async_engine = engines
+    _seed_rates(sync_engine)
+    reload_rate_book(sync_engine)
+    warmup = _warmup(sync_engine, async_engine)
+
+    assert not warmup.ready
+    asyncio.run(warmup.run())
+
+    assert warmup.ready
+    assert warmup.errors == {}
+    assert list(warmup.quotes) == list(WARMUP_PRODUCTS)
+    assert warmup.connections == {"primary": 3, "async_primary": 3}
+    assert sync_engine.pool.checkedin() == 3
+    assert async_engine.pool.checkedin() == 3
+    with sync_engine.connect() as conn:
+        assert conn.execute(text("SELECT COUNT(*) FROM irisk_quotes")).scalar() == 0
+
+
+def test_failed_products_do_not_hold_readiness_back(engines):
+    sync_engine, async_engine = engines
+    reload_rate_book(sync_engine)  # no rates seeded
+    warmup = _warmup(sync_engine, async_engine)
+
+    asyncio.run(warmup.run())
+
+    assert warmup.ready
+    assert set(warmup.errors) == {"UBGR", "UVGR", "UVGS", "BGRP"}
+    # irisk_rates is empty too, so these priced at their fallback rates
+    assert set(warmup.quotes) == {"VUSP", "BSUSP", "BLUSP", "SFSP", "IAR"}
+
+
+def test_ready_probe_turns_green_after_warmup(engines, monkeypatch):
+    sync_engine, async_engine = engines
+    warmup = _warmup(sync_engine, async_engine)
+    monkeypatch.setattr(warmup_module, "warmup", warmup)
+    client = TestClient(app)
+
+    response = client.get("/ready")
+    assert response.status_code == 503
+    assert response.json()["status"] == "warming"
+    assert client.get("/").json()["status"] == "running"
+
+    reload_rate_book(sync_engine)
+    asyncio.run(warmup.run())
+    response = client.get("/ready")
+    assert response.status_code == 200
+    assert response.json()["status"] == "ready"
+
+
+def test_disabled_warmup_is_ready_on_start():
+    warmup = Warmup(enabled=False)
+
+    async def start():
+        warmup.start()
+        return warmup.running
+
+    assert asyncio.run(start()) is False
+    assert warmup.ready
+
+
+def test_unreachable_primary_keeps_the_worker_not_ready(engines, tmp_path):
+    _, async_engine = engines
+    unreachable = create_engine(f"sqlite:///{tmp_path / 'missing' / 'primary.db'}")
+    warmup = Warmup(pool_size=3, retry_seconds=0.01,
+                    engines_factory=lambda: ({"primary": unreachable}, {"async_primary": async_engine}),
+                    session_factory=async_sessionmaker(bind=async_engine))
+
+    async def run():
+        warmup.start()
+        # Each attempt starts from empty stats; stop in the third one's retry sleep, after its
+        # last pool step, rather than while it holds connections
+        while warmup.attempts < 3 or "async_primary" not in warmup.connections:
+            await asyncio.sleep(0.01)
+        await warmup.stop()
+
+    asyncio.run(run())
+    assert not warmup.ready
+    assert "primary" in warmup.errors
+    assert warmup.quotes == {}  # pricing is skipped until the database answers
@@ -3,7 +3,7 @@ import os
 import sys
 from sqlalchemy import text
 from app.database import SessionLocal, engine
-from seed import seed_add_on_rates
+from seed import seed_table
 
 def run_verification():
     results = {
@@ -42,13 +42,13 @@ def run_verification():
 
             # Logic
             if total != 121:
-                print("\nMISMATCH DETECTED. Re-running seed_add_on_rates...")
+                print("\nMISMATCH DETECTED. Re-seeding add_on_rates...")
                 results["action_taken"] = "reseeded"
                 
                 # Re-run seeding specifically
                 # We need a connection object for seed functions usually
                 with engine.begin() as conn:
-                    seed_add_on_rates(conn)
+                    seed_table(conn, "add_on_rates")
                 
                 # Re-verify
                 total_2 = db.execute(text("SELECT COUNT(*) FROM add_on_rates")).scalar()